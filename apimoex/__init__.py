@@ -7,7 +7,22 @@
 перечень доступных функций-запросов может быть легко расширен.
 """
 
+from apimoex.cache import HTTPCache
 from apimoex.client import ISSClient
+from apimoex.metrics import Metrics
+from apimoex.parallel import (
+    SecurityData,
+    find_ticker_lineage,
+    get_board_candles_many,
+    get_board_candles_sharded,
+    get_board_history_by_dates,
+    get_board_history_many,
+    get_market_candles_sharded,
+    get_market_history_stitched,
+)
+from apimoex.poller import CandlePoller
+from apimoex.reference import ISSReference, get_reference_snapshot
+from apimoex.replay import Cassette, ReplayAdapter
 from apimoex.requests import (
     find_securities,
     find_security_description,
@@ -15,26 +30,62 @@ from apimoex.requests import (
     get_board_candles,
     get_board_dates,
     get_board_history,
+    get_board_history_by_date,
     get_board_securities,
     get_index_tickers,
     get_market_candle_borders,
     get_market_candles,
     get_market_history,
     get_reference,
+    iter_board_candles,
+    iter_board_history,
+    iter_market_candles,
+    iter_market_history,
 )
+from apimoex.session import ConnectionStats, ISSAdapter, RateLimiter, make_session
+from apimoex.store import HistoryStore
+from apimoex.table import RowTable, get_board_candles_table, get_board_history_table
 
 __all__ = [
     "get_reference",
+    "get_reference_snapshot",
+    "ISSReference",
     "find_securities",
     "find_security_description",
     "get_market_candle_borders",
     "get_board_candle_borders",
     "get_market_candles",
     "get_board_candles",
+    "get_market_candles_sharded",
+    "get_board_candles_sharded",
     "get_board_dates",
     "get_board_securities",
     "get_market_history",
     "get_board_history",
+    "get_board_history_by_date",
     "get_index_tickers",
+    "iter_market_candles",
+    "iter_board_candles",
+    "iter_market_history",
+    "iter_board_history",
+    "get_board_candles_many",
+    "get_board_history_many",
+    "get_board_history_by_dates",
+    "find_ticker_lineage",
+    "get_market_history_stitched",
+    "get_board_candles_table",
+    "get_board_history_table",
+    "RowTable",
+    "SecurityData",
+    "CandlePoller",
+    "HistoryStore",
+    "ISSAdapter",
+    "RateLimiter",
+    "ConnectionStats",
+    "make_session",
+    "HTTPCache",
+    "Metrics",
+    "ReplayAdapter",
+    "Cassette",
     "ISSClient",
 ]
@@ -0,0 +1,166 @@
+"""Потоковая запись данных MOEX ISS в файлы Parquet и Arrow IPC.
+
+Части таблиц, которые выдаются по мере загрузки, например, функцией iter_board_candles, накапливаются до заданного
+количества строк и записываются в файл крупными группами строк, поэтому объем используемой памяти не зависит от общего
+объема данных, а файл не дробится на множество мелких групп строк, замедляющих последующее чтение.
+
+Для работы необходим pyarrow, который устанавливается вместе с дополнительной зависимостью apimoex[arrow].
+"""
+import os
+from collections import abc
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from apimoex import client
+
+__all__ = [
+    "make_schema",
+    "write_parquet",
+    "write_ipc",
+]
+
+_TYPES: dict[str, pa.DataType] = {
+    "begin": pa.timestamp("s"),
+    "end": pa.timestamp("s"),
+    "tradedate": pa.date32(),
+    "boardid": pa.string(),
+    "secid": pa.string(),
+    "shortname": pa.string(),
+    "open": pa.float64(),
+    "close": pa.float64(),
+    "high": pa.float64(),
+    "low": pa.float64(),
+    "value": pa.float64(),
+    "waprice": pa.float64(),
+    "legalcloseprice": pa.float64(),
+    "volume": pa.int64(),
+    "numtrades": pa.int64(),
+}
+# Даты и моменты времени передаются MOEX ISS строками, которые преобразуются после загрузки в Arrow
+_PARSED = (pa.date32(), pa.timestamp("s"))
+# Отсутствующие даты MOEX ISS передает нулевыми значениями, которые не преобразуются в даты Arrow
+_EMPTY_DATES = frozenset(("0000-00-00", "0000-00-00 00:00:00"))
+_ROW_GROUP_SIZE = 100_000
+
+
+def make_schema(columns: tuple[str, ...], types: abc.Mapping[str, pa.DataType] | None = None) -> pa.Schema:
+    """Схема Arrow для таблицы с указанными столбцами.
+
+    :param columns:
+        Кортеж столбцов, которые загружаются с MOEX ISS.
+    :param types:
+        Типы столбцов, которые дополняют и переопределяют стандартные типы для основных столбцов свечек и истории
+        торгов.
+
+    :return:
+        Схема Arrow со столбцами в указанном порядке.
+    """
+    types = types or {}
+    fields: list[pa.Field] = []
+    for column in columns:
+        column_type = types.get(column) or _TYPES.get(column.lower())
+        if column_type is None:
+            raise client.ISSMoexError(f"Неизвестный тип столбца {column} - его необходимо указать в types")
+        fields.append(pa.field(column, column_type))
+
+    return pa.schema(fields)
+
+
+def _to_batch(page: client.Table, schema: pa.Schema) -> pa.RecordBatch:
+    """Преобразует часть таблицы в блок Arrow с заданной схемой."""
+    arrays: list[pa.Array] = []
+    for field in schema:
+        values = [row.get(field.name) for row in page]
+        if field.type in _PARSED:
+            values = [None if value in _EMPTY_DATES else value for value in values]
+            arrays.append(pa.array(values, type=pa.string()).cast(field.type))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _iter_tables(pages: abc.Iterable[client.Table], schema: pa.Schema, row_group_size: int) -> abc.Iterator[pa.Table]:
+    """Объединяет части таблицы в таблицы Arrow не меньше заданного количества строк, кроме последней."""
+    batches: list[pa.RecordBatch] = []
+    rows = 0
+    for page in pages:
+        if not page:
+            continue
+        batches.append(_to_batch(page, schema))
+        rows += len(page)
+        if rows >= row_group_size:
+            yield pa.Table.from_batches(batches, schema).combine_chunks()
+            batches, rows = [], 0
+
+    if batches:
+        yield pa.Table.from_batches(batches, schema).combine_chunks()
+
+
+def write_parquet(
+    pages: abc.Iterable[client.Table],
+    path: str | os.PathLike[str],
+    columns: tuple[str, ...],
+    types: abc.Mapping[str, pa.DataType] | None = None,
+    row_group_size: int = _ROW_GROUP_SIZE,
+) -> int:
+    """Записывает части таблицы в файл Parquet по мере их получения.
+
+    :param pages:
+        Части таблицы, например, результат iter_board_candles или iter_board_history.
+    :param path:
+        Путь к файлу.
+    :param columns:
+        Кортеж столбцов, которые были запрошены у MOEX ISS, - определяет схему и порядок столбцов в файле.
+    :param types:
+        Типы столбцов, которые дополняют и переопределяют стандартные типы.
+    :param row_group_size:
+        Количество строк в группе строк файла - части таблицы накапливаются в памяти, пока не наберется заданное
+        количество строк.
+
+    :return:
+        Количество записанных строк.
+    """
+    schema = make_schema(columns, types)
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for table in _iter_tables(pages, schema, row_group_size):
+            writer.write_table(table, row_group_size=row_group_size)
+            rows += table.num_rows
+
+    return rows
+
+
+def write_ipc(
+    pages: abc.Iterable[client.Table],
+    path: str | os.PathLike[str],
+    columns: tuple[str, ...],
+    types: abc.Mapping[str, pa.DataType] | None = None,
+    row_group_size: int = _ROW_GROUP_SIZE,
+) -> int:
+    """Записывает части таблицы в файл Arrow IPC по мере их получения.
+
+    :param pages:
+        Части таблицы, например, результат iter_board_candles или iter_board_history.
+    :param path:
+        Путь к файлу.
+    :param columns:
+        Кортеж столбцов, которые были запрошены у MOEX ISS, - определяет схему и порядок столбцов в файле.
+    :param types:
+        Типы столбцов, которые дополняют и переопределяют стандартные типы.
+    :param row_group_size:
+        Количество строк в блоке Arrow - части таблицы накапливаются в памяти, пока не наберется заданное количество
+        строк.
+
+    :return:
+        Количество записанных строк.
+    """
+    schema = make_schema(columns, types)
+    rows = 0
+    with pa.OSFile(os.fspath(path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for table in _iter_tables(pages, schema, row_group_size):
+            writer.write_table(table, max_chunksize=row_group_size)
+            rows += table.num_rows
+
+    return rows
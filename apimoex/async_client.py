@@ -0,0 +1,223 @@
+"""Асинхронный клиент для MOEX ISS."""
+import asyncio
+import contextlib
+import time
+import weakref
+from collections import abc, deque
+
+import aiohttp
+
+from apimoex import client
+from apimoex import metrics as iss_metrics
+from apimoex.client import MAX_LIMIT, BaseISSClient, Decoder, FlightKey, ISSMoexError, TablesDict, WebQuery
+
+
+class _Flight:
+    """Выполняющийся в отдельной задаче запрос, результата которого ожидают сопрограммы.
+
+    Загрузка выполняется в задаче, не принадлежащей ни одной из ожидающих сопрограмм, поэтому отмена любой из них не
+    затрагивает остальные. Задача отменяется, только если ее результата больше никто не ожидает.
+    """
+
+    __slots__ = ("task", "callers", "shared")
+
+    def __init__(self, task: asyncio.Task[TablesDict]) -> None:
+        self.task = task
+        self.callers = 0
+        self.shared = False
+
+
+# Выполняющиеся запросы для каждого цикла событий
+_flights: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[FlightKey, _Flight]] = weakref.WeakKeyDictionary()
+
+
+def _drop_flight(flights: dict[FlightKey, _Flight], key: FlightKey, flight: _Flight) -> None:
+    """Удаляет запрос из выполняющихся, если его еще не заменил новый такой же запрос."""
+    if flights.get(key) is flight:
+        del flights[key]
+
+
+class AsyncISSClient(BaseISSClient, abc.AsyncIterable[TablesDict]):
+    """Асинхронный клиент для MOEX ISS.
+
+    Для работы клиента необходимо передать aiohttp.ClientSession.
+
+    Аналог ISSClient - загружает данные для простых ответов с помощью метода get. Для ответов состоящих из нескольких
+    блоков данных поддерживается протокол асинхронного итерируемого для отдельных блоков или метод get_all для их
+    автоматического сбора.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        query: WebQuery | None = None,
+        workers: int = 1,
+        decoder: Decoder | None = None,
+        metrics: iss_metrics.Metrics | None = None,
+        limit: int | None = MAX_LIMIT,
+    ) -> None:
+        """MOEX ISS является REST сервером.
+
+        Полный перечень запросов и параметров к ним https://iss.moex.com/iss/reference/
+        Дополнительное описание https://fs.moex.com/files/6523
+
+        :param session:
+            Сессия интернет соединения.
+        :param url:
+            Адрес запроса.
+        :param query:
+            Перечень дополнительных параметров запроса. К списку дополнительных параметров всегда добавляется
+            требование предоставить ответ в виде расширенного json без метаданных.
+        :param workers:
+            Максимальное количество одновременно загружаемых блоков данных. Для ответов с курсором после загрузки
+            первого блока оставшиеся блоки загружаются конкурентно, но выдаются по порядку. По умолчанию блоки
+            загружаются последовательно.
+        :param decoder:
+            Функция преобразования тела ответа в байтах в json. По умолчанию используется orjson или msgspec, если
+            они установлены, или стандартный модуль json.
+        :param metrics:
+            Реестр метрик запросов. По умолчанию используется реестр, установленный с помощью
+            apimoex.metrics.set_default, а при его отсутствии метрики не собираются.
+        :param limit:
+            Запрашиваемый с помощью параметра limit размер блока данных при загрузке по блокам. По умолчанию
+            запрашивается максимально возможный размер. Если None, параметр не передается.
+        """
+        super().__init__(url, query, workers, decoder, metrics, limit)
+        self._session = session
+
+    async def __aiter__(self) -> abc.AsyncIterator[TablesDict]:
+        """Асинхронный генератор по ответам состоящим из нескольких блоков.
+
+        Обрабатывает ответы как с курсором, так и без него аналогично ISSClient.
+        """
+        previous: int | None = None
+        start: int | None = 0
+        while start is not None:
+            data = await self.get(start)
+            next_start, cursor = self._next_start(data, start)
+            self._learn_page_size(previous, start, next_start, cursor)
+            yield data
+            previous, start = start, next_start
+            if (starts := self._parallel_starts(previous, cursor, next_start)) is None:
+                continue
+            # Неполный блок прерывает конкурентную загрузку, которая продолжается последовательно с его окончания
+            async with contextlib.aclosing(self._get_parallel(starts)) as blocks:
+                positions = iter(starts)
+                async for data, start in blocks:
+                    yield data
+                    if start != (previous := next(positions)) + starts.step:
+                        break
+
+    async def _get_parallel(self, starts: range) -> abc.AsyncIterator[tuple[TablesDict, int | None]]:
+        """Конкурентно загружает блоки данных, начинающиеся с указанных позиций, и выдает их по порядку.
+
+        Вместе с блоком выдается позиция начала следующего за ним блока.
+        """
+        pending: deque[tuple[int, asyncio.Task[TablesDict]]] = deque()
+        try:
+            for start in starts:
+                pending.append((start, asyncio.create_task(self.get(start))))
+                if len(pending) == self._workers:
+                    yield await self._pop_checked(pending)
+            while pending:
+                yield await self._pop_checked(pending)
+        finally:
+            for _, task in pending:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+    async def _pop_checked(
+        self,
+        pending: deque[tuple[int, asyncio.Task[TablesDict]]],
+    ) -> tuple[TablesDict, int | None]:
+        """Дожидается загрузки первого блока в очереди и проверяет его курсор."""
+        start, task = pending.popleft()
+        data = await task
+        next_start, _ = self._next_start(data, start)
+
+        return data, next_start
+
+    async def get(self, start: int | None = None) -> TablesDict:
+        """Загрузка данных.
+
+        :param start:
+            Номер элемента с которого нужно загрузить данные. Используется для дозагрузки данных, состоящих из
+            нескольких блоков. При отсутствии данные загружаются с начального элемента.
+        :return:
+            Блок данных с отброшенной вспомогательной информацией - словарь, каждый ключ которого
+            соответствует одной из таблиц с данными. Таблицы являются списками словарей, которые напрямую конвертируются
+            в pandas.DataFrame. Если такой же блок уже загружается другой сопрограммой в том же цикле событий, запрос не
+            отправляется повторно, а возвращается поверхностная копия загруженного блока. Отмена одной из ожидающих
+            сопрограмм не прерывает загрузку для остальных.
+        """
+        key = self._flight_key(self._session, self._make_query(start))
+        flights = _flights.setdefault(asyncio.get_running_loop(), {})
+        if (flight := flights.get(key)) is None:
+            flights[key] = flight = _Flight(asyncio.create_task(self._load(start)))
+            flight.task.add_done_callback(lambda _: _drop_flight(flights, key, flight))
+        else:
+            flight.shared = True
+        flight.callers += 1
+        try:
+            data = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.callers -= 1
+            if not flight.callers:
+                # Новые такие же запросы не должны присоединяться к отменяемой загрузке
+                _drop_flight(flights, key, flight)
+                flight.task.cancel()
+            raise
+        if not flight.shared:
+            return data
+
+        return client.copy_block(data)
+
+    async def _load(self, start: int | None) -> TablesDict:
+        """Загружает и разбирает блок данных, учитывая метрики при наличии реестра."""
+        if self._metrics is None:
+            content, url = await self._get_content(start)
+            return self._extract_tables(self._decoder(content), url)
+
+        try:
+            started = time.perf_counter()
+            content, url = await self._get_content(start)
+            loaded = time.perf_counter()
+            data = self._extract_tables(self._decoder(content), url)
+        except Exception:
+            self._metrics.count_error(self._endpoint)
+            raise
+        self._metrics.observe_request(self._endpoint, loaded - started, len(content))
+        self._metrics.observe_parse(self._endpoint, time.perf_counter() - loaded, self._count_rows(data))
+
+        return data
+
+    async def _get_content(self, start: int | None) -> tuple[bytes, str]:
+        """Загружает тело ответа и возвращает его вместе с адресом запроса."""
+        query = self._make_query(start)
+        async with self._session.get(self._url, params=query) as respond:
+            try:
+                respond.raise_for_status()
+            except aiohttp.ClientResponseError as err:
+                raise ISSMoexError(self._status_error(respond.status), str(respond.url)) from err
+            else:
+                return await respond.read(), str(respond.url)
+
+    async def get_all(self) -> TablesDict:
+        """Собирает все блоки данных для запросов, ответы на которые выдаются по частям отдельными блоками.
+
+        :return:
+            Объединенные из всех блоков данные с отброшенной вспомогательной информацией - словарь, каждый ключ которого
+            соответствует одной из таблиц с данными. Таблицы являются списками словарей, которые напрямую конвертируются
+            в pandas.DataFrame.
+        """
+        all_data: TablesDict = {}
+        pages = 0
+        async for data in self:
+            pages += 1
+            for key, value in data.items():
+                all_data.setdefault(key, []).extend(value)
+        if self._metrics is not None:
+            self._metrics.observe_pages(self._endpoint, pages)
+
+        return all_data
@@ -0,0 +1,299 @@
+"""Асинхронные варианты запросов к MOEX ISS.
+
+Функции повторяют функции из apimoex.requests, но принимают aiohttp.ClientSession и являются корутинами, что позволяет
+осуществлять большое количество параллельных запросов в рамках одного цикла событий.
+"""
+import aiohttp
+
+from apimoex import client, reference
+from apimoex.async_client import AsyncISSClient
+from apimoex.requests import make_query
+
+__all__ = [
+    "get_reference",
+    "find_securities",
+    "find_security_description",
+    "get_market_candle_borders",
+    "get_board_candle_borders",
+    "get_market_candles",
+    "get_board_candles",
+    "get_board_dates",
+    "get_board_securities",
+    "get_market_history",
+    "get_board_history",
+    "get_index_tickers",
+]
+
+
+async def _get_short_data(
+    session: aiohttp.ClientSession,
+    url: str,
+    table: str,
+    query: client.WebQuery | None = None,
+) -> client.Table:
+    """Получить данные для запроса с выдачей всей информации за раз.
+
+    :param session:
+        Сессия интернет соединения.
+    :param url:
+        URL запроса.
+    :param table:
+        Таблица, которую нужно выбрать.
+    :param query:
+        Дополнительные параметры запроса.
+
+    :return:
+        Конкретная таблица из запроса.
+    """
+    iss = AsyncISSClient(session, url, query)
+    data = await iss.get()
+
+    return client.extract_table(data, table)
+
+
+async def _get_long_data(
+    session: aiohttp.ClientSession,
+    url: str,
+    table: str,
+    query: client.WebQuery | None = None,
+) -> client.Table:
+    """Получить данные для запроса, в котором информация выдается несколькими блоками.
+
+    :param session:
+        Сессия интернет соединения.
+    :param url:
+        URL запроса.
+    :param table:
+        Таблица, которую нужно выбрать.
+    :param query:
+        Дополнительные параметры запроса.
+
+    :return:
+        Конкретная таблица из запроса.
+    """
+    iss = AsyncISSClient(session, url, query)
+    data = await iss.get_all()
+
+    return client.extract_table(data, table)
+
+
+async def get_reference(session: aiohttp.ClientSession, placeholder: str = "boards") -> client.Table:
+    """Асинхронный вариант apimoex.get_reference.
+
+    Использует общий с apimoex.get_reference кеш справочника на уровне процесса.
+    """
+    if (snapshot := reference.cached_snapshot()) is None:
+        snapshot = reference.store_snapshot(await AsyncISSClient(session, reference.URL).get())
+
+    return snapshot.table(placeholder)
+
+
+async def find_securities(
+    session: aiohttp.ClientSession,
+    string: str,
+    columns: tuple[str, ...] | None = ("secid", "regnumber"),
+) -> client.Table:
+    """Асинхронный вариант apimoex.find_securities."""
+    url = "https://iss.moex.com/iss/securities.json"
+    table = "securities"
+    query = make_query(q=string, table=table, columns=columns)
+
+    return await _get_short_data(session, url, table, query)
+
+
+async def find_security_description(
+    session: aiohttp.ClientSession,
+    security: str,
+    columns: tuple[str, ...] | None = ("name", "title", "value"),
+) -> client.Table:
+    """Асинхронный вариант apimoex.find_security_description."""
+    url = f"https://iss.moex.com/iss/securities/{security}.json"
+    table = "description"
+    query = make_query(table=table, columns=columns)
+
+    return await _get_short_data(session, url, table, query)
+
+
+async def get_market_candle_borders(
+    session: aiohttp.ClientSession,
+    security: str,
+    market: str = "shares",
+    engine: str = "stock",
+) -> client.Table:
+    """Асинхронный вариант apimoex.get_market_candle_borders."""
+    url = f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/securities/{security}/candleborders.json"
+    table = "borders"
+
+    return await _get_short_data(session, url, table)
+
+
+async def get_board_candle_borders(
+    session: aiohttp.ClientSession,
+    security: str,
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> client.Table:
+    """Асинхронный вариант apimoex.get_board_candle_borders."""
+    url = (
+        f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/"
+        f"boards/{board}/securities/{security}/candleborders.json"
+    )
+    table = "borders"
+
+    return await _get_short_data(session, url, table)
+
+
+async def get_market_candles(
+    session: aiohttp.ClientSession,
+    security: str,
+    interval: int = 24,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = (
+        "begin",
+        "open",
+        "close",
+        "high",
+        "low",
+        "value",
+        "volume",
+    ),
+    market: str = "shares",
+    engine: str = "stock",
+) -> client.Table:
+    """Асинхронный вариант apimoex.get_market_candles."""
+    url = f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/securities/{security}/candles.json"
+    table = "candles"
+    query = make_query(interval=interval, start=start, end=end, table=table, columns=columns)
+
+    return await _get_long_data(session, url, table, query)
+
+
+async def get_board_candles(
+    session: aiohttp.ClientSession,
+    security: str,
+    interval: int = 24,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = (
+        "begin",
+        "open",
+        "close",
+        "high",
+        "low",
+        "value",
+        "volume",
+    ),
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> client.Table:
+    """Асинхронный вариант apimoex.get_board_candles."""
+    url = (
+        f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/"
+        f"boards/{board}/securities/{security}/candles.json"
+    )
+    table = "candles"
+    query = make_query(interval=interval, start=start, end=end, table=table, columns=columns)
+
+    return await _get_long_data(session, url, table, query)
+
+
+async def get_board_dates(
+    session: aiohttp.ClientSession,
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> client.Table:
+    """Асинхронный вариант apimoex.get_board_dates."""
+    url = f"https://iss.moex.com/iss/history/engines/{engine}/markets/{market}/boards/{board}/dates.json"
+    table = "dates"
+
+    return await _get_short_data(session, url, table)
+
+
+async def get_board_securities(
+    session: aiohttp.ClientSession,
+    table: str = "securities",
+    columns: tuple[str, ...] | None = ("SECID", "REGNUMBER", "LOTSIZE", "SHORTNAME"),
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> client.Table:
+    """Асинхронный вариант apimoex.get_board_securities."""
+    url = f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/boards/{board}/securities.json"
+    query = make_query(table=table, columns=columns)
+
+    return await _get_short_data(session, url, table, query)
+
+
+async def get_market_history(
+    session: aiohttp.ClientSession,
+    security: str,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = (
+        "BOARDID",
+        "TRADEDATE",
+        "CLOSE",
+        "VOLUME",
+        "VALUE",
+    ),
+    market: str = "shares",
+    engine: str = "stock",
+) -> client.Table:
+    """Асинхронный вариант apimoex.get_market_history."""
+    url = f"https://iss.moex.com/iss/history/engines/{engine}/markets/{market}/securities/{security}.json"
+    table = "history"
+    query = make_query(start=start, end=end, table=table, columns=columns)
+
+    return await _get_long_data(session, url, table, query)
+
+
+async def get_board_history(
+    session: aiohttp.ClientSession,
+    security: str,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = (
+        "BOARDID",
+        "TRADEDATE",
+        "CLOSE",
+        "VOLUME",
+        "VALUE",
+    ),
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> client.Table:
+    """Асинхронный вариант apimoex.get_board_history."""
+    url = (
+        f"https://iss.moex.com/iss/history/engines/{engine}/markets/{market}/"
+        f"boards/{board}/securities/{security}.json"
+    )
+    table = "history"
+    query = make_query(start=start, end=end, table=table, columns=columns)
+
+    return await _get_long_data(session, url, table, query)
+
+
+async def get_index_tickers(
+    session: aiohttp.ClientSession,
+    index: str,
+    date: str | None = None,
+    columns: tuple[str, ...] | None = (
+        "ticker",
+        "from",
+        "till",
+        "tradingsession",
+    ),
+    market: str = "index",
+    engine: str = "stock",
+) -> client.Table:
+    """Асинхронный вариант apimoex.get_index_tickers."""
+    url = f"https://iss.moex.com/iss/statistics/engines/{engine}/markets/{market}/analytics/{index}/tickers.json"
+    table = "tickers"
+    query = make_query(date=date, table=table, columns=columns)
+
+    return await _get_short_data(session, url, table, query)
@@ -0,0 +1,155 @@
+"""Кеш ответов MOEX ISS с условными запросами.
+
+Справочные данные, например, перечни бумаг, дат или индексов, меняются редко, поэтому сохраненные ответы повторно
+используются после проверки их актуальности. При наличии в ответе заголовков ETag или Last-Modified следующий запрос
+отправляется с заголовками If-None-Match или If-Modified-Since, и в случае ответа 304 Not Modified используется
+сохраненная копия. Ответы без таких заголовков используются без проверки в течение заданного времени жизни.
+
+Кеш подключается к сессии через ISSAdapter и работает для всех функций-запросов и клиента ISSClient.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict, abc
+from typing import NamedTuple
+
+from requests import structures
+
+__all__ = [
+    "CacheEntry",
+    "HTTPCache",
+]
+
+# Заголовки описывают передачу ответа, а не его содержимое, которое хранится в раскодированном виде
+_TRANSFER_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+
+class CacheEntry(NamedTuple):
+    """Сохраненный ответ MOEX ISS."""
+
+    content: bytes
+    headers: structures.CaseInsensitiveDict[str]
+    stored: float
+    ttl: float
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Заголовки условного запроса для проверки актуальности сохраненного ответа."""
+        validators = {}
+        if etag := self.headers.get("ETag"):
+            validators["If-None-Match"] = etag
+        if last_modified := self.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = last_modified
+
+        return validators
+
+    def is_fresh(self) -> bool:
+        """Можно ли использовать ответ без проверки - только для ответов без ETag и Last-Modified."""
+        return not self.validators and time.monotonic() - self.stored < self.ttl
+
+
+class HTTPCache:
+    """Потокобезопасный кеш ответов в памяти с вытеснением давно не использовавшихся ответов.
+
+    Размер кеша ограничен как количеством ответов, так и их суммарным объемом, поэтому крупные ответы, например, история
+    торгов, не могут занять неограниченный объем памяти. Один кеш можно использовать в нескольких сессиях.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 0,
+        ttls: abc.Mapping[str, float] | None = None,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        """Кеш с заданным временем жизни ответов без заголовков для проверки актуальности.
+
+        :param ttl:
+            Время жизни в секундах ответов без ETag и Last-Modified. По умолчанию такие ответы не сохраняются.
+        :param ttls:
+            Время жизни для отдельных запросов - словарь регулярных выражений, которые ищутся в адресе запроса, и
+            соответствующего времени жизни в секундах. Используется первое совпавшее выражение, а при отсутствии
+            совпадений - ttl.
+        :param max_entries:
+            Максимальное количество сохраненных ответов.
+        :param max_bytes:
+            Максимальный суммарный объем тел сохраненных ответов в байтах. Ответы большего объема не сохраняются.
+        """
+        self._ttl = ttl
+        self._ttls = [(re.compile(pattern), value) for pattern, value in (ttls or {}).items()]
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Количество сохраненных ответов."""
+        with self._lock:
+            return len(self._entries)
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Сохраненный ответ на запрос или None, если его нет."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+
+        return entry
+
+    def store(self, url: str, content: bytes, headers: abc.Mapping[str, str]) -> None:
+        """Сохраняет ответ, если его актуальность можно проверить или для него задано время жизни."""
+        entry = CacheEntry(
+            content,
+            structures.CaseInsensitiveDict(
+                {name: value for name, value in headers.items() if name.lower() not in _TRANSFER_HEADERS},
+            ),
+            time.monotonic(),
+            self._url_ttl(url),
+        )
+        if (entry.validators or entry.ttl > 0) and len(content) <= self._max_bytes:
+            self._put(url, entry)
+
+    def revalidate(self, url: str, headers: abc.Mapping[str, str]) -> CacheEntry | None:
+        """Обновляет сохраненный ответ по заголовкам ответа 304 Not Modified и возвращает его."""
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        stored_headers = entry.headers.copy()
+        stored_headers.update({name: headers[name] for name in ("ETag", "Last-Modified") if name in headers})
+        entry = entry._replace(headers=stored_headers, stored=time.monotonic())
+        self._put(url, entry)
+
+        return entry
+
+    def clear(self) -> None:
+        """Удаляет все сохраненные ответы."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Суммарный объем тел сохраненных ответов в байтах."""
+        with self._lock:
+            return self._size
+
+    def _url_ttl(self, url: str) -> float:
+        """Время жизни ответа на запрос без заголовков для проверки актуальности."""
+        for pattern, ttl in self._ttls:
+            if pattern.search(url):
+                return ttl
+
+        return self._ttl
+
+    def _put(self, url: str, entry: CacheEntry) -> None:
+        """Сохраняет ответ, вытесняя давно не использовавшиеся при превышении размера кеша."""
+        with self._lock:
+            if (old := self._entries.get(url)) is not None:
+                self._size -= len(old.content)
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            self._size += len(entry.content)
+            while len(self._entries) > self._max_entries or self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.content)
@@ -1,23 +1,395 @@
 """Клиент для MOEX ISS."""
-from collections import abc
-from typing import cast
+import contextlib
+import functools
+import json
+import sys
+import threading
+import time
+from collections import abc, deque
+from concurrent import futures
+from typing import Any, Generic, TypeVar, cast
 
 import requests
 
+from apimoex import metrics as iss_metrics
+from apimoex import session as iss_session
+
 Values = str | int | float
 TableRow = dict[str, Values]
 Table = list[TableRow]
 TablesDict = dict[str, Table]
+Column = list[Values]
+Columns = dict[str, Column]
+ColumnsDict = dict[str, Columns]
+Metadata = dict[str, str]
+MetadataDict = dict[str, Metadata]
 WebQuery = dict[str, str | int]
+Decoder = abc.Callable[[bytes], Any]
 
 BASE_QUERY = {"iss.json": "extended", "iss.meta": "off"}
+COMPACT_QUERY = {"iss.json": "compact", "iss.meta": "off"}
+# Запрашиваемый размер блока. MOEX ISS не публикует максимальный limit для запросов, а молча уменьшает запрошенное
+# значение до допустимого - 100 для истории торгов, 500 для свечек. 5000 заведомо больше всех известных пределов,
+# поэтому каждый запрос получает максимальный для него блок
+MAX_LIMIT = 5000
+
+_Block = TypeVar("_Block", TablesDict, ColumnsDict)
+
+
+def _find_decoder() -> Decoder:
+    """Самый быстрый из установленных декодеров json - orjson, msgspec или стандартный json."""
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        return orjson.loads
+
+    try:
+        import msgspec
+    except ImportError:
+        return json.loads
+    else:
+        return msgspec.json.decode
+
+
+DEFAULT_DECODER = _find_decoder()
 
 
 class ISSMoexError(Exception):
     """Базовое исключение."""
 
 
-class ISSClient(abc.Iterable[TablesDict]):
+FlightKey = tuple[int, str, tuple[tuple[str, str], ...]]
+
+
+def copy_block(data: _Block) -> _Block:
+    """Поверхностная копия блока данных - таблицы и столбцы копируются, а строки и значения используются совместно."""
+    copy: dict[str, Any] = {}
+    for name, table in data.items():
+        if isinstance(table, dict):
+            copy[name] = {column: list(values) for column, values in table.items()}
+        else:
+            copy[name] = list(table)
+
+    return cast(_Block, copy)
+
+
+def extract_table(data: TablesDict, table: str) -> Table:
+    """Извлекает конкретную таблицу из блока данных."""
+    try:
+        return data[table]
+    except KeyError as err:
+        raise ISSMoexError(f"Отсутствует таблица {table} в данных") from err
+
+
+class _Flight(Generic[_Block]):
+    """Выполняющийся запрос, результата которого ожидают другие потоки."""
+
+    __slots__ = ("done", "loaded", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.loaded = False
+        self.result: _Block | None = None
+        self.error: Exception | None = None
+        self.waiters = 0
+
+
+class _SingleFlight:
+    """Объединение одновременных одинаковых запросов из разных потоков в один.
+
+    Первый поток выполняет запрос, а остальные дожидаются его завершения и получают поверхностные копии результата или
+    то же исключение. Исключения вроде KeyboardInterrupt и SystemExit относятся только к прерванному потоку, поэтому
+    ожидающие потоки в этом случае выполняют запрос заново. Завершенные запросы не запоминаются, поэтому последующие
+    запросы выполняются заново.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: dict[FlightKey, _Flight[Any]] = {}
+
+    def do(self, key: FlightKey, load: abc.Callable[[], _Block]) -> _Block:
+        """Выполняет запрос или дожидается результата такого же выполняющегося запроса."""
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                if leader := flight is None:
+                    flight = self._flights[key] = _Flight()
+                else:
+                    flight.waiters += 1
+            if leader:
+                break
+
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            if flight.loaded:
+                return copy_block(cast(_Block, flight.result))
+
+        try:
+            flight.result = result = load()
+            flight.loaded = True
+        except Exception as err:
+            flight.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                shared = flight.waiters > 0
+            flight.done.set()
+
+        # Результат, которого никто не ожидает, передается без копирования
+        return copy_block(result) if shared else result
+
+
+_flights = _SingleFlight()
+
+# Фактические размеры блоков для шаблонов адресов и запрошенных размеров блоков
+_page_sizes: dict[tuple[str, str], int] = {}
+
+
+class BaseISSClient:
+    """Общая часть синхронного и асинхронного клиентов для MOEX ISS.
+
+    Хранит параметры запроса, формирует запрос для загрузки отдельного блока данных и разбирает ответы сервера.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        query: WebQuery | None = None,
+        workers: int = 1,
+        decoder: Decoder | None = None,
+        metrics: iss_metrics.Metrics | None = None,
+        limit: int | None = MAX_LIMIT,
+    ) -> None:
+        """Сохраняет параметры запроса.
+
+        :param url:
+            Адрес запроса.
+        :param query:
+            Перечень дополнительных параметров запроса. К списку дополнительных параметров всегда добавляется
+            требование предоставить ответ в виде расширенного json без метаданных.
+        :param workers:
+            Максимальное количество одновременно загружаемых блоков данных.
+        :param decoder:
+            Функция преобразования тела ответа в json.
+        :param metrics:
+            Реестр метрик запросов. По умолчанию используется реестр, установленный с помощью
+            apimoex.metrics.set_default.
+        :param limit:
+            Запрашиваемый размер блока данных.
+        """
+        if workers < 1:
+            raise ISSMoexError(f"Количество одновременно загружаемых блоков должно быть положительным - {workers}")
+        self._url = url
+        self._query = query or {}
+        self._workers = workers
+        self._decoder = decoder or DEFAULT_DECODER
+        self._metrics = metrics or iss_metrics.get_default()
+        self._endpoint = iss_metrics.endpoint(url)
+        self._limit = limit
+
+    def __repr__(self) -> str:
+        """Наименование класса и содержание запроса к ISS Moex."""
+        return f"{self.__class__.__name__}(url={self._url}, query={self._query})"
+
+    @property
+    def page_size(self) -> int | None:
+        """Фактический размер блока данных для шаблона адреса запроса или None, если он еще не известен."""
+        return _page_sizes.get(self._page_key())
+
+    def _page_key(self) -> tuple[str, str]:
+        """Ключ для запоминания фактического размера блока - шаблон адреса и запрашиваемый размер блока."""
+        return self._endpoint, str(self._query.get("limit", self._limit))
+
+    def _make_query(self, start: int | None = None, *, compact: bool = False) -> WebQuery:
+        """К общему набору параметров запроса добавляется требование предоставить ответ в виде расширенного json.
+
+        При необходимости вместо расширенного запрашивается компактный json с отдельными списками наименований столбцов
+        и строк данных. При загрузке блока с указанной позиции начала, если размер блока не указан в параметрах
+        запроса, запрашивается заданный при создании клиента.
+        """
+        query: WebQuery = dict(COMPACT_QUERY if compact else BASE_QUERY)
+        if start is not None and self._limit is not None:
+            query["limit"] = self._limit
+        query.update(self._query)
+        if start:
+            query["start"] = start
+
+        return query
+
+    def _flight_key(self, session: object, query: WebQuery) -> FlightKey:
+        """Ключ для объединения одинаковых запросов - сессия, адрес и упорядоченные параметры запроса.
+
+        Сессии могут использовать разные адаптеры и кеши, поэтому объединяются только запросы через одну сессию.
+        Сессия учитывается по идентификатору, который не может быть переиспользован, пока запрос выполняется.
+        """
+        return id(session), self._url, tuple(sorted((key, str(value)) for key, value in query.items()))
+
+    @staticmethod
+    def _status_error(status: int) -> str:
+        """Описание ошибки по коду ответа.
+
+        Коды 429 и 5xx означают временные ошибки, которые ISSAdapter повторяет, поэтому такой ответ, оставшийся после
+        исчерпания повторов, описывается кодом, а не неверным адресом.
+        """
+        if status in iss_session.RETRY_STATUSES:
+            return f"Временная ошибка MOEX ISS с кодом {status}"
+
+        return "Неверный url"
+
+    @staticmethod
+    def _extract_tables(raw: list[TablesDict], url: str) -> TablesDict:
+        """Отбрасывает вспомогательную информацию из ответа в виде расширенного json."""
+        _, data, *wrong_data = raw
+        if len(wrong_data) != 0:
+            raise ISSMoexError("Ответ содержит некорректные данные", url)
+
+        return data
+
+    @staticmethod
+    def _extract_columns(raw: dict[str, dict[str, list[Any]]], url: str) -> ColumnsDict:
+        """Преобразует таблицы из ответа в виде компактного json в словари столбцов."""
+        data: ColumnsDict = {}
+        for name, table in raw.items():
+            try:
+                columns: list[str] = table["columns"]
+                rows: list[list[Values]] = table["data"]
+            except (KeyError, TypeError) as err:
+                raise ISSMoexError("Ответ содержит некорректные данные", url) from err
+            data[name] = {column: [] for column in columns}
+            try:
+                for column, values in zip(columns, zip(*rows, strict=True), strict=bool(rows)):
+                    data[name][column].extend(values)
+            except ValueError as err:
+                raise ISSMoexError(
+                    f"Строки таблицы {name} имеют разную длину или не соответствуют столбцам", url
+                ) from err
+
+        return data
+
+    @staticmethod
+    def _extract_metadata(raw: dict[str, dict[str, Any]], url: str) -> MetadataDict:
+        """Извлекает типы столбцов таблиц из ответа в виде компактного json с метаданными."""
+        try:
+            return {
+                name: {column: meta["type"] for column, meta in table["metadata"].items()}
+                for name, table in raw.items()
+            }
+        except (KeyError, TypeError, AttributeError) as err:
+            raise ISSMoexError("Ответ содержит некорректные метаданные", url) from err
+
+    @staticmethod
+    def _count_rows(data: TablesDict | ColumnsDict) -> int:
+        """Количество строк во всех таблицах блока данных без учета курсора."""
+        rows = 0
+        for name, table in data.items():
+            if name == "history.cursor":
+                continue
+            if isinstance(table, dict):
+                rows += len(next(iter(table.values()), []))
+            else:
+                rows += len(table)
+
+        return rows
+
+    @staticmethod
+    def _next_position(cursor: Table | None, start: int, block_size: int) -> tuple[int | None, TableRow | None]:
+        """Позиция начала следующего блока данных или None, если блок последний, и проверенный курсор.
+
+        При наличии курсора с положением текущего блока он проверяется и используется для определения положения
+        следующего блока. В противном случае признаком последнего блока служит отсутствие в нем данных.
+        """
+        if cursor is not None:
+            row, *wrong_data = cursor
+            if len(wrong_data) != 0 or row["INDEX"] != start:
+                raise ISSMoexError(f"Некорректные данные history.cursor {cursor} для начальной позиции {start}")
+            start += cast(int, row["PAGESIZE"])
+            if start >= cast(int, row["TOTAL"]):
+                return None, row
+
+            return start, row
+
+        if not block_size:
+            return None, None
+
+        return start + block_size, None
+
+    @staticmethod
+    def _next_start(data: TablesDict, start: int) -> tuple[int | None, TableRow | None]:
+        """Позиция начала следующего блока и курсор для блока в виде словаря таблиц.
+
+        Курсор удаляется из данных. Наименование таблиц с данными может быть любым, поэтому при отсутствии курсора
+        размер блока определяется по первой таблице.
+        """
+        cursor = data.pop("history.cursor", None)
+        block_size = 0 if cursor is not None else len(next(iter(data.values()), []))
+
+        return BaseISSClient._next_position(cursor, start, block_size)
+
+    @staticmethod
+    def _next_columns_start(data: ColumnsDict, start: int) -> tuple[int | None, TableRow | None]:
+        """Позиция начала следующего блока и курсор для блока в виде словаря столбцов.
+
+        Курсор удаляется из данных. При отсутствии курсора размер блока определяется по первому столбцу первой таблицы.
+        """
+        if (cursor := data.pop("history.cursor", None)) is not None:
+            rows = [dict(zip(cursor, row, strict=True)) for row in zip(*cursor.values(), strict=True)]
+
+            return BaseISSClient._next_position(rows, start, 0)
+
+        table = next(iter(data.values()), {})
+
+        return BaseISSClient._next_position(None, start, len(next(iter(table.values()), [])))
+
+    def _parallel_starts(self, start: int, cursor: TableRow | None, next_start: int | None) -> range | None:
+        """Позиции начала оставшихся блоков данных, если их можно загружать параллельно.
+
+        Параллельная загрузка возможна, если разрешено несколько одновременных загрузок и известен размер блока. Если в
+        ответе был курсор, известно и общее количество элементов. Без курсора используется запомненный для шаблона
+        адреса размер блока, если текущий блок ему соответствует, а окончание данных и неполные блоки обнаруживаются
+        при загрузке - в этом случае параллельная загрузка прекращается.
+        """
+        if self._workers == 1 or next_start is None:
+            return None
+        if cursor is not None:
+            return range(next_start, cast(int, cursor["TOTAL"]), cast(int, cursor["PAGESIZE"]))
+        if (page_size := self.page_size) is None or next_start - start != page_size:
+            return None
+
+        return range(next_start, sys.maxsize, page_size)
+
+    def _learn_page_size(
+        self,
+        previous: int | None,
+        start: int,
+        next_start: int | None,
+        cursor: TableRow | None,
+    ) -> None:
+        """Запоминает фактический размер блока для шаблона адреса.
+
+        Размер блока берется из курсора, а при его отсутствии - из размера первого блока, если за ним последовал
+        непустой блок. Окончание данных без курсора по-прежнему определяется только по пустому блоку, так как блок может
+        оказаться неполным не только в конце данных.
+
+        :param previous:
+            Позиция начала предыдущего блока или None для первого блока.
+        :param start:
+            Позиция начала текущего блока.
+        :param next_start:
+            Позиция начала следующего блока или None, если текущий блок последний.
+        :param cursor:
+            Курсор текущего блока.
+        """
+        if cursor is not None:
+            _page_sizes[self._page_key()] = cast(int, cursor["PAGESIZE"])
+        elif previous == 0 and next_start is not None:
+            _page_sizes[self._page_key()] = start
+
+
+class ISSClient(BaseISSClient, abc.Iterable[TablesDict]):
     """Клиент для MOEX ISS.
 
     Для работы клиента необходимо передать requests.Session.
@@ -26,7 +398,16 @@ class ISSClient(abc.Iterable[TablesDict]):
     поддерживается протокол итерируемого для отдельных блоков или метод get_all для их автоматического сбора.
     """
 
-    def __init__(self, session: requests.Session, url: str, query: WebQuery | None = None) -> None:
+    def __init__(
+        self,
+        session: requests.Session,
+        url: str,
+        query: WebQuery | None = None,
+        workers: int = 1,
+        decoder: Decoder | None = None,
+        metrics: iss_metrics.Metrics | None = None,
+        limit: int | None = MAX_LIMIT,
+    ) -> None:
         """MOEX ISS является REST сервером.
 
         Полный перечень запросов и параметров к ним https://iss.moex.com/iss/reference/
@@ -39,14 +420,27 @@ class ISSClient(abc.Iterable[TablesDict]):
         :param query:
             Перечень дополнительных параметров запроса. К списку дополнительных параметров всегда добавляется
             требование предоставить ответ в виде расширенного json без метаданных.
+        :param workers:
+            Максимальное количество одновременно загружаемых блоков данных. Для ответов с курсором после загрузки
+            первого блока известно общее количество элементов, поэтому оставшиеся блоки загружаются параллельно в
+            нескольких потоках, но выдаются по порядку. Ответы без курсора загружаются параллельно, когда для шаблона
+            адреса известен размер блока, до первого неполного блока. По умолчанию блоки загружаются последовательно.
+        :param decoder:
+            Функция преобразования тела ответа в байтах в json. По умолчанию используется orjson или msgspec, если
+            они установлены, что значительно ускоряет разбор больших ответов, или стандартный модуль json.
+        :param metrics:
+            Реестр, в котором учитываются время загрузки и разбора, размер ответов, количество строк, блоков и ошибок.
+            По умолчанию используется реестр, установленный с помощью apimoex.metrics.set_default, а при его
+            отсутствии метрики не собираются.
+        :param limit:
+            Запрашиваемый с помощью параметра limit размер блока данных при загрузке по блокам. По умолчанию
+            запрашивается максимально возможный размер, который MOEX ISS уменьшает до допустимого для конкретного
+            запроса, поэтому длинные ответы загружаются меньшим количеством блоков. Если None, параметр не передается, а
+            размер блока выбирает MOEX ISS. Запросы методов get и get_metadata без указания start отправляются без
+            параметра limit.
         """
+        super().__init__(url, query, workers, decoder, metrics, limit)
         self._session = session
-        self._url = url
-        self._query = query or {}
-
-    def __repr__(self) -> str:
-        """Наименование класса и содержание запроса к ISS Moex."""
-        return f"{self.__class__.__name__}(url={self._url}, query={self._query})"
 
     def __iter__(self) -> abc.Iterator[TablesDict]:
         """Генератор по ответам состоящим из нескольких блоков.
@@ -54,33 +448,78 @@ class ISSClient(abc.Iterable[TablesDict]):
         На часть запросов выдается только начальный блок данных (обычно из 100 элементов). Генератор обеспечивает
         загрузку всех блоков. При этом в ответах на некоторые запросы может содержаться курсор с положением текущего
         блока данных (позволяет сэкономить один запрос). Генератор обеспечивает обработку ответов как с курсором, так и
-        без него.
+        без него. Фактический размер блока запоминается для шаблона адреса и доступен в атрибуте page_size.
 
         Ответ представляет словарь, каждый из ключей которого отдельная таблица с данными. Таблица представлена в виде
         списка словарей, где каждый ключ словаря соответствует отдельному столбцу.
         """
-        start = 0
-        while True:
-            data = self.get(start)
-            if "history.cursor" in data:
-                cursor, *wrong_data = data["history.cursor"]
-                if len(wrong_data) != 0 or cursor["INDEX"] != start:
-                    raise ISSMoexError(
-                        f"Некорректные данные history.cursor {data['history.cursor']} для начальной позиции {start}"
-                    )
-                del data["history.cursor"]
-                yield data
-                start += cast(int, cursor["PAGESIZE"])
-                if start >= cast(int, cursor["TOTAL"]):
-                    return
-            else:
-                # Наименование ключа может быть любым
-                key = next(iter(data))
-                block_size = len(data[key])
-                yield data
-                if not block_size:
-                    return
-                start += block_size
+        return self._iter_blocks(self.get, self._next_start)
+
+    def _iter_blocks(
+        self,
+        get: abc.Callable[[int], _Block],
+        locate: abc.Callable[[_Block, int], tuple[int | None, TableRow | None]],
+    ) -> abc.Iterator[_Block]:
+        """Генератор по блокам данных в расширенном или компактном формате.
+
+        :param get:
+            Функция загрузки блока данных, начинающегося с заданной позиции.
+        :param locate:
+            Функция определения позиции следующего блока данных и курсора, которая удаляет курсор из блока.
+        """
+        previous: int | None = None
+        start: int | None = 0
+        while start is not None:
+            data = get(start)
+            next_start, cursor = locate(data, start)
+            self._learn_page_size(previous, start, next_start, cursor)
+            yield data
+            previous, start = start, next_start
+            if (starts := self._parallel_starts(previous, cursor, next_start)) is None:
+                continue
+            # Неполный блок прерывает параллельную загрузку, которая продолжается последовательно с его окончания
+            with contextlib.closing(self._get_parallel(starts, get, locate)) as blocks:
+                for previous, (data, start) in zip(starts, blocks, strict=False):
+                    yield data
+                    if start != previous + starts.step:
+                        break
+
+    def _get_parallel(
+        self,
+        starts: range,
+        get: abc.Callable[[int], _Block],
+        locate: abc.Callable[[_Block, int], tuple[int | None, TableRow | None]],
+    ) -> abc.Iterator[tuple[_Block, int | None]]:
+        """Параллельно загружает блоки данных, начинающиеся с указанных позиций, и выдает их по порядку.
+
+        Одновременно загружается не больше заданного количества блоков, поэтому в памяти находится ограниченное
+        количество еще не выданных блоков. Курсор каждого блока проверяется и удаляется. Вместе с блоком выдается
+        позиция начала следующего за ним блока.
+        """
+        with futures.ThreadPoolExecutor(max_workers=self._workers) as executor:
+            pending: deque[tuple[int, futures.Future[_Block]]] = deque()
+            try:
+                for start in starts:
+                    pending.append((start, executor.submit(get, start)))
+                    if len(pending) == self._workers:
+                        yield self._pop_checked(pending, locate)
+                while pending:
+                    yield self._pop_checked(pending, locate)
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def _pop_checked(
+        pending: deque[tuple[int, futures.Future[_Block]]],
+        locate: abc.Callable[[_Block, int], tuple[int | None, TableRow | None]],
+    ) -> tuple[_Block, int | None]:
+        """Дожидается загрузки первого блока в очереди, проверяет и удаляет его курсор."""
+        start, future = pending.popleft()
+        data = future.result()
+        next_start, _ = locate(data, start)
+
+        return data, next_start
 
     def get(self, start: int | None = None) -> dict[str, list[dict[str, str | int | float]]]:
         """Загрузка данных.
@@ -91,27 +530,93 @@ class ISSClient(abc.Iterable[TablesDict]):
         :return:
             Блок данных с отброшенной вспомогательной информацией - словарь, каждый ключ которого
             соответствует одной из таблиц с данными. Таблицы являются списками словарей, которые напрямую конвертируются
-            в pandas.DataFrame.
+            в pandas.DataFrame. Если такой же блок уже загружается другим потоком, запрос не отправляется повторно, а
+            возвращается поверхностная копия загруженного блока.
+        """
+        return self._get_block(start, self._extract_tables)
+
+    def get_columns(self, start: int | None = None) -> ColumnsDict:
+        """Загрузка данных в компактном формате.
+
+        Данные запрашиваются в виде компактного json, в котором наименования столбцов не повторяются для каждой строки,
+        что существенно быстрее для больших таблиц.
+
+        :param start:
+            Номер элемента с которого нужно загрузить данные. Используется для дозагрузки данных, состоящих из
+            нескольких блоков. При отсутствии данные загружаются с начального элемента.
+        :return:
+            Блок данных с отброшенной вспомогательной информацией - словарь, каждый ключ которого
+            соответствует одной из таблиц с данными. Таблицы являются словарями, каждый ключ которых соответствует
+            отдельному столбцу со списком значений, и напрямую конвертируются в pandas.DataFrame.
         """
-        query = self._make_query(start)
+        return self._get_block(start, self._extract_columns, compact=True)
+
+    def get_metadata(self) -> MetadataDict:
+        """Загрузка типов столбцов таблиц без данных.
+
+        :return:
+            Словарь, каждый ключ которого соответствует одной из таблиц, а значение - словарю с типами столбцов
+            MOEX ISS: string, date, time, datetime, int32, int64 или double.
+        """
+        query = self._make_query(compact=True) | {"iss.meta": "on", "iss.data": "off"}
+
+        return self._extract_metadata(*self._get_json(query))
+
+    def _get_block(
+        self,
+        start: int | None,
+        extract: abc.Callable[[Any, str], _Block],
+        *,
+        compact: bool = False,
+    ) -> _Block:
+        """Загружает и разбирает блок данных, объединяя одновременные одинаковые запросы из разных потоков.
+
+        Потоки, запросившие блок во время его загрузки другим потоком, получают поверхностные копии загруженного блока.
+
+        :param start:
+            Номер элемента с которого нужно загрузить данные.
+        :param extract:
+            Функция извлечения данных из ответа в виде json.
+        :param compact:
+            Запросить ответ в виде компактного json.
+        """
+        query = self._make_query(start, compact=compact)
+
+        return _flights.do(self._flight_key(self._session, query), functools.partial(self._load_block, query, extract))
+
+    def _load_block(self, query: WebQuery, extract: abc.Callable[[Any, str], _Block]) -> _Block:
+        """Загружает и разбирает блок данных, учитывая метрики при наличии реестра."""
+        if self._metrics is None:
+            return extract(*self._get_json(query))
+
+        try:
+            started = time.perf_counter()
+            content, url = self._get_content(query)
+            loaded = time.perf_counter()
+            data = extract(self._decoder(content), url)
+        except Exception:
+            self._metrics.count_error(self._endpoint)
+            raise
+        self._metrics.observe_request(self._endpoint, loaded - started, len(content))
+        self._metrics.observe_parse(self._endpoint, time.perf_counter() - loaded, self._count_rows(data))
+
+        return data
+
+    def _get_json(self, query: WebQuery) -> tuple[Any, str]:
+        """Загружает ответ в виде json и возвращает его вместе с адресом запроса."""
+        content, url = self._get_content(query)
+
+        return self._decoder(content), url
+
+    def _get_content(self, query: WebQuery) -> tuple[bytes, str]:
+        """Загружает тело ответа и возвращает его вместе с адресом запроса."""
         with self._session.get(self._url, params=query) as respond:
             try:
                 respond.raise_for_status()
             except requests.HTTPError as err:
-                raise ISSMoexError("Неверный url", respond.url) from err
+                raise ISSMoexError(self._status_error(respond.status_code), respond.url) from err
             else:
-                _, data, *wrong_data = respond.json()
-        if len(wrong_data) != 0:
-            raise ISSMoexError("Ответ содержит некорректные данные", respond.url)
-        return data
-
-    def _make_query(self, start: int | None = None) -> WebQuery:
-        """К общему набору параметров запроса добавляется требование предоставить ответ в виде расширенного json."""
-        query: WebQuery = dict(**BASE_QUERY, **self._query)
-        if start:
-            query["start"] = start
-
-        return query
+                return respond.content, respond.url
 
     def get_all(self) -> TablesDict:
         """Собирает все блоки данных для запросов, ответы на которые выдаются по частям отдельными блоками.
@@ -122,9 +627,41 @@ class ISSClient(abc.Iterable[TablesDict]):
             в pandas.DataFrame.
         """
         all_data: TablesDict = {}
+        pages = 0
         for data in self:
+            pages += 1
             # noinspection PyUnresolvedReferences
             for key, value in data.items():
                 all_data.setdefault(key, []).extend(value)
+        if self._metrics is not None:
+            self._metrics.observe_pages(self._endpoint, pages)
+
+        return all_data
+
+    def iter_columns(self) -> abc.Iterator[ColumnsDict]:
+        """Генератор по ответам состоящим из нескольких блоков в компактном формате.
+
+        Аналог итерирования по клиенту, но каждый блок загружается с помощью метода get_columns.
+        """
+        return self._iter_blocks(self.get_columns, self._next_columns_start)
+
+    def get_all_columns(self) -> ColumnsDict:
+        """Собирает все блоки данных в компактном формате, объединяя их по столбцам.
+
+        :return:
+            Объединенные из всех блоков данные с отброшенной вспомогательной информацией - словарь, каждый ключ которого
+            соответствует одной из таблиц с данными. Таблицы являются словарями столбцов со списками значений, которые
+            напрямую конвертируются в pandas.DataFrame.
+        """
+        all_data: ColumnsDict = {}
+        pages = 0
+        for data in self.iter_columns():
+            pages += 1
+            for key, table in data.items():
+                all_table = all_data.setdefault(key, {})
+                for column, values in table.items():
+                    all_table.setdefault(column, []).extend(values)
+        if self._metrics is not None:
+            self._metrics.observe_pages(self._endpoint, pages)
 
         return all_data
@@ -0,0 +1,213 @@
+"""Метрики запросов к MOEX ISS.
+
+Реестр Metrics собирает для каждого шаблона адреса запроса гистограммы времени загрузки и разбора ответов, количества
+блоков в ответах, загружаемых по частям, а также количество байт, строк, ошибок и повторов запросов. Сравнение времени
+загрузки и разбора позволяет понять, что ограничивает скорость работы - сеть, MOEX ISS или разбор ответов.
+
+Реестр передается клиенту ISSClient и адаптеру ISSAdapter или устанавливается по умолчанию для всех клиентов, в том
+числе используемых функциями-запросами, с помощью set_default. Без реестра метрики не собираются, а накладные
+расходы сводятся к проверке его наличия. Собранные значения выгружаются в текстовом формате Prometheus.
+"""
+import bisect
+import math
+import re
+import threading
+from collections import abc
+from urllib import parse
+
+__all__ = [
+    "Metrics",
+    "endpoint",
+    "get_default",
+    "set_default",
+]
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAGES_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0)
+
+# Сегменты адреса после названий плейсхолдеров содержат их значения, которые заменяются для группировки запросов
+_PLACEHOLDER_VALUE = re.compile(
+    r"(/(?:engines|markets|boards|boardgroups|securities|analytics|collections|indices)/)[^/.]+",
+)
+
+
+def endpoint(url: str) -> str:
+    """Шаблон адреса запроса, в котором значения плейсхолдеров заменены на *.
+
+    Например, /iss/engines/*/markets/*/boards/*/securities/*/candles.json для запроса свечек любой бумаги.
+    """
+    return _PLACEHOLDER_VALUE.sub(r"\1*", parse.urlsplit(url).path)
+
+
+class _Histogram:
+    """Гистограмма наблюдений с фиксированными границами интервалов."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Добавляет наблюдение в интервал с ближайшей сверху границей."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Metrics:
+    """Потокобезопасный реестр метрик запросов к MOEX ISS.
+
+    Один реестр можно использовать в нескольких клиентах, адаптерах и потоках.
+    """
+
+    def __init__(
+        self,
+        seconds_buckets: tuple[float, ...] = SECONDS_BUCKETS,
+        pages_buckets: tuple[float, ...] = PAGES_BUCKETS,
+    ) -> None:
+        """Реестр с заданными границами интервалов гистограмм.
+
+        :param seconds_buckets:
+            Возрастающие границы интервалов гистограмм времени загрузки и разбора ответов в секундах.
+        :param pages_buckets:
+            Возрастающие границы интервалов гистограммы количества блоков в ответах, загружаемых по частям.
+        """
+        self._seconds_buckets = seconds_buckets
+        self._pages_buckets = pages_buckets
+        self._histograms: dict[tuple[str, str], _Histogram] = {}
+        self._counters: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def observe_request(self, endpoint_template: str, seconds: float, size: int) -> None:
+        """Учитывает загрузку ответа - время от отправки запроса до получения тела ответа и его размер в байтах."""
+        with self._lock:
+            self._observe("request_seconds", endpoint_template, seconds, self._seconds_buckets)
+            self._add("response_bytes_total", endpoint_template, size)
+
+    def observe_parse(self, endpoint_template: str, seconds: float, rows: int) -> None:
+        """Учитывает разбор ответа - время преобразования тела ответа в таблицы и количество строк в них."""
+        with self._lock:
+            self._observe("parse_seconds", endpoint_template, seconds, self._seconds_buckets)
+            self._add("rows_total", endpoint_template, rows)
+
+    def observe_pages(self, endpoint_template: str, pages: int) -> None:
+        """Учитывает количество блоков, из которых был собран ответ."""
+        with self._lock:
+            self._observe("pages", endpoint_template, pages, self._pages_buckets)
+
+    def count_error(self, endpoint_template: str) -> None:
+        """Учитывает запрос, завершившийся ошибкой."""
+        with self._lock:
+            self._add("errors_total", endpoint_template, 1)
+
+    def count_retry(self, endpoint_template: str) -> None:
+        """Учитывает повтор запроса после временной ошибки."""
+        with self._lock:
+            self._add("retries_total", endpoint_template, 1)
+
+    def export(self) -> str:
+        """Значения всех метрик в текстовом формате Prometheus.
+
+        Результат можно отдавать по HTTP для сбора метрик Prometheus или совместимыми системами.
+        """
+        lines: list[str] = []
+        with self._lock:
+            for name, kind, description in _DESCRIPTIONS:
+                if kind == "histogram":
+                    series = [(key[1], value) for key, value in self._histograms.items() if key[0] == name]
+                    lines.extend(_format_histograms(name, description, series))
+                else:
+                    values = [(key[1], value) for key, value in self._counters.items() if key[0] == name]
+                    lines.extend(_format_counters(name, description, values))
+
+        return "".join(f"{line}\n" for line in lines)
+
+    def _observe(self, name: str, endpoint_template: str, value: float, buckets: tuple[float, ...]) -> None:
+        """Добавляет наблюдение в гистограмму, создавая ее при необходимости."""
+        key = (name, endpoint_template)
+        if (histogram := self._histograms.get(key)) is None:
+            histogram = self._histograms[key] = _Histogram(buckets)
+        histogram.observe(value)
+
+    def _add(self, name: str, endpoint_template: str, value: float) -> None:
+        """Увеличивает значение счетчика."""
+        key = (name, endpoint_template)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+
+_DESCRIPTIONS = (
+    ("request_seconds", "histogram", "Время загрузки ответа MOEX ISS в секундах."),
+    ("parse_seconds", "histogram", "Время разбора ответа MOEX ISS в секундах."),
+    ("pages", "histogram", "Количество блоков в ответах MOEX ISS, загружаемых по частям."),
+    ("response_bytes_total", "counter", "Размер загруженных ответов MOEX ISS в байтах."),
+    ("rows_total", "counter", "Количество строк в загруженных таблицах."),
+    ("errors_total", "counter", "Количество запросов, завершившихся ошибкой."),
+    ("retries_total", "counter", "Количество повторов запросов после временных ошибок."),
+)
+
+
+def _labels(endpoint_template: str, **extra: str) -> str:
+    """Метки временного ряда в формате Prometheus."""
+    labels = {"endpoint": endpoint_template, **extra}
+    escaped = (f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    """Экранирование значения метки в формате Prometheus."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    """Число в формате Prometheus."""
+    if math.isinf(value):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+
+def _format_histograms(name: str, description: str, series: list[tuple[str, _Histogram]]) -> abc.Iterator[str]:
+    """Строки с гистограммами для всех шаблонов адресов запросов."""
+    if not series:
+        return
+    yield f"# HELP apimoex_{name} {description}"
+    yield f"# TYPE apimoex_{name} histogram"
+    for endpoint_template, histogram in sorted(series, key=lambda item: item[0]):
+        cumulative = 0
+        for bound, count in zip((*histogram.buckets, math.inf), histogram.counts, strict=True):
+            cumulative += count
+            labels = _labels(endpoint_template, le=_format_number(bound))
+            yield f"apimoex_{name}_bucket{labels} {cumulative}"
+        yield f"apimoex_{name}_sum{_labels(endpoint_template)} {_format_number(histogram.sum)}"
+        yield f"apimoex_{name}_count{_labels(endpoint_template)} {cumulative}"
+
+
+def _format_counters(name: str, description: str, values: list[tuple[str, float]]) -> abc.Iterator[str]:
+    """Строки со счетчиками для всех шаблонов адресов запросов."""
+    if not values:
+        return
+    yield f"# HELP apimoex_{name} {description}"
+    yield f"# TYPE apimoex_{name} counter"
+    for endpoint_template, value in sorted(values):
+        yield f"apimoex_{name}{_labels(endpoint_template)} {_format_number(value)}"
+
+
+_default: Metrics | None = None
+
+
+def set_default(metrics: Metrics | None) -> None:
+    """Устанавливает реестр, который используется клиентами и адаптерами, созданными без явного указания реестра.
+
+    :param metrics:
+        Реестр метрик или None для отключения сбора метрик по умолчанию.
+    """
+    global _default  # noqa: PLW0603
+
+    _default = metrics
+
+
+def get_default() -> Metrics | None:
+    """Реестр метрик по умолчанию или None, если метрики по умолчанию не собираются."""
+    return _default
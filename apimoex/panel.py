@@ -0,0 +1,175 @@
+"""Построение панелей дата × бумага из истории торгов нескольких бумаг.
+
+Истории торгов отдельных бумаг по мере поступления преобразуются в компактные массивы numpy, поэтому списки словарей
+не нужно держать в памяти одновременно. После обработки всех историй строится общий упорядоченный перечень дат торгов, а
+для каждого поля заполняется заранее созданная матрица одной векторной операцией, что быстрее и экономнее по памяти,
+чем pandas.DataFrame.pivot.
+
+Для работы необходим numpy, который устанавливается вместе с дополнительной зависимостью apimoex[numpy].
+"""
+from collections import abc
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+import requests
+
+from apimoex import client, parallel
+
+__all__ = [
+    "Panel",
+    "build_panel",
+    "get_board_history_panel",
+]
+
+_FIELDS = ("CLOSE", "VOLUME", "VALUE")
+
+
+class Panel(NamedTuple):
+    """Панель значений полей истории торгов.
+
+    Для каждого поля хранится матрица, строки которой соответствуют датам, а столбцы - бумагам. Отсутствующие значения
+    равны NaN.
+    """
+
+    dates: npt.NDArray[np.datetime64]
+    securities: tuple[str, ...]
+    fields: dict[str, npt.NDArray[np.float64]]
+
+
+class _Part(NamedTuple):
+    """История торгов одной бумаги в виде массивов."""
+
+    security: str
+    dates: npt.NDArray[np.datetime64]
+    boards: list[str]
+    columns: dict[str, npt.NDArray[np.float64]]
+
+
+def _to_part(security: str, table: client.Table, fields: tuple[str, ...]) -> _Part:
+    """Преобразует историю торгов бумаги в массивы."""
+    try:
+        dates = np.array([row["TRADEDATE"] for row in table], dtype="datetime64[D]")
+    except KeyError as err:
+        raise client.ISSMoexError(f"Для построения панели необходим столбец TRADEDATE - {security}") from err
+    boards = [str(row.get("BOARDID", "")) for row in table]
+    columns = {field: np.array([row.get(field) for row in table], dtype=np.float64) for field in fields}
+
+    return _Part(security, dates, boards, columns)
+
+
+def _iter_tables(
+    tables: abc.Mapping[str, client.Table] | abc.Iterable[parallel.SecurityData],
+) -> abc.Iterator[tuple[str, client.Table]]:
+    """Пары тикеров и историй торгов с проверкой ошибок загрузки."""
+    if isinstance(tables, abc.Mapping):
+        yield from tables.items()
+        return
+
+    for security, data, error in tables:
+        if error is not None:
+            raise client.ISSMoexError(f"Ошибка загрузки истории торгов {security}") from error
+        yield security, data
+
+
+def build_panel(
+    tables: abc.Mapping[str, client.Table] | abc.Iterable[parallel.SecurityData],
+    fields: tuple[str, ...] = _FIELDS,
+    boards: tuple[str, ...] | None = None,
+) -> Panel:
+    """Строит панель дата × бумага для каждого поля из историй торгов нескольких бумаг.
+
+    Если у бумаги несколько строк за одну дату в разных режимах торгов, используется строка режима торгов с наибольшим
+    приоритетом, поэтому результат не зависит от порядка строк и историй.
+
+    :param tables:
+        Словарь историй торгов с тикерами в качестве ключей или итератор результатов get_board_history_many.
+        Итератор обрабатывается по мере поступления результатов, а ошибка загрузки любой из бумаг вызывает исключение.
+        Истории должны содержать столбец TRADEDATE.
+    :param fields:
+        Поля, для которых строятся матрицы, - по умолчанию цена закрытия и объем в штуках и стоимости.
+    :param boards:
+        Режимы торгов в порядке убывания приоритета. Строки других режимов торгов не используются. По умолчанию
+        используются все режимы торгов с приоритетом в алфавитном порядке.
+
+    :return:
+        Панель с упорядоченными датами торгов, упорядоченными тикерами и матрицами значений полей.
+    """
+    parts = sorted(
+        (_to_part(security, table, fields) for security, table in _iter_tables(tables)),
+        key=lambda part: part.security,
+    )
+    securities = tuple(part.security for part in parts)
+    if len(set(securities)) != len(securities):
+        raise client.ISSMoexError(f"Повторяющиеся тикеры в историях торгов - {securities}")
+
+    if not parts:
+        return Panel(np.array([], dtype="datetime64[D]"), (), {field: np.empty((0, 0)) for field in fields})
+
+    all_boards = [board for part in parts for board in part.boards]
+    priority = {board: n for n, board in enumerate(boards if boards is not None else sorted(set(all_boards)))}
+    ranks = np.array([priority.get(board, -1) for board in all_boards], dtype=np.int64)
+    security_index = np.repeat(np.arange(len(parts)), [len(part.dates) for part in parts])
+    # Даты торгов определяются только по строкам используемых режимов торгов
+    used = np.flatnonzero(ranks >= 0)
+    dates, date_index = np.unique(np.concatenate([part.dates for part in parts])[used], return_inverse=True)
+
+    # Из нескольких строк для одной ячейки панели выбирается строка режима торгов с наибольшим приоритетом
+    cells = date_index * len(parts) + security_index[used]
+    order = np.lexsort((ranks[used], cells))
+    cells = cells[order]
+    first = np.ones(len(cells), dtype=bool)
+    first[1:] = cells[1:] != cells[:-1]
+    rows, cells = used[order[first]], cells[first]
+
+    matrices = {}
+    for field in fields:
+        column = np.concatenate([part.columns[field] for part in parts])
+        matrix = np.full((len(dates), len(parts)), np.nan)
+        matrix.flat[cells] = column[rows]
+        matrices[field] = matrix
+
+    return Panel(dates, securities, matrices)
+
+
+def get_board_history_panel(
+    session: requests.Session,
+    securities: abc.Iterable[str],
+    start: str | None = None,
+    end: str | None = None,
+    fields: tuple[str, ...] = _FIELDS,
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+    workers: int = 8,
+) -> Panel:
+    """Получить панель дата × бумага истории торгов нескольких бумаг в указанном режиме торгов.
+
+    Истории загружаются параллельно с помощью get_board_history_many и преобразуются в массивы по мере загрузки.
+
+    :param session:
+        Сессия интернет соединения.
+    :param securities:
+        Тикеры ценных бумаг.
+    :param start:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены с начала истории.
+    :param end:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены до конца истории.
+    :param fields:
+        Поля, для которых строятся матрицы, - по умолчанию цена закрытия и объем в штуках и стоимости.
+    :param board:
+        Режим торгов - по умолчанию основной режим торгов T+2.
+    :param market:
+        Рынок - по умолчанию акции.
+    :param engine:
+        Движок - по умолчанию акции.
+    :param workers:
+        Количество одновременных загрузок.
+
+    :return:
+        Панель с упорядоченными датами торгов, упорядоченными тикерами и матрицами значений полей.
+    """
+    columns = ("BOARDID", "TRADEDATE", *fields)
+    results = parallel.get_board_history_many(session, securities, start, end, columns, board, market, engine, workers)
+
+    return build_panel(results, fields, (board,))
@@ -0,0 +1,510 @@
+"""Параллельная загрузка больших объемов данных с MOEX ISS.
+
+Функции разбивают загрузку на независимые части, которые загружаются одновременно в нескольких потоках с помощью
+функций-запросов из apimoex.requests, и собирают результат.
+"""
+import datetime
+import itertools
+import threading
+import time
+from collections import abc
+from concurrent import futures
+from typing import NamedTuple
+
+import requests
+
+from apimoex import client
+from apimoex import requests as iss_requests
+
+__all__ = [
+    "SecurityData",
+    "get_market_candles_sharded",
+    "get_board_candles_sharded",
+    "get_board_candles_many",
+    "get_board_history_many",
+    "get_board_history_by_dates",
+    "find_ticker_lineage",
+    "get_market_history_stitched",
+]
+
+_CANDLE_COLUMNS = ("begin", "open", "close", "high", "low", "value", "volume")
+_HISTORY_COLUMNS = ("BOARDID", "TRADEDATE", "CLOSE", "VOLUME", "VALUE")
+_BY_DATE_COLUMNS = ("BOARDID", "TRADEDATE", "SECID", "CLOSE", "VOLUME", "VALUE")
+_LINEAGE_TTL = 24 * 60 * 60
+
+_lineage_lock = threading.Lock()
+_lineages: dict[str, tuple[float, tuple[str, ...]]] = {}
+
+
+class SecurityData(NamedTuple):
+    """Результат загрузки данных для одной бумаги.
+
+    В случае ошибки загрузки таблица с данными пустая, а ошибка сохраняется для последующего анализа.
+    """
+
+    security: str
+    data: client.Table
+    error: Exception | None = None
+
+
+def _split_dates(start: str, end: str, shards: int) -> list[tuple[str, str]]:
+    """Разбивает интервал дат на не более чем shards непересекающихся интервалов примерно равной длины.
+
+    :param start:
+        Дата вида ГГГГ-ММ-ДД - начало интервала.
+    :param end:
+        Дата вида ГГГГ-ММ-ДД - конец интервала включительно.
+    :param shards:
+        Максимальное количество интервалов.
+
+    :return:
+        Список пар дат начала и конца интервалов включительно.
+    """
+    first = datetime.date.fromisoformat(start)
+    days = (datetime.date.fromisoformat(end) - first).days + 1
+    shards = min(shards, days)
+    borders = [first + datetime.timedelta(days=days * n // shards) for n in range(shards + 1)]
+
+    return [
+        (str(begin), str(next_begin - datetime.timedelta(days=1))) for begin, next_begin in itertools.pairwise(borders)
+    ]
+
+
+def _stitch(parts: abc.Iterable[client.Table], key: str) -> client.Table:
+    """Последовательно объединяет таблицы, отбрасывая строки на стыках, которые уже есть в предыдущих таблицах.
+
+    Строки каждой таблицы должны быть упорядочены по ключу.
+    """
+    data: client.Table = []
+    for part in parts:
+        last = str(data[-1][key]) if data else ""
+        data.extend(row for row in part if str(row[key]) > last)
+
+    return data
+
+
+def get_many(
+    load: abc.Callable[[str], client.Table],
+    securities: abc.Iterable[str],
+    workers: int,
+) -> abc.Iterator[SecurityData]:
+    """Параллельно загружает данные для нескольких бумаг и выдает результаты по мере готовности.
+
+    Ошибка загрузки данных для одной из бумаг, в том числе ошибка разбора неожиданного ответа MOEX ISS, не прерывает
+    загрузку остальных - прерывают ее только исключения вроде KeyboardInterrupt и SystemExit.
+
+    :param load:
+        Функция загрузки данных для бумаги по ее тикеру.
+    :param securities:
+        Тикеры ценных бумаг.
+    :param workers:
+        Количество одновременных загрузок.
+
+    :return:
+        Итератор результатов с тикером, загруженными данными и ошибкой загрузки, если она произошла.
+    """
+    executor = futures.ThreadPoolExecutor(max_workers=workers)
+    try:
+        jobs = {executor.submit(load, security): security for security in securities}
+        for job in futures.as_completed(jobs):
+            match job.exception():
+                case None:
+                    yield SecurityData(jobs[job], job.result())
+                case Exception() as err:
+                    yield SecurityData(jobs[job], [], err)
+                case err:
+                    raise err
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _get_candles_sharded(
+    load: abc.Callable[[str, str], client.Table],
+    load_borders: abc.Callable[[], client.Table],
+    interval: int,
+    start: str | None,
+    end: str | None,
+    columns: tuple[str, ...] | None,
+    workers: int,
+) -> client.Table:
+    """Загружает свечи параллельно по интервалам дат внутри доступного для свечей диапазона.
+
+    :param load:
+        Функция загрузки свечей за интервал дат.
+    :param load_borders:
+        Функция загрузки таблицы интервалов доступных дат для свечей различного размера.
+    :param interval:
+        Размер свечки.
+    :param start:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены с начала истории.
+    :param end:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены до конца истории.
+    :param columns:
+        Кортеж столбцов, которые нужно загрузить.
+    :param workers:
+        Количество параллельных загрузок.
+
+    :return:
+        Свечи за весь интервал дат без повторов на стыках отдельных загрузок.
+    """
+    if columns and "begin" not in columns:
+        raise client.ISSMoexError(f"Для параллельной загрузки свечей необходим столбец begin - {columns}")
+    borders = [row for row in load_borders() if row["interval"] == interval]
+    if not borders:
+        return []
+
+    first = min(str(row["begin"])[:10] for row in borders)
+    if start is not None:
+        first = max(first, start)
+    last = max(str(row["end"])[:10] for row in borders)
+    if end is not None:
+        last = min(last, end)
+    if first > last:
+        return []
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        parts = executor.map(lambda dates: load(*dates), _split_dates(first, last, workers))
+
+        return _stitch(parts, "begin")
+
+
+def get_market_candles_sharded(
+    session: requests.Session,
+    security: str,
+    interval: int = 24,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = _CANDLE_COLUMNS,
+    market: str = "shares",
+    engine: str = "stock",
+    workers: int = 8,
+) -> client.Table:
+    """Получить свечи на рынке аналогично get_market_candles, загружая интервал дат по частям параллельно.
+
+    Запросы свечек не содержат курсор, поэтому блоки данных одного запроса можно загружать только последовательно.
+    С помощью get_market_candle_borders определяется фактический интервал дат со свечами, который разбивается на
+    несколько частей, загружаемых одновременно.
+
+    :param session:
+        Сессия интернет соединения.
+    :param security:
+        Тикер ценной бумаги.
+    :param interval:
+        Размер свечки - целое число 1 (1 минута), 10 (10 минут), 60 (1 час), 24 (1 день), 7 (1 неделя), 31 (1 месяц) или
+        4 (1 квартал). По умолчанию дневные данные.
+    :param start:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены с начала истории.
+    :param end:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены до конца истории.
+    :param columns:
+        Кортеж столбцов, которые нужно загрузить - по умолчанию момент начала свечки и HLOCV. Если пустой или None, то
+        загружаются все столбцы. Должен содержать момент начала свечки.
+    :param market:
+        Рынок - по умолчанию акции.
+    :param engine:
+        Движок - по умолчанию акции.
+    :param workers:
+        Количество частей, на которые разбивается интервал дат, и одновременных загрузок.
+
+    :return:
+        Список словарей, которые напрямую конвертируется в pandas.DataFrame.
+    """
+
+    def load(first: str, last: str) -> client.Table:
+        return iss_requests.get_market_candles(session, security, interval, first, last, columns, market, engine)
+
+    def load_borders() -> client.Table:
+        return iss_requests.get_market_candle_borders(session, security, market, engine)
+
+    return _get_candles_sharded(load, load_borders, interval, start, end, columns, workers)
+
+
+def get_board_candles_sharded(
+    session: requests.Session,
+    security: str,
+    interval: int = 24,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = _CANDLE_COLUMNS,
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+    workers: int = 8,
+) -> client.Table:
+    """Получить свечи в режиме торгов аналогично get_board_candles, загружая интервал дат по частям параллельно.
+
+    Запросы свечек не содержат курсор, поэтому блоки данных одного запроса можно загружать только последовательно.
+    С помощью get_board_candle_borders определяется фактический интервал дат со свечами, который разбивается на
+    несколько частей, загружаемых одновременно.
+
+    :param session:
+        Сессия интернет соединения.
+    :param security:
+        Тикер ценной бумаги.
+    :param interval:
+        Размер свечки - целое число 1 (1 минута), 10 (10 минут), 60 (1 час), 24 (1 день), 7 (1 неделя), 31 (1 месяц) или
+        4 (1 квартал). По умолчанию дневные данные.
+    :param start:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены с начала истории.
+    :param end:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены до конца истории.
+    :param columns:
+        Кортеж столбцов, которые нужно загрузить - по умолчанию момент начала свечки и HLOCV. Если пустой или None, то
+        загружаются все столбцы. Должен содержать момент начала свечки.
+    :param board:
+        Режим торгов - по умолчанию основной режим торгов T+2.
+    :param market:
+        Рынок - по умолчанию акции.
+    :param engine:
+        Движок - по умолчанию акции.
+    :param workers:
+        Количество частей, на которые разбивается интервал дат, и одновременных загрузок.
+
+    :return:
+        Список словарей, которые напрямую конвертируется в pandas.DataFrame.
+    """
+
+    def load(first: str, last: str) -> client.Table:
+        return iss_requests.get_board_candles(session, security, interval, first, last, columns, board, market, engine)
+
+    def load_borders() -> client.Table:
+        return iss_requests.get_board_candle_borders(session, security, board, market, engine)
+
+    return _get_candles_sharded(load, load_borders, interval, start, end, columns, workers)
+
+
+def get_board_candles_many(
+    session: requests.Session,
+    securities: abc.Iterable[str],
+    interval: int = 24,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = _CANDLE_COLUMNS,
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+    workers: int = 8,
+) -> abc.Iterator[SecurityData]:
+    """Получить свечи для нескольких бумаг в указанном режиме торгов, загружая их параллельно.
+
+    Для каждой бумаги вызывается get_board_candles. Все загрузки используют одну сессию и ее пул соединений, поэтому
+    количество одновременных загрузок не должно превышать размер пула соединений сессии.
+
+    :param session:
+        Сессия интернет соединения.
+    :param securities:
+        Тикеры ценных бумаг.
+    :param interval:
+        Размер свечки - целое число 1 (1 минута), 10 (10 минут), 60 (1 час), 24 (1 день), 7 (1 неделя), 31 (1 месяц) или
+        4 (1 квартал). По умолчанию дневные данные.
+    :param start:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены с начала истории.
+    :param end:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены до конца истории.
+    :param columns:
+        Кортеж столбцов, которые нужно загрузить - по умолчанию момент начала свечки и HLOCV. Если пустой или None, то
+        загружаются все столбцы.
+    :param board:
+        Режим торгов - по умолчанию основной режим торгов T+2.
+    :param market:
+        Рынок - по умолчанию акции.
+    :param engine:
+        Движок - по умолчанию акции.
+    :param workers:
+        Количество одновременных загрузок.
+
+    :return:
+        Итератор результатов загрузки для отдельных бумаг в порядке готовности. Ошибка загрузки одной из бумаг не
+        прерывает загрузку остальных и сохраняется в результате.
+    """
+
+    def load(security: str) -> client.Table:
+        return iss_requests.get_board_candles(session, security, interval, start, end, columns, board, market, engine)
+
+    return get_many(load, securities, workers)
+
+
+def get_board_history_many(
+    session: requests.Session,
+    securities: abc.Iterable[str],
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = _HISTORY_COLUMNS,
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+    workers: int = 8,
+) -> abc.Iterator[SecurityData]:
+    """Получить историю торгов для нескольких бумаг в указанном режиме торгов, загружая их параллельно.
+
+    Для каждой бумаги вызывается get_board_history. Все загрузки используют одну сессию и ее пул соединений, поэтому
+    количество одновременных загрузок не должно превышать размер пула соединений сессии.
+
+    :param session:
+        Сессия интернет соединения.
+    :param securities:
+        Тикеры ценных бумаг.
+    :param start:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены с начала истории.
+    :param end:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены до конца истории.
+    :param columns:
+        Кортеж столбцов, которые нужно загрузить - по умолчанию режим торгов, дата торгов, цена закрытия и объем в
+        штуках и стоимости. Если пустой или None, то загружаются все столбцы.
+    :param board:
+        Режим торгов - по умолчанию основной режим торгов T+2.
+    :param market:
+        Рынок - по умолчанию акции.
+    :param engine:
+        Движок - по умолчанию акции.
+    :param workers:
+        Количество одновременных загрузок.
+
+    :return:
+        Итератор результатов загрузки для отдельных бумаг в порядке готовности. Ошибка загрузки одной из бумаг не
+        прерывает загрузку остальных и сохраняется в результате.
+    """
+
+    def load(security: str) -> client.Table:
+        return iss_requests.get_board_history(session, security, start, end, columns, board, market, engine)
+
+    return get_many(load, securities, workers)
+
+
+def get_board_history_by_dates(
+    session: requests.Session,
+    start: str,
+    end: str,
+    columns: tuple[str, ...] | None = _BY_DATE_COLUMNS,
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+    workers: int = 8,
+    trading_dates: abc.Iterable[str] | None = None,
+) -> client.Table:
+    """Получить историю торгов для всех бумаг в указанном режиме торгов за интервал дат, загружая даты параллельно.
+
+    Для каждой даты интервала вызывается get_board_history_by_date, поэтому количество запросов зависит от количества
+    дат, а не бумаг. Если даты торгов не переданы, интервал ограничивается датами, доступными в истории режима торгов, и
+    загружаются все его календарные даты - около 365 запросов за год, из которых примерно треть приходится на дни без
+    торгов и возвращает пустой ответ из одного блока. Передача дат торгов, например, столбца TRADEDATE истории торгов
+    ликвидной бумаги или индекса, избавляет от этих запросов. Все загрузки используют одну сессию и ее пул соединений,
+    поэтому количество одновременных загрузок не должно превышать размер пула соединений сессии.
+
+    :param session:
+        Сессия интернет соединения.
+    :param start:
+        Дата вида ГГГГ-ММ-ДД - начало интервала.
+    :param end:
+        Дата вида ГГГГ-ММ-ДД - конец интервала включительно.
+    :param columns:
+        Кортеж столбцов, которые нужно загрузить - по умолчанию режим торгов, дата торгов, тикер, цена закрытия и
+        объем в штуках и стоимости. Если пустой или None, то загружаются все столбцы.
+    :param board:
+        Режим торгов - по умолчанию основной режим торгов T+2.
+    :param market:
+        Рынок - по умолчанию акции.
+    :param engine:
+        Движок - по умолчанию акции.
+    :param workers:
+        Количество одновременных загрузок.
+    :param trading_dates:
+        Даты торгов вида ГГГГ-ММ-ДД. Если переданы, загружаются только попадающие в интервал даты из них.
+
+    :return:
+        Список словарей, упорядоченных по датам, которые напрямую конвертируется в pandas.DataFrame.
+    """
+    if trading_dates is not None:
+        dates = sorted({date for date in trading_dates if start <= date <= end})
+    elif board_dates := iss_requests.get_board_dates(session, board, market, engine):
+        first = datetime.date.fromisoformat(max(start, str(board_dates[0]["from"])))
+        days = (datetime.date.fromisoformat(min(end, str(board_dates[0]["till"]))) - first).days + 1
+        dates = [str(first + datetime.timedelta(days=n)) for n in range(days)]
+    else:
+        return []
+
+    def load(date: str) -> client.Table:
+        return iss_requests.get_board_history_by_date(session, date, columns, board, market, engine)
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(itertools.chain.from_iterable(executor.map(load, dates)))
+
+
+def find_ticker_lineage(session: requests.Session, reg_number: str, ttl: float = _LINEAGE_TTL) -> tuple[str, ...]:
+    """Получить все тикеры эмитента, в том числе предыдущие, по номеру государственной регистрации.
+
+    Результат кешируется, поэтому повторные запросы для того же номера не обращаются к MOEX ISS.
+
+    :param session:
+        Сессия интернет соединения.
+    :param reg_number:
+        Номер государственной регистрации.
+    :param ttl:
+        Максимальный возраст закешированного результата в секундах - по умолчанию одни сутки.
+
+    :return:
+        Упорядоченный кортеж тикеров с точно совпадающим номером государственной регистрации.
+    """
+    with _lineage_lock:
+        cached = _lineages.get(reg_number)
+    if cached is not None and time.monotonic() - cached[0] <= ttl:
+        return cached[1]
+
+    data = iss_requests.find_securities(session, reg_number, ("secid", "regnumber"))
+    lineage = tuple(sorted({str(row["secid"]) for row in data if row["regnumber"] == reg_number}))
+    with _lineage_lock:
+        _lineages[reg_number] = (time.monotonic(), lineage)
+
+    return lineage
+
+
+def get_market_history_stitched(
+    session: requests.Session,
+    reg_number: str,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = ("BOARDID", "TRADEDATE", "SECID", "CLOSE", "VOLUME", "VALUE"),
+    market: str = "shares",
+    engine: str = "stock",
+    workers: int = 8,
+) -> client.Table:
+    """Получить длинную историю эмитента, объединив истории всех его тикеров, загружая их параллельно.
+
+    Тикеры определяются по номеру государственной регистрации с помощью find_ticker_lineage, а для каждого из них
+    вызывается get_market_history. Истории объединяются в порядке начала торгов тикерами. Если истории пересекаются,
+    даты, которые уже есть в истории предыдущего тикера, отбрасываются из истории следующего.
+
+    :param session:
+        Сессия интернет соединения.
+    :param reg_number:
+        Номер государственной регистрации.
+    :param start:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены с начала истории.
+    :param end:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены до конца истории.
+    :param columns:
+        Кортеж столбцов, которые нужно загрузить - по умолчанию режим торгов, дата торгов, тикер, цена закрытия и объем
+        в штуках и стоимости. Должен содержать дату торгов. Если пустой или None, то загружаются все столбцы.
+    :param market:
+        Рынок - по умолчанию акции.
+    :param engine:
+        Движок - по умолчанию акции.
+    :param workers:
+        Количество одновременных загрузок.
+
+    :return:
+        Список словарей, упорядоченных по датам, которые напрямую конвертируется в pandas.DataFrame.
+    """
+    if columns and "TRADEDATE" not in columns:
+        raise client.ISSMoexError(f"Для объединения историй необходим столбец TRADEDATE - {columns}")
+    lineage = find_ticker_lineage(session, reg_number)
+    if not lineage:
+        raise client.ISSMoexError(f"Отсутствуют тикеры с номером государственной регистрации {reg_number}")
+
+    def load(security: str) -> client.Table:
+        return iss_requests.get_market_history(session, security, start, end, columns, market, engine)
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        parts = [part for part in executor.map(load, lineage) if part]
+
+    return _stitch(sorted(parts, key=lambda part: str(part[0]["TRADEDATE"])), "TRADEDATE")
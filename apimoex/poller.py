@@ -0,0 +1,145 @@
+"""Отслеживание свечей во время торгов с дозагрузкой только новых данных.
+
+При каждом опросе для каждой бумаги запрашиваются свечи, начиная с последней полученной свечки. Последняя свечка
+запрашивается повторно, так как она могла быть не завершена при предыдущем опросе, а в результат попадают только
+новые и изменившиеся свечки. Бумаги опрашиваются параллельно по общему расписанию.
+"""
+import datetime
+import functools
+import threading
+import time
+from collections import abc
+
+import requests
+
+from apimoex import client, parallel
+from apimoex import requests as iss_requests
+
+__all__ = ["CandlePoller"]
+
+_CANDLE_COLUMNS = ("begin", "open", "close", "high", "low", "value", "volume")
+_MOSCOW = datetime.timezone(datetime.timedelta(hours=3))
+
+
+def _changed_rows(data: client.Table, last: client.TableRow | None) -> client.Table:
+    """Свечки, которые начались позже последней полученной, и последняя полученная, если она изменилась."""
+    if last is None:
+        return data
+    begin = str(last["begin"])
+
+    return [row for row in data if str(row["begin"]) > begin or (str(row["begin"]) == begin and row != last)]
+
+
+class CandlePoller:
+    """Опрос свечей для нескольких бумаг в одном режиме торгов с выдачей только новых и изменившихся свечек.
+
+    Последние полученные свечки хранятся в памяти, поэтому каждый опрос загружает только свечки, начиная с последней
+    полученной.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        securities: abc.Iterable[str],
+        interval: int = 1,
+        start: str | None = None,
+        columns: tuple[str, ...] = _CANDLE_COLUMNS,
+        board: str = "TQBR",
+        market: str = "shares",
+        engine: str = "stock",
+        workers: int = 8,
+    ) -> None:
+        """Сохраняет параметры опроса.
+
+        :param session:
+            Сессия интернет соединения.
+        :param securities:
+            Тикеры ценных бумаг.
+        :param interval:
+            Размер свечки - целое число 1 (1 минута), 10 (10 минут), 60 (1 час), 24 (1 день), 7 (1 неделя), 31 (1 месяц)
+            или 4 (1 квартал). По умолчанию минутные данные.
+        :param start:
+            Дата вида ГГГГ-ММ-ДД, начиная с которой загружаются свечки при первом опросе. По умолчанию текущая дата по
+            московскому времени.
+        :param columns:
+            Кортеж столбцов, которые нужно загрузить - по умолчанию момент начала свечки и HLOCV. Должен содержать
+            момент начала свечки.
+        :param board:
+            Режим торгов - по умолчанию основной режим торгов T+2.
+        :param market:
+            Рынок - по умолчанию акции.
+        :param engine:
+            Движок - по умолчанию акции.
+        :param workers:
+            Максимальное количество бумаг, опрашиваемых одновременно.
+        """
+        if "begin" not in columns:
+            raise client.ISSMoexError(f"Для отслеживания свечей необходим столбец begin - {columns}")
+        self._session = session
+        self._securities = tuple(securities)
+        self._interval = interval
+        self._start = start
+        self._columns = columns
+        self._board = board
+        self._market = market
+        self._engine = engine
+        self._workers = workers
+        self._last: dict[str, client.TableRow] = {}
+
+    def poll(self) -> list[parallel.SecurityData]:
+        """Однократно опрашивает все бумаги.
+
+        :return:
+            Список результатов для бумаг, по которым появились новые или изменились последние свечки, в порядке
+            завершения загрузки. Ошибка загрузки по одной из бумаг не прерывает опрос остальных и сохраняется в
+            результате, а при следующем опросе загрузка повторяется с той же свечки.
+        """
+        start = self._start or str(datetime.datetime.now(_MOSCOW).date())
+
+        results = parallel.get_many(functools.partial(self._load, start=start), self._securities, self._workers)
+
+        return [result for result in results if result.data or result.error is not None]
+
+    def watch(
+        self,
+        period: float = 60,
+        stop: threading.Event | None = None,
+    ) -> abc.Iterator[list[parallel.SecurityData]]:
+        """Опрашивает все бумаги по расписанию и выдает результаты опросов с изменениями.
+
+        Опросы начинаются через равные промежутки времени независимо от длительности загрузки. Если опрос длился
+        дольше периода, пропущенные опросы не выполняются.
+
+        :param period:
+            Период опроса в секундах - по умолчанию 1 минута.
+        :param stop:
+            Событие, при установке которого опрос прекращается. По умолчанию опрос продолжается, пока не будет
+            закрыт генератор.
+        """
+        stop = stop or threading.Event()
+        next_poll = time.monotonic()
+        while not stop.is_set():
+            if changes := self.poll():
+                yield changes
+            next_poll = max(next_poll + period, time.monotonic())
+            stop.wait(next_poll - time.monotonic())
+
+    def _load(self, security: str, start: str) -> client.Table:
+        """Загружает свечки бумаги, начиная с последней полученной, и возвращает новые и изменившиеся."""
+        last = self._last.get(security)
+        # Начало загрузки может быть задано не только датой, но и моментом времени начала последней свечки
+        data = iss_requests.get_board_candles(
+            self._session,
+            security,
+            self._interval,
+            str(last["begin"]) if last is not None else start,
+            None,
+            self._columns,
+            self._board,
+            self._market,
+            self._engine,
+        )
+        if data:
+            self._last[security] = data[-1]
+
+        return _changed_rows(data, last)
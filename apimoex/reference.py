@@ -0,0 +1,126 @@
+"""Справочник значений плейсхолдеров в адресах запросов к MOEX ISS.
+
+Справочник загружается одним запросом и кешируется на уровне процесса, поэтому запросы разных плейсхолдеров из
+любых потоков не приводят к повторным загрузкам, пока не истечет время жизни кеша.
+"""
+import threading
+import time
+
+import requests
+
+from apimoex import client
+
+__all__ = [
+    "ISSReference",
+    "get_reference_snapshot",
+]
+
+URL = "https://iss.moex.com/iss/index.json"
+TTL = 60 * 60
+
+
+class ISSReference:
+    """Снимок справочника MOEX ISS со всеми таблицами плейсхолдеров и индексами для быстрого поиска."""
+
+    def __init__(self, tables: client.TablesDict) -> None:
+        """Строит индексы по таблицам справочника.
+
+        :param tables:
+            Таблицы из ответа на запрос справочника - engines, markets, boards, boardgroups, durations, securitytypes,
+            securitygroups, securitycollections.
+        """
+        self._tables = tables
+        markets = {row["id"]: row for row in tables.get("markets", [])}
+        self._boards: dict[str, tuple[str, str]] = {}
+        for row in tables.get("boards", []):
+            if market := markets.get(row["market_id"]):
+                path = (str(market["trade_engine_name"]), str(market["market_name"]))
+                self._boards.setdefault(str(row["boardid"]), path)
+
+    def table(self, placeholder: str) -> client.Table:
+        """Перечень доступных значений плейсхолдера.
+
+        :param placeholder:
+            Наименование плейсхолдера в адресе запроса: engines, markets, boards, boardgroups, durations, securitytypes,
+            securitygroups, securitycollections
+
+        :return:
+            Копия таблицы справочника - список словарей, которые напрямую конвертируется в pandas.DataFrame.
+        """
+        try:
+            table = self._tables[placeholder]
+        except KeyError as err:
+            raise client.ISSMoexError(f"Отсутствует таблица {placeholder} в данных") from err
+
+        return [dict(row) for row in table]
+
+    def board_market(self, board: str) -> tuple[str, str]:
+        """Движок и рынок, к которым относится режим торгов.
+
+        :param board:
+            Режим торгов, например TQBR.
+
+        :return:
+            Пара из названий движка и рынка, которые используются в адресах запросов к MOEX ISS.
+        """
+        try:
+            return self._boards[board]
+        except KeyError as err:
+            raise client.ISSMoexError(f"Отсутствует режим торгов {board} в справочнике") from err
+
+
+# Блокировка загрузки справочника - чтение закешированного справочника выполняется без блокировки
+_lock = threading.Lock()
+_snapshot: tuple[float, ISSReference] | None = None
+
+
+def cached_snapshot(ttl: float = TTL) -> ISSReference | None:
+    """Закешированный справочник или None, если он отсутствует или устарел.
+
+    :param ttl:
+        Максимальный возраст закешированного справочника в секундах.
+    """
+    snapshot = _snapshot
+    if snapshot is None or time.monotonic() - snapshot[0] > ttl:
+        return None
+
+    return snapshot[1]
+
+
+def store_snapshot(tables: client.TablesDict) -> ISSReference:
+    """Сохраняет в кеше справочник, построенный по таблицам из ответа на запрос справочника.
+
+    :param tables:
+        Таблицы из ответа на запрос справочника.
+    """
+    global _snapshot  # noqa: PLW0603
+
+    _snapshot = (time.monotonic(), ISSReference(tables))
+
+    return _snapshot[1]
+
+
+def get_reference_snapshot(session: requests.Session, ttl: float = TTL) -> ISSReference:
+    """Получить закешированный справочник MOEX ISS, загрузив его при отсутствии или устаревании.
+
+    Закешированный справочник выдается без ожидания, а загрузку выполняет только один поток - остальные потоки,
+    которым нужен обновленный справочник, дожидаются ее завершения.
+
+    Описание запроса - https://iss.moex.com/iss/reference/28
+
+    :param session:
+        Сессия интернет соединения.
+    :param ttl:
+        Максимальный возраст закешированного справочника в секундах - по умолчанию один час.
+
+    :return:
+        Снимок справочника, общий для всех потоков процесса.
+    """
+    if (snapshot := cached_snapshot(ttl)) is not None:
+        return snapshot
+
+    with _lock:
+        if (snapshot := cached_snapshot(ttl)) is not None:
+            return snapshot
+
+        return store_snapshot(client.ISSClient(session, URL).get())
@@ -0,0 +1,193 @@
+"""Запись и воспроизведение ответов MOEX ISS для воспроизводимой работы без сети.
+
+Адаптер ReplayAdapter, подключаемый к requests.Session, в режиме записи сохраняет ответы на все запросы в каталог
+Cassette, а в режиме воспроизведения выдает сохраненные ответы без обращения к MOEX ISS. Так как адаптер работает на
+уровне сессии, записывать и воспроизводить можно работу всех функций-запросов и клиента ISSClient, например, для
+повторения расчетов на тех же данных или тестов без доступа к сети.
+
+Тела ответов хранятся в сжатом виде в файлах, названных по хешу их содержимого, поэтому одинаковые ответы на разные
+запросы хранятся один раз. Перечень запросов с хешами ответов хранится в файле index.jsonl, в который каждый новый
+ответ дописывается отдельной строкой.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import abc
+from pathlib import Path
+from typing import Literal, NamedTuple
+from urllib import parse
+
+import requests
+
+from apimoex import client, session
+
+__all__ = [
+    "Cassette",
+    "Recording",
+    "ReplayAdapter",
+]
+
+_INDEX = "index.jsonl"
+_BODIES = "bodies"
+
+
+class Recording(NamedTuple):
+    """Описание записанного ответа."""
+
+    status: int
+    content_type: str
+    sha256: str
+
+
+def request_key(url: str) -> str:
+    """Ключ запроса - адрес с упорядоченными параметрами, который не зависит от их порядка в запросе."""
+    parts = parse.urlsplit(url)
+    query = parse.urlencode(sorted(parse.parse_qsl(parts.query, keep_blank_values=True)))
+
+    return parse.urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+class Cassette:
+    """Каталог с записанными ответами MOEX ISS.
+
+    Запись и чтение потокобезопасны. Прочитанные тела ответов хранятся в памяти, поэтому повторное воспроизведение не
+    требует обращения к диску.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Открывает каталог с записанными ответами, создавая его при необходимости.
+
+        :param path:
+            Путь к каталогу.
+        """
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._index: dict[str, Recording] = {}
+        self._bodies: dict[str, bytes] = {}
+        self._written: set[str] = set()
+        self._lock = threading.Lock()
+        if (index := self._path / _INDEX).exists():
+            with index.open(encoding="utf-8") as file:
+                for line in file:
+                    key, *recording = json.loads(line)
+                    self._index[key] = Recording(*recording)
+
+    def __len__(self) -> int:
+        """Количество записанных запросов."""
+        with self._lock:
+            return len(self._index)
+
+    def __contains__(self, url: object) -> bool:
+        """Записан ли ответ на запрос."""
+        if not isinstance(url, str):
+            return False
+        with self._lock:
+            return request_key(url) in self._index
+
+    def get(self, url: str) -> tuple[Recording, bytes] | None:
+        """Описание и тело записанного ответа на запрос или None, если ответ не записан."""
+        with self._lock:
+            recording = self._index.get(request_key(url))
+            if recording is None:
+                return None
+            if (content := self._bodies.get(recording.sha256)) is None:
+                content = gzip.decompress(self._body_path(recording.sha256).read_bytes())
+                self._bodies[recording.sha256] = content
+
+        return recording, content
+
+    def put(self, url: str, status: int, content_type: str, content: bytes) -> None:
+        """Записывает ответ на запрос, заменяя записанный ранее."""
+        sha256 = hashlib.sha256(content).hexdigest()
+        recording = Recording(status, content_type, sha256)
+        key = request_key(url)
+        with self._lock:
+            if sha256 not in self._written:
+                self._write_body(sha256, content)
+                self._written.add(sha256)
+            if self._index.get(key) != recording:
+                self._index[key] = recording
+                with (self._path / _INDEX).open("a", encoding="utf-8") as file:
+                    file.write(json.dumps([key, *recording], ensure_ascii=False) + "\n")
+
+    def _body_path(self, sha256: str) -> Path:
+        """Путь к файлу с телом ответа."""
+        return self._path / _BODIES / sha256[:2] / f"{sha256}.gz"
+
+    def _write_body(self, sha256: str, content: bytes) -> None:
+        """Сохраняет сжатое тело ответа, если его еще нет на диске."""
+        path = self._body_path(sha256)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_suffix(".tmp")
+        temp.write_bytes(gzip.compress(content, compresslevel=6))
+        temp.replace(path)
+
+
+class ReplayAdapter(session.ISSAdapter):
+    """Транспортный адаптер requests, записывающий и воспроизводящий ответы MOEX ISS.
+
+    Записываются ответы на GET запросы, кроме ответов с временными ошибками. В режиме записи запросы отправляются в
+    MOEX ISS с учетом ограничения частоты и повторов, как в ISSAdapter.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette | str | os.PathLike[str],
+        mode: Literal["record", "replay"] = "replay",
+        *,
+        strict: bool = True,
+        limiter: session.RateLimiter | None = None,
+        retries: int = 5,
+    ) -> None:
+        """Адаптер подключается к сессии с помощью requests.Session.mount.
+
+        :param cassette:
+            Каталог с записанными ответами или путь к нему.
+        :param mode:
+            Режим работы - record для записи ответов MOEX ISS или replay для воспроизведения записанных ответов.
+        :param strict:
+            В режиме воспроизведения запрос, ответ на который не был записан, вызывает ошибку. Иначе такой запрос
+            отправляется в MOEX ISS, а ответ записывается.
+        :param limiter:
+            Ограничитель частоты запросов, отправляемых в MOEX ISS.
+        :param retries:
+            Количество повторов запросов, отправляемых в MOEX ISS.
+        """
+        if mode not in ("record", "replay"):
+            raise client.ISSMoexError(f"Неизвестный режим работы {mode} - допустимы record и replay")
+        super().__init__(limiter, retries=retries)
+        self._cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self._mode = mode
+        self._strict = strict
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,  # noqa: FBT001, FBT002
+        timeout: float | tuple[float, float] | tuple[float, None] | None = None,
+        verify: bool | str = True,  # noqa: FBT002
+        cert: bytes | str | tuple[bytes | str, bytes | str] | None = None,
+        proxies: abc.Mapping[str, str] | None = None,
+    ) -> requests.Response:
+        """Воспроизводит записанный ответ или отправляет запрос в MOEX ISS и записывает ответ."""
+        if request.method != "GET" or request.url is None:
+            return super().send(request, stream, timeout, verify, cert, proxies)
+
+        if self._mode == "replay":
+            if (recorded := self._cassette.get(request.url)) is not None:
+                recording, content = recorded
+                headers = {"Content-Type": recording.content_type} if recording.content_type else {}
+                return self._stored_response(request, content, headers, recording.status)
+            if self._strict:
+                raise client.ISSMoexError(f"Отсутствует записанный ответ на запрос {request.url}")
+
+        response = super().send(request, stream, timeout, verify, cert, proxies)
+        if not stream and response.status_code not in session.RETRY_STATUSES:
+            content_type = response.headers.get("Content-Type", "")
+            self._cassette.put(request.url, response.status_code, content_type, response.content)
+
+        return response
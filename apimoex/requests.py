@@ -5,9 +5,11 @@
     Дополнительное описание https://fs.moex.com/files/6523
 """
 
+from collections import abc
+
 import requests
 
-from apimoex import client
+from apimoex import client, reference
 
 __all__ = [
     "get_reference",
@@ -16,16 +18,21 @@ __all__ = [
     "get_market_candle_borders",
     "get_board_candle_borders",
     "get_market_candles",
+    "iter_market_candles",
     "get_board_candles",
+    "iter_board_candles",
     "get_board_dates",
     "get_board_securities",
     "get_market_history",
+    "iter_market_history",
     "get_board_history",
+    "iter_board_history",
+    "get_board_history_by_date",
     "get_index_tickers",
 ]
 
 
-def _make_query(
+def make_query(
     *,
     q: str | None = None,
     interval: int | None = None,
@@ -76,14 +83,6 @@ def _make_query(
     return query
 
 
-def _get_table(data: client.TablesDict, table: str) -> client.Table:
-    """Извлекает конкретную таблицу из данных."""
-    try:
-        return data[table]
-    except KeyError as err:
-        raise client.ISSMoexError(f"Отсутствует таблица {table} в данных") from err
-
-
 def _get_short_data(
     session: requests.Session,
     url: str,
@@ -107,7 +106,7 @@ def _get_short_data(
     iss = client.ISSClient(session, url, query)
     data = iss.get()
 
-    return _get_table(data, table)
+    return client.extract_table(data, table)
 
 
 def _get_long_data(
@@ -133,7 +132,35 @@ def _get_long_data(
     iss = client.ISSClient(session, url, query)
     data = iss.get_all()
 
-    return _get_table(data, table)
+    return client.extract_table(data, table)
+
+
+def _iter_long_data(
+    session: requests.Session,
+    url: str,
+    table: str,
+    query: client.WebQuery | None = None,
+) -> abc.Iterator[client.Table]:
+    """Генератор по блокам данных для запроса, в котором информация выдается несколькими блоками.
+
+    В отличие от _get_long_data блоки не собираются вместе, поэтому в памяти находится только один блок данных.
+
+    :param session:
+        Сессия интернет соединения.
+    :param url:
+        URL запроса.
+    :param table:
+        Таблица, которую нужно выбрать.
+    :param query:
+        Дополнительные параметры запроса.
+
+    :return:
+        Непустые части конкретной таблицы из отдельных блоков данных.
+    """
+    iss = client.ISSClient(session, url, query)
+    for data in iss:
+        if block := client.extract_table(data, table):
+            yield block
 
 
 def get_reference(session: requests.Session, placeholder: str = "boards") -> list[dict[str, str | int | float]]:
@@ -142,6 +169,9 @@ def get_reference(session: requests.Session, placeholder: str = "boards") -> lis
     Например в описание запроса https://iss.moex.com/iss/reference/32 присутствует следующий адрес
     /iss/engines/[engine]/markets/[market]/boards/[board]/securities с плейсхолдерами engines, markets и boards.
 
+    Все плейсхолдеры загружаются одним запросом, который кешируется на уровне процесса - подробнее в описании
+    get_reference_snapshot.
+
     Описание запроса - https://iss.moex.com/iss/reference/28
 
     :param session:
@@ -153,9 +183,7 @@ def get_reference(session: requests.Session, placeholder: str = "boards") -> lis
     :return:
         Список словарей, которые напрямую конвертируется в pandas.DataFrame.
     """
-    url = "https://iss.moex.com/iss/index.json"
-
-    return _get_short_data(session, url, placeholder)
+    return reference.get_reference_snapshot(session).table(placeholder)
 
 
 def find_securities(
@@ -183,7 +211,7 @@ def find_securities(
     """
     url = "https://iss.moex.com/iss/securities.json"
     table = "securities"
-    query = _make_query(q=string, table=table, columns=columns)
+    query = make_query(q=string, table=table, columns=columns)
 
     return _get_short_data(session, url, table, query)
 
@@ -212,7 +240,7 @@ def find_security_description(
     """
     url = f"https://iss.moex.com/iss/securities/{security}.json"
     table = "description"
-    query = _make_query(table=table, columns=columns)
+    query = make_query(table=table, columns=columns)
 
     return _get_short_data(session, url, table, query)
 
@@ -330,11 +358,45 @@ def get_market_candles(
     """
     url = f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/securities/{security}/candles.json"
     table = "candles"
-    query = _make_query(interval=interval, start=start, end=end, table=table, columns=columns)
+    query = make_query(interval=interval, start=start, end=end, table=table, columns=columns)
 
     return _get_long_data(session, url, table, query)
 
 
+def iter_market_candles(
+    session: requests.Session,
+    security: str,
+    interval: int = 24,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = (
+        "begin",
+        "open",
+        "close",
+        "high",
+        "low",
+        "value",
+        "volume",
+    ),
+    market: str = "shares",
+    engine: str = "stock",
+) -> abc.Iterator[client.Table]:
+    """Получить свечи аналогично get_market_candles по частям по мере их загрузки.
+
+    Параметры совпадают с get_market_candles. В памяти находится только одна часть данных, поэтому их можно
+    обрабатывать или сохранять параллельно с загрузкой, не дожидаясь загрузки всей истории.
+
+    :return:
+        Генератор списков словарей, которые напрямую конвертируется в pandas.DataFrame, - частей таблицы в порядке
+        загрузки.
+    """
+    url = f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/securities/{security}/candles.json"
+    table = "candles"
+    query = make_query(interval=interval, start=start, end=end, table=table, columns=columns)
+
+    return _iter_long_data(session, url, table, query)
+
+
 def get_board_candles(
     session: requests.Session,
     security: str,
@@ -388,11 +450,49 @@ def get_board_candles(
         f"boards/{board}/securities/{security}/candles.json"
     )
     table = "candles"
-    query = _make_query(interval=interval, start=start, end=end, table=table, columns=columns)
+    query = make_query(interval=interval, start=start, end=end, table=table, columns=columns)
 
     return _get_long_data(session, url, table, query)
 
 
+def iter_board_candles(
+    session: requests.Session,
+    security: str,
+    interval: int = 24,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = (
+        "begin",
+        "open",
+        "close",
+        "high",
+        "low",
+        "value",
+        "volume",
+    ),
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> abc.Iterator[client.Table]:
+    """Получить свечи аналогично get_board_candles по частям по мере их загрузки.
+
+    Параметры совпадают с get_board_candles. В памяти находится только одна часть данных, поэтому их можно
+    обрабатывать или сохранять параллельно с загрузкой, не дожидаясь загрузки всей истории.
+
+    :return:
+        Генератор списков словарей, которые напрямую конвертируется в pandas.DataFrame, - частей таблицы в порядке
+        загрузки.
+    """
+    url = (
+        f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/"
+        f"boards/{board}/securities/{security}/candles.json"
+    )
+    table = "candles"
+    query = make_query(interval=interval, start=start, end=end, table=table, columns=columns)
+
+    return _iter_long_data(session, url, table, query)
+
+
 def get_board_dates(
     session: requests.Session,
     board: str = "TQBR",
@@ -452,7 +552,7 @@ def get_board_securities(
         Список словарей, которые напрямую конвертируется в pandas.DataFrame.
     """
     url = f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/boards/{board}/securities.json"
-    query = _make_query(table=table, columns=columns)
+    query = make_query(table=table, columns=columns)
 
     return _get_short_data(session, url, table, query)
 
@@ -499,11 +599,42 @@ def get_market_history(
     """
     url = f"https://iss.moex.com/iss/history/engines/{engine}/markets/{market}/securities/{security}.json"
     table = "history"
-    query = _make_query(start=start, end=end, table=table, columns=columns)
+    query = make_query(start=start, end=end, table=table, columns=columns)
 
     return _get_long_data(session, url, table, query)
 
 
+def iter_market_history(
+    session: requests.Session,
+    security: str,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = (
+        "BOARDID",
+        "TRADEDATE",
+        "CLOSE",
+        "VOLUME",
+        "VALUE",
+    ),
+    market: str = "shares",
+    engine: str = "stock",
+) -> abc.Iterator[client.Table]:
+    """Получить историю по одной бумаге аналогично get_market_history по частям по мере их загрузки.
+
+    Параметры совпадают с get_market_history. В памяти находится только одна часть данных, поэтому их можно
+    обрабатывать или сохранять параллельно с загрузкой, не дожидаясь загрузки всей истории.
+
+    :return:
+        Генератор списков словарей, которые напрямую конвертируется в pandas.DataFrame, - частей таблицы в порядке
+        загрузки.
+    """
+    url = f"https://iss.moex.com/iss/history/engines/{engine}/markets/{market}/securities/{security}.json"
+    table = "history"
+    query = make_query(start=start, end=end, table=table, columns=columns)
+
+    return _iter_long_data(session, url, table, query)
+
+
 def get_board_history(
     session: requests.Session,
     security: str,
@@ -550,7 +681,88 @@ def get_board_history(
         f"boards/{board}/securities/{security}.json"
     )
     table = "history"
-    query = _make_query(start=start, end=end, table=table, columns=columns)
+    query = make_query(start=start, end=end, table=table, columns=columns)
+
+    return _get_long_data(session, url, table, query)
+
+
+def iter_board_history(
+    session: requests.Session,
+    security: str,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = (
+        "BOARDID",
+        "TRADEDATE",
+        "CLOSE",
+        "VOLUME",
+        "VALUE",
+    ),
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> abc.Iterator[client.Table]:
+    """Получить историю торгов аналогично get_board_history по частям по мере их загрузки.
+
+    Параметры совпадают с get_board_history. В памяти находится только одна часть данных, поэтому их можно
+    обрабатывать или сохранять параллельно с загрузкой, не дожидаясь загрузки всей истории.
+
+    :return:
+        Генератор списков словарей, которые напрямую конвертируется в pandas.DataFrame, - частей таблицы в порядке
+        загрузки.
+    """
+    url = (
+        f"https://iss.moex.com/iss/history/engines/{engine}/markets/{market}/"
+        f"boards/{board}/securities/{security}.json"
+    )
+    table = "history"
+    query = make_query(start=start, end=end, table=table, columns=columns)
+
+    return _iter_long_data(session, url, table, query)
+
+
+def get_board_history_by_date(
+    session: requests.Session,
+    date: str,
+    columns: tuple[str, ...] | None = (
+        "BOARDID",
+        "TRADEDATE",
+        "SECID",
+        "CLOSE",
+        "VOLUME",
+        "VALUE",
+    ),
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> client.Table:
+    """Получить историю торгов для всех бумаг в указанном режиме торгов за указанную дату.
+
+    Описание запроса - https://iss.moex.com/iss/reference/64
+
+    В отличие от get_board_history данные по всем бумагам загружаются одним запросом, состоящим из нескольких блоков,
+    поэтому для построения срезов по множеству бумаг требуется значительно меньше запросов.
+
+    :param session:
+        Сессия интернет соединения.
+    :param date:
+        Дата вида ГГГГ-ММ-ДД. Если в указанный день не было торгов, то вернёт пустой список.
+    :param columns:
+        Кортеж столбцов, которые нужно загрузить - по умолчанию режим торгов, дата торгов, тикер, цена закрытия и
+        объем в штуках и стоимости. Если пустой или None, то загружаются все столбцы.
+    :param board:
+        Режим торгов - по умолчанию основной режим торгов T+2.
+    :param market:
+        Рынок - по умолчанию акции.
+    :param engine:
+        Движок - по умолчанию акции.
+
+    :return:
+        Список словарей, которые напрямую конвертируется в pandas.DataFrame.
+    """
+    url = f"https://iss.moex.com/iss/history/engines/{engine}/markets/{market}/boards/{board}/securities.json"
+    table = "history"
+    query = make_query(date=date, table=table, columns=columns)
 
     return _get_long_data(session, url, table, query)
 
@@ -595,6 +807,6 @@ def get_index_tickers(
     """
     url = f"https://iss.moex.com/iss/statistics/engines/{engine}/markets/{market}/" f"analytics/{index}/tickers.json"
     table = "tickers"
-    query = _make_query(date=date, table=table, columns=columns)
+    query = make_query(date=date, table=table, columns=columns)
 
     return _get_short_data(session, url, table, query)
@@ -0,0 +1,166 @@
+"""Построение свечек большего размера из минутных свечек.
+
+Вместо отдельной загрузки свечек каждого размера загружаются только минутные свечки, из которых локально строятся
+свечки размером 10 минут, 1 час, 1 день, 1 неделя, 1 месяц и 1 квартал. Свечки группируются по интервалам,
+выровненным по началу часа, дня, недели (понедельник), месяца и квартала, а дневные свечки включают все сессии одной
+даты. Границы торговых сессий не учитываются, поэтому внутридневная свечка может включать минутные свечки разных
+сессий, если они попадают в один интервал, например, окончание утренней сессии и аукцион открытия основной сессии.
+
+Для работы необходим numpy, который устанавливается вместе с дополнительной зависимостью apimoex[numpy].
+"""
+from collections import abc
+
+import numpy as np
+import numpy.typing as npt
+import requests
+
+from apimoex import client
+from apimoex import requests as iss_requests
+
+__all__ = [
+    "INTERVALS",
+    "resample_candles",
+    "get_board_candles_resampled",
+]
+
+INTERVALS = (10, 60, 24, 7, 31, 4)
+
+_CANDLE_COLUMNS = ("begin", "end", "open", "close", "high", "low", "value", "volume")
+_DAYS_FROM_MONDAY = 3  # 1970-01-01, от которого отсчитываются даты numpy, - четверг
+
+
+def _bucket_starts(begin: npt.NDArray[np.datetime64], interval: int) -> npt.NDArray[np.datetime64]:
+    """Начало интервала, к которому относится каждая минутная свечка.
+
+    Интервалы выравниваются только по календарю и часам без учета границ торговых сессий.
+    """
+    match interval:
+        case 10:
+            minutes = begin.astype("datetime64[m]").astype(np.int64)
+            return (minutes - minutes % 10).astype("datetime64[m]").astype("datetime64[s]")
+        case 60:
+            return begin.astype("datetime64[h]").astype("datetime64[s]")
+        case 24:
+            return begin.astype("datetime64[D]").astype("datetime64[s]")
+        case 7:
+            days = begin.astype("datetime64[D]").astype(np.int64)
+            return (days - (days + _DAYS_FROM_MONDAY) % 7).astype("datetime64[D]").astype("datetime64[s]")
+        case 31:
+            return begin.astype("datetime64[M]").astype("datetime64[s]")
+        case 4:
+            months = begin.astype("datetime64[M]").astype(np.int64)
+            return (months - months % 3).astype("datetime64[M]").astype("datetime64[s]")
+        case _:
+            raise client.ISSMoexError(f"Некорректный размер свечки {interval} - допустимы {INTERVALS}")
+
+
+def _to_strings(moments: npt.NDArray[np.datetime64]) -> list[str]:
+    """Моменты времени в формате MOEX ISS."""
+    return np.char.replace(np.datetime_as_string(moments, unit="s"), "T", " ").tolist()
+
+
+def resample_candles(candles: client.Table, interval: int) -> client.Table:
+    """Строит свечки заданного размера из минутных свечек.
+
+    Цена открытия берется из первой, цена закрытия - из последней минутной свечки интервала, максимум и минимум
+    рассчитываются по всем свечкам интервала, а объемы в штуках и стоимости суммируются. Момент начала свечки
+    соответствует началу интервала, а момент окончания - окончанию последней минутной свечки в интервале.
+
+    :param candles:
+        Минутные свечки, упорядоченные по времени, например, результат get_board_candles с interval=1. Должны
+        содержать момент начала свечки begin.
+    :param interval:
+        Размер свечки - целое число 10 (10 минут), 60 (1 час), 24 (1 день), 7 (1 неделя), 31 (1 месяц) или 4
+        (1 квартал).
+
+    :return:
+        Список словарей со столбцами begin, end, open, close, high, low, value и volume, присутствующими в исходных
+        свечках, который напрямую конвертируется в pandas.DataFrame.
+    """
+    if not candles:
+        return []
+    columns = [column for column in _CANDLE_COLUMNS if column in candles[0]]
+    if "begin" not in columns:
+        raise client.ISSMoexError(f"Для построения свечек необходим столбец begin - {tuple(candles[0])}")
+
+    begin = np.array([row["begin"] for row in candles], dtype="datetime64[s]")
+    buckets = _bucket_starts(begin, interval)
+    if np.any(buckets[1:] < buckets[:-1]):
+        raise client.ISSMoexError("Минутные свечки должны быть упорядочены по времени")
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    lasts = np.concatenate((starts[1:], [len(candles)])) - 1
+
+    data: dict[str, list[client.Values]] = {"begin": _to_strings(buckets[starts])}
+    if "end" in columns:
+        end = np.array([row["end"] for row in candles], dtype="datetime64[s]")
+        data["end"] = _to_strings(end[lasts])
+    for column in columns:
+        if column not in data:
+            values = np.array([row[column] for row in candles], dtype=np.float64)
+            data[column] = _aggregate(column, values, starts, lasts).tolist()
+    if "volume" in data:
+        data["volume"] = [int(volume) for volume in data["volume"]]
+
+    return [dict(zip(columns, row, strict=True)) for row in zip(*(data[column] for column in columns), strict=True)]
+
+
+def _aggregate(
+    column: str,
+    values: npt.NDArray[np.float64],
+    starts: npt.NDArray[np.intp],
+    lasts: npt.NDArray[np.intp],
+) -> npt.NDArray[np.float64]:
+    """Значения столбца свечек, агрегированные по интервалам."""
+    match column:
+        case "open":
+            return values[starts]
+        case "close":
+            return values[lasts]
+        case "high":
+            return np.maximum.reduceat(values, starts)
+        case "low":
+            return np.minimum.reduceat(values, starts)
+        case _:
+            return np.add.reduceat(values, starts)
+
+
+def get_board_candles_resampled(
+    session: requests.Session,
+    security: str,
+    intervals: abc.Iterable[int] = (10, 60, 24),
+    start: str | None = None,
+    end: str | None = None,
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> dict[int, client.Table]:
+    """Получить свечки нескольких размеров, загрузив только минутные свечки.
+
+    :param session:
+        Сессия интернет соединения.
+    :param security:
+        Тикер ценной бумаги.
+    :param intervals:
+        Размеры свечек - 10 (10 минут), 60 (1 час), 24 (1 день), 7 (1 неделя), 31 (1 месяц) или 4 (1 квартал). По
+        умолчанию 10 минут, 1 час и 1 день.
+    :param start:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены с начала истории.
+    :param end:
+        Дата вида ГГГГ-ММ-ДД. При отсутствии данные будут загружены до конца истории.
+    :param board:
+        Режим торгов - по умолчанию основной режим торгов T+2.
+    :param market:
+        Рынок - по умолчанию акции.
+    :param engine:
+        Движок - по умолчанию акции.
+
+    :return:
+        Словарь, ключами которого являются размеры свечек, а значениями - списки словарей, которые напрямую
+        конвертируются в pandas.DataFrame.
+    """
+    intervals = tuple(intervals)
+    if wrong := [interval for interval in intervals if interval not in INTERVALS]:
+        raise client.ISSMoexError(f"Некорректные размеры свечек {wrong} - допустимы {INTERVALS}")
+    candles = iss_requests.get_board_candles(session, security, 1, start, end, _CANDLE_COLUMNS, board, market, engine)
+
+    return {interval: resample_candles(candles, interval) for interval in intervals}
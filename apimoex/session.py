@@ -0,0 +1,316 @@
+"""Настройка сессии интернет соединения для работы с MOEX ISS.
+
+При большом количестве запросов MOEX ISS ограничивает их частоту, отвечая ошибками 429 или 5xx. Адаптер ISSAdapter,
+подключаемый к requests.Session, ограничивает частоту запросов, повторяет запросы, завершившиеся временными ошибками, и
+может повторно использовать сохраненные в HTTPCache ответы. Так как адаптер работает на уровне сессии, его возможности
+доступны всем функциям-запросам и клиенту ISSClient.
+"""
+import datetime
+import email.utils
+import http
+import io
+import random
+import threading
+import time
+from collections import abc
+from typing import NamedTuple
+
+import requests
+import urllib3
+from requests import adapters
+
+from apimoex import cache as iss_cache
+from apimoex import metrics as iss_metrics
+
+__all__ = [
+    "RateLimiter",
+    "ConnectionStats",
+    "ISSAdapter",
+    "make_session",
+]
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RateLimiter:
+    """Ограничитель частоты запросов по алгоритму token bucket.
+
+    Один ограничитель можно использовать в нескольких сессиях и потоках, чтобы ограничить общую частоту запросов.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """Ограничитель с заданной средней частотой и допустимым количеством запросов подряд.
+
+        :param rate:
+            Средняя частота запросов в секунду.
+        :param burst:
+            Количество запросов, которые можно сделать подряд без ожидания после периода простоя.
+        """
+        if rate <= 0:
+            raise ValueError(f"Частота запросов должна быть положительной - {rate}")
+        if burst < 1:
+            raise ValueError(f"Количество запросов подряд должно быть не меньше 1 - {burst}")
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Дожидается разрешения на осуществление запроса."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            # Отрицательное количество токенов соответствует очереди ожидающих запросов
+            self._tokens -= 1
+            wait = max(-self._tokens / self._rate, self._paused_until - now)
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Приостанавливает все запросы, например, в соответствии с заголовком Retry-After."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    """Время ожидания в секундах из заголовка Retry-After, если он есть и корректен."""
+    header = response.headers.get("Retry-After")
+    if header is None:
+        return None
+    if header.strip().isdigit():
+        return float(header)
+    try:
+        moment = email.utils.parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, (moment - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+class ConnectionStats(NamedTuple):
+    """Статистика использования соединений пулами адаптера."""
+
+    requests: int
+    connections: int
+
+    @property
+    def reused(self) -> int:
+        """Количество запросов, отправленных через ранее открытые соединения."""
+        return self.requests - self.connections
+
+
+class ISSAdapter(adapters.HTTPAdapter):
+    """Транспортный адаптер requests с ограничением частоты и повтором запросов при временных ошибках.
+
+    Повторяются запросы, завершившиеся ошибками соединения или ответами с кодами 429 и 5xx. Время ожидания перед
+    повтором берется из заголовка Retry-After, а при его отсутствии растет экспоненциально со случайной составляющей.
+    Ответы с остальными ошибками возвращаются сразу, как и последний ответ после исчерпания попыток.
+
+    При наличии кеша GET запросы, для которых есть сохраненный ответ, отправляются с заголовками условного запроса, и
+    при ответе 304 Not Modified возвращается сохраненная копия с кодом 200. Если сохраненный ответ был вытеснен из кеша
+    за время условного запроса, запрос повторяется без заголовков условного запроса. Сохраненные ответы без ETag и
+    Last-Modified возвращаются без запроса к MOEX ISS, пока не истечет их время жизни.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter | None = None,
+        *,
+        cache: iss_cache.HTTPCache | None = None,
+        metrics: iss_metrics.Metrics | None = None,
+        retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 60,
+        pool_connections: int = adapters.DEFAULT_POOLSIZE,
+        pool_maxsize: int = adapters.DEFAULT_POOLSIZE,
+        pool_block: bool = adapters.DEFAULT_POOLBLOCK,
+    ) -> None:
+        """Адаптер подключается к сессии с помощью requests.Session.mount.
+
+        :param limiter:
+            Ограничитель частоты запросов, который может быть общим для нескольких сессий. По умолчанию частота
+            запросов не ограничивается.
+        :param cache:
+            Кеш ответов, который может быть общим для нескольких сессий. По умолчанию ответы не кешируются.
+        :param metrics:
+            Реестр, в котором учитываются повторы запросов. По умолчанию используется реестр, установленный с помощью
+            apimoex.metrics.set_default.
+        :param retries:
+            Количество повторов запроса.
+        :param backoff:
+            Начальное время ожидания перед повтором в секундах, которое удваивается с каждым повтором.
+        :param max_backoff:
+            Максимальное время ожидания перед повтором в секундах, которое ограничивает и время из заголовка
+            Retry-After.
+        :param pool_connections:
+            Количество кешируемых пулов соединений для разных хостов.
+        :param pool_maxsize:
+            Максимальное количество соединений в пуле для одного хоста.
+        :param pool_block:
+            Ожидать освобождения соединения при исчерпании пула вместо создания нового соединения.
+        """
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self._limiter = limiter
+        self._cache = cache
+        self._metrics = metrics
+        self._retries = retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,  # noqa: FBT001, FBT002
+        timeout: float | tuple[float, float] | tuple[float, None] | None = None,
+        verify: bool | str = True,  # noqa: FBT002
+        cert: bytes | str | tuple[bytes | str, bytes | str] | None = None,
+        proxies: abc.Mapping[str, str] | None = None,
+    ) -> requests.Response:
+        """Отправляет запрос с учетом ограничения частоты и кеша и повторяет его при временных ошибках."""
+        if self._cache is None or stream or request.method != "GET" or request.url is None:
+            return self._send_retrying(request, stream, timeout, verify, cert, proxies)
+
+        url = request.url
+        conditional = request
+        entry = self._cache.lookup(url)
+        if entry is not None:
+            if entry.is_fresh():
+                return self._stored_response(request, entry.content, entry.headers)
+            conditional = request.copy()
+            conditional.headers.update(entry.validators)
+
+        response = self._send_retrying(conditional, stream, timeout, verify, cert, proxies)
+        if response.status_code == http.HTTPStatus.NOT_MODIFIED:
+            response.close()
+            if (entry := self._cache.revalidate(url, response.headers)) is not None:
+                return self._stored_response(conditional, entry.content, entry.headers)
+            # Сохраненный ответ вытеснен другими потоками, пока выполнялся условный запрос
+            response = self._send_retrying(request, stream, timeout, verify, cert, proxies)
+        if response.status_code == http.HTTPStatus.OK:
+            self._cache.store(url, response.content, response.headers)
+
+        return response
+
+    def _send_retrying(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool,  # noqa: FBT001
+        timeout: float | tuple[float, float] | tuple[float, None] | None,
+        verify: bool | str,
+        cert: bytes | str | tuple[bytes | str, bytes | str] | None,
+        proxies: abc.Mapping[str, str] | None,
+    ) -> requests.Response:
+        """Отправляет запрос, повторяя его при временных ошибках."""
+        attempt = 0
+        while True:
+            if self._limiter is not None:
+                self._limiter.acquire()
+            try:
+                response = super().send(request, stream, timeout, verify, cert, proxies)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self._retries:
+                    raise
+                delay = self._delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self._retries:
+                    return response
+                if (delay := _retry_after(response)) is None:
+                    delay = self._delay(attempt)
+                delay = min(delay, self._max_backoff)
+                response.close()
+
+            if (metrics := self._metrics or iss_metrics.get_default()) is not None:
+                metrics.count_retry(iss_metrics.endpoint(request.url or ""))
+            self._wait(delay)
+            attempt += 1
+
+    def _stored_response(
+        self,
+        request: requests.PreparedRequest,
+        content: bytes,
+        headers: abc.Mapping[str, str],
+        status: int = http.HTTPStatus.OK,
+    ) -> requests.Response:
+        """Ответ на запрос, собранный из сохраненной копии тела и заголовков."""
+        raw = urllib3.HTTPResponse(
+            body=io.BytesIO(content),
+            headers=dict(headers),
+            status=status,
+            preload_content=False,
+        )
+
+        return self.build_response(request, raw)
+
+    def _delay(self, attempt: int) -> float:
+        """Экспоненциально растущее время ожидания со случайной составляющей."""
+        delay = min(self._max_backoff, self._backoff * 2**attempt)
+
+        return random.uniform(delay / 2, delay)  # noqa: S311
+
+    def _wait(self, delay: float) -> None:
+        """Ожидание перед повтором, которое при наличии ограничителя распространяется на все запросы."""
+        if self._limiter is None:
+            time.sleep(delay)
+        else:
+            self._limiter.pause(delay)
+
+    def stats(self) -> ConnectionStats:
+        """Количество запросов и открытых для них соединений во всех пулах соединений адаптера.
+
+        Каждое новое соединение требует установки TLS сессии, поэтому при правильно подобранном размере пула количество
+        соединений должно быть значительно меньше количества запросов.
+        """
+        pools = self.poolmanager.pools
+        with pools.lock:
+            keys = list(pools.keys())
+        total_requests = 0
+        total_connections = 0
+        for key in keys:
+            if (pool := pools.get(key)) is not None:
+                total_requests += pool.num_requests
+                total_connections += pool.num_connections
+
+        return ConnectionStats(total_requests, total_connections)
+
+
+def make_session(
+    workers: int = adapters.DEFAULT_POOLSIZE,
+    limiter: RateLimiter | None = None,
+    retries: int = 5,
+    cache: iss_cache.HTTPCache | None = None,
+    metrics: iss_metrics.Metrics | None = None,
+) -> requests.Session:
+    """Создает сессию, настроенную для параллельной работы с MOEX ISS.
+
+    К сессии подключается ISSAdapter с пулом соединений, размер которого соответствует количеству одновременных
+    загрузок, поэтому параллельные загрузки повторно используют открытые соединения, не тратя время на установку новых.
+    При исчерпании пула запрос ожидает освобождения соединения. Ответы запрашиваются в сжатом виде, в том числе в
+    форматах Brotli и Zstandard при установленных библиотеках для их распаковки.
+
+    Статистику использования соединений можно получить с помощью метода stats адаптера, который возвращает
+    session.get_adapter("https://iss.moex.com").
+
+    :param workers:
+        Максимальное количество одновременных запросов, которое определяет размер пула соединений.
+    :param limiter:
+        Ограничитель частоты запросов, который может быть общим для нескольких сессий.
+    :param retries:
+        Количество повторов запросов, завершившихся временными ошибками.
+    :param cache:
+        Кеш ответов, который может быть общим для нескольких сессий.
+    :param metrics:
+        Реестр, в котором учитываются повторы запросов.
+
+    :return:
+        Сессия интернет соединения, которую нужно закрыть после использования.
+    """
+    session = requests.Session()
+    # В отличие от стандартного заголовка requests включает br и zstd, если urllib3 может раскодировать эти форматы
+    session.headers["Accept-Encoding"] = urllib3.util.request.ACCEPT_ENCODING
+    adapter = ISSAdapter(limiter, cache=cache, metrics=metrics, retries=retries, pool_maxsize=workers, pool_block=True)
+    session.mount("https://iss.moex.com", adapter)
+
+    return session
@@ -0,0 +1,171 @@
+"""Локальное хранилище исторических данных MOEX ISS с дозагрузкой новых значений.
+
+Загруженные ранее котировки сохраняются в базе SQLite, а при повторном запросе с MOEX ISS загружается только окончание
+истории, начиная с последней сохраненной даты. Последняя дата загружается повторно, так как данные по ней могли быть
+не окончательными, если торги еще продолжались.
+"""
+import json
+import os
+import sqlite3
+import threading
+
+import requests
+
+from apimoex import client
+from apimoex import requests as iss_requests
+
+__all__ = ["HistoryStore"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    key TEXT NOT NULL,
+    date TEXT NOT NULL,
+    row TEXT NOT NULL,
+    PRIMARY KEY (key, date)
+) WITHOUT ROWID
+"""
+
+
+class HistoryStore:
+    """Хранилище истории торгов и свечек в файле SQLite.
+
+    Данные хранятся отдельно для каждого сочетания движка, рынка, режима торгов, бумаги, размера свечки и набора
+    столбцов. Хранилище можно использовать из нескольких потоков - блокируются только обращения к базе данных, а
+    загрузка с MOEX ISS идет параллельно.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Открывает или создает файл с базой данных.
+
+        :param path:
+            Путь к файлу с базой данных.
+        """
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(_SCHEMA)
+
+    def __enter__(self) -> "HistoryStore":
+        """Хранилище можно использовать в качестве контекстного менеджера."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Закрывает базу данных при выходе из контекста."""
+        self.close()
+
+    def close(self) -> None:
+        """Закрывает базу данных."""
+        with self._lock:
+            self._connection.close()
+
+    def get_board_history(
+        self,
+        session: requests.Session,
+        security: str,
+        columns: tuple[str, ...] | None = (
+            "BOARDID",
+            "TRADEDATE",
+            "CLOSE",
+            "VOLUME",
+            "VALUE",
+        ),
+        board: str = "TQBR",
+        market: str = "shares",
+        engine: str = "stock",
+    ) -> client.Table:
+        """Получить всю историю торгов для указанной бумаги в указанном режиме торгов, дозагрузив новые данные.
+
+        :param session:
+            Сессия интернет соединения.
+        :param security:
+            Тикер ценной бумаги.
+        :param columns:
+            Кортеж столбцов, которые нужно загрузить - по умолчанию режим торгов, дата торгов, цена закрытия и объем в
+            штуках и стоимости. Если пустой или None, то загружаются все столбцы. Должен содержать дату торгов.
+        :param board:
+            Режим торгов - по умолчанию основной режим торгов T+2.
+        :param market:
+            Рынок - по умолчанию акции.
+        :param engine:
+            Движок - по умолчанию акции.
+
+        :return:
+            Список словарей, которые напрямую конвертируется в pandas.DataFrame.
+        """
+        key = _make_key("history", engine, market, board, security, columns)
+        start = self._last_date(key, "TRADEDATE", columns)
+        data = iss_requests.get_board_history(session, security, start, None, columns, board, market, engine)
+
+        return self._update(key, "TRADEDATE", data)
+
+    def get_board_candles(
+        self,
+        session: requests.Session,
+        security: str,
+        interval: int = 24,
+        columns: tuple[str, ...] | None = (
+            "begin",
+            "open",
+            "close",
+            "high",
+            "low",
+            "value",
+            "volume",
+        ),
+        board: str = "TQBR",
+        market: str = "shares",
+        engine: str = "stock",
+    ) -> client.Table:
+        """Получить все свечи указанного инструмента в указанном режиме торгов, дозагрузив новые данные.
+
+        :param session:
+            Сессия интернет соединения.
+        :param security:
+            Тикер ценной бумаги.
+        :param interval:
+            Размер свечки - целое число 1 (1 минута), 10 (10 минут), 60 (1 час), 24 (1 день), 7 (1 неделя), 31 (1 месяц)
+            или 4 (1 квартал). По умолчанию дневные данные.
+        :param columns:
+            Кортеж столбцов, которые нужно загрузить - по умолчанию момент начала свечки и HLOCV. Если пустой или None,
+            то загружаются все столбцы. Должен содержать момент начала свечки.
+        :param board:
+            Режим торгов - по умолчанию основной режим торгов T+2.
+        :param market:
+            Рынок - по умолчанию акции.
+        :param engine:
+            Движок - по умолчанию акции.
+
+        :return:
+            Список словарей, которые напрямую конвертируется в pandas.DataFrame.
+        """
+        key = _make_key(f"candles{interval}", engine, market, board, security, columns)
+        start = self._last_date(key, "begin", columns)
+        data = iss_requests.get_board_candles(session, security, interval, start, None, columns, board, market, engine)
+
+        return self._update(key, "begin", data)
+
+    def _last_date(self, key: str, date_column: str, columns: tuple[str, ...] | None) -> str | None:
+        """Дата последней сохраненной строки, с которой нужно начать дозагрузку, или None, если данных нет."""
+        if columns and date_column not in columns:
+            raise client.ISSMoexError(f"Для хранения данных необходим столбец {date_column} - {columns}")
+        with self._lock:
+            (last,) = self._connection.execute("SELECT MAX(date) FROM rows WHERE key = ?", (key,)).fetchone()
+
+        return last and last[:10]
+
+    def _update(self, key: str, date_column: str, data: client.Table) -> client.Table:
+        """Сохраняет новые строки, заменяя строки с совпадающими датами, и возвращает все сохраненные данные."""
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO rows (key, date, row) VALUES (?, ?, ?)",
+                    ((key, row[date_column], json.dumps(row, ensure_ascii=False)) for row in data),
+                )
+            rows = self._connection.execute("SELECT row FROM rows WHERE key = ? ORDER BY date", (key,)).fetchall()
+
+        return [json.loads(row) for (row,) in rows]
+
+
+def _make_key(kind: str, engine: str, market: str, board: str, security: str, columns: tuple[str, ...] | None) -> str:
+    """Ключ для хранения данных конкретного запроса."""
+    return "/".join((kind, engine, market, board, security, ",".join(columns or ("*",))))
@@ -0,0 +1,262 @@
+"""Компактное хранение таблиц с данными MOEX ISS.
+
+Функции-запросы возвращают таблицы в виде списков словарей, поэтому каждая строка хранит собственный словарь с
+повторяющимися наименованиями столбцов. Таблица RowTable хранит данные по столбцам с общим для всех строк перечнем
+наименований, что в несколько раз сокращает расход памяти для длинных таблиц. Строки создаются при обращении к ним в
+виде кортежей Row, поддерживающих доступ к значениям по наименованию столбца, как и словари.
+"""
+from collections import abc
+from typing import Any, ClassVar, overload
+
+import requests
+
+from apimoex import client
+from apimoex import requests as iss_requests
+
+__all__ = [
+    "Row",
+    "RowTable",
+    "get_table",
+    "get_board_candles_table",
+    "get_board_history_table",
+]
+
+
+class Row(tuple[client.Values, ...]):
+    """Строка таблицы в виде кортежа с доступом к значениям по номеру или наименованию столбца.
+
+    Наименования столбцов хранятся в классе, который создается один раз для каждой таблицы. Атрибут _fields позволяет
+    pandas.DataFrame использовать наименования столбцов так же, как для именованных кортежей.
+    """
+
+    __slots__ = ()
+
+    _fields: ClassVar[tuple[str, ...]] = ()
+    _positions: ClassVar[dict[str, int]] = {}
+
+    @overload
+    def __getitem__(self, key: str) -> client.Values:
+        ...
+
+    @overload
+    def __getitem__(self, key: int) -> client.Values:
+        ...
+
+    @overload
+    def __getitem__(self, key: slice) -> tuple[client.Values, ...]:
+        ...
+
+    def __getitem__(self, key: str | int | slice) -> Any:
+        """Значение по наименованию или номеру столбца."""
+        if isinstance(key, str):
+            try:
+                key = self._positions[key]
+            except KeyError as err:
+                raise KeyError(key) from err
+
+        return super().__getitem__(key)
+
+    def __repr__(self) -> str:
+        """Строка с наименованиями столбцов и значениями."""
+        return f"Row({', '.join(f'{name}={value!r}' for name, value in zip(self._fields, self, strict=True))})"
+
+    def keys(self) -> tuple[str, ...]:
+        """Наименования столбцов."""
+        return self._fields
+
+    def get(self, key: str, default: client.Values | None = None) -> client.Values | None:
+        """Значение по наименованию столбца или значение по умолчанию при его отсутствии."""
+        if key in self._positions:
+            return self[key]
+
+        return default
+
+    def to_dict(self) -> client.TableRow:
+        """Строка в виде словаря, как в результатах функций-запросов."""
+        return dict(zip(self._fields, self, strict=True))
+
+
+def _make_row_type(columns: tuple[str, ...]) -> type[Row]:
+    """Класс строк с заданными наименованиями столбцов."""
+    namespace = {
+        "__slots__": (),
+        "_fields": columns,
+        "_positions": {column: n for n, column in enumerate(columns)},
+    }
+
+    return type("Row", (Row,), namespace)
+
+
+class RowTable(abc.Sequence[Row]):
+    """Таблица с данными, хранящимися по столбцам с общим для всех строк перечнем наименований.
+
+    Поддерживает получение количества строк, итерирование по строкам и доступ к строкам по номеру, а к столбцам - по
+    наименованию. Напрямую конвертируется в pandas.DataFrame.
+    """
+
+    def __init__(self, columns: client.Columns) -> None:
+        """Создает таблицу из столбцов одинаковой длины.
+
+        :param columns:
+            Словарь столбцов со списками значений, например, таблица из результата ISSClient.get_all_columns.
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise client.ISSMoexError(f"Столбцы таблицы имеют разную длину {lengths}")
+        self._columns = columns
+        self._len = lengths.pop() if lengths else 0
+        self._row_type = _make_row_type(tuple(columns))
+
+    @classmethod
+    def from_rows(cls: type["RowTable"], table: client.Table) -> "RowTable":
+        """Создает таблицу из списка словарей, который возвращают функции-запросы.
+
+        :param table:
+            Список словарей с одинаковыми наименованиями столбцов.
+        """
+        if not table:
+            return cls({})
+        columns = tuple(table[0])
+        try:
+            return cls({column: [row[column] for row in table] for column in columns})
+        except KeyError as err:
+            raise client.ISSMoexError(f"Строки таблицы содержат разные столбцы - отсутствует {err}") from err
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """Наименования столбцов."""
+        return self._row_type._fields
+
+    def __len__(self) -> int:
+        """Количество строк."""
+        return self._len
+
+    @overload
+    def __getitem__(self, key: int) -> Row:
+        ...
+
+    @overload
+    def __getitem__(self, key: slice) -> "RowTable":
+        ...
+
+    @overload
+    def __getitem__(self, key: str) -> client.Column:
+        ...
+
+    def __getitem__(self, key: int | slice | str) -> Any:
+        """Строка по номеру, таблица из части строк или столбец по наименованию."""
+        if isinstance(key, str):
+            try:
+                return self._columns[key]
+            except KeyError as err:
+                raise KeyError(key) from err
+        if isinstance(key, slice):
+            return RowTable({column: values[key] for column, values in self._columns.items()})
+        if not -self._len <= key < self._len:
+            raise IndexError(f"Номер строки {key} вне таблицы из {self._len} строк")
+
+        return self._row_type(values[key] for values in self._columns.values())
+
+    def __iter__(self) -> abc.Iterator[Row]:
+        """Строки таблицы."""
+        return map(self._row_type, zip(*self._columns.values(), strict=True))
+
+    def __repr__(self) -> str:
+        """Количество строк и наименования столбцов."""
+        return f"RowTable(rows={self._len}, columns={self.columns})"
+
+    def to_dict(self) -> client.Columns:
+        """Словарь столбцов со списками значений - самый быстрый способ создания pandas.DataFrame."""
+        return dict(self._columns)
+
+    def to_rows(self) -> client.Table:
+        """Таблица в виде списка словарей, как в результатах функций-запросов."""
+        return [row.to_dict() for row in self]
+
+
+def get_table(
+    session: requests.Session,
+    url: str,
+    table: str,
+    query: client.WebQuery | None = None,
+) -> RowTable:
+    """Загрузить все блоки таблицы в компактном формате в виде RowTable.
+
+    :param session:
+        Сессия интернет соединения.
+    :param url:
+        URL запроса.
+    :param table:
+        Таблица, которую нужно выбрать.
+    :param query:
+        Дополнительные параметры запроса.
+
+    :return:
+        Таблица с данными, хранящимися по столбцам.
+    """
+    iss = client.ISSClient(session, url, query)
+    try:
+        return RowTable(iss.get_all_columns()[table])
+    except KeyError as err:
+        raise client.ISSMoexError(f"Отсутствует таблица {table} в данных") from err
+
+
+def get_board_candles_table(
+    session: requests.Session,
+    security: str,
+    interval: int = 24,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = ("begin", "open", "close", "high", "low", "value", "volume"),
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> RowTable:
+    """Получить свечи в формате HLOCV указанного инструмента в виде компактной таблицы.
+
+    Параметры совпадают с apimoex.get_board_candles.
+
+    :return:
+        Таблица с данными, хранящимися по столбцам, которая напрямую конвертируется в pandas.DataFrame.
+    """
+    url = (
+        f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/"
+        f"boards/{board}/securities/{security}/candles.json"
+    )
+    table = "candles"
+    query = iss_requests.make_query(
+        interval=interval,
+        start=start,
+        end=end,
+        table=table,
+        columns=columns,
+    )
+
+    return get_table(session, url, table, query)
+
+
+def get_board_history_table(
+    session: requests.Session,
+    security: str,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = ("BOARDID", "TRADEDATE", "CLOSE", "VOLUME", "VALUE"),
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> RowTable:
+    """Получить историю торгов для указанной бумаги в виде компактной таблицы.
+
+    Параметры совпадают с apimoex.get_board_history.
+
+    :return:
+        Таблица с данными, хранящимися по столбцам, которая напрямую конвертируется в pandas.DataFrame.
+    """
+    url = (
+        f"https://iss.moex.com/iss/history/engines/{engine}/markets/{market}/"
+        f"boards/{board}/securities/{security}.json"
+    )
+    table = "history"
+    query = iss_requests.make_query(start=start, end=end, table=table, columns=columns)
+
+    return get_table(session, url, table, query)
@@ -0,0 +1,173 @@
+"""Загрузка данных MOEX ISS в виде типизированных столбцов numpy.
+
+Данные загружаются в компактном формате по столбцам, а каждый столбец целиком преобразуется в массив numpy в
+соответствии с типом из метаданных MOEX ISS: даты и моменты времени - в datetime64, цены - в float64, а объемы и
+количества - в int64. Метаданные загружаются отдельным запросом без данных один раз для каждого шаблона адреса
+запроса и кешируются на уровне процесса.
+
+Для работы необходим numpy, который устанавливается вместе с дополнительной зависимостью apimoex[numpy].
+"""
+import threading
+from collections import abc
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import requests
+
+from apimoex import client, metrics
+from apimoex import requests as iss_requests
+
+__all__ = [
+    "TypedTable",
+    "to_array",
+    "get_typed",
+    "get_board_candles_typed",
+    "get_board_history_typed",
+]
+
+TypedTable = dict[str, npt.NDArray[Any]]
+
+# Пустые даты MOEX ISS передает в виде нулевых значений
+_DATE_TYPES = {
+    "date": ("datetime64[D]", "0000-00-00"),
+    "datetime": ("datetime64[s]", "0000-00-00 00:00:00"),
+}
+_INT_TYPES = ("int32", "int64")
+
+_lock = threading.Lock()
+_metadata: dict[str, client.MetadataDict] = {}
+
+
+def to_array(values: client.Column, iss_type: str) -> npt.NDArray[Any]:
+    """Преобразует столбец в массив numpy с типом, соответствующим типу MOEX ISS.
+
+    :param values:
+        Значения столбца.
+    :param iss_type:
+        Тип столбца в метаданных MOEX ISS. Даты преобразуются в datetime64[D], моменты времени - в datetime64[s],
+        пустые даты - в NaT. Целые числа преобразуются в int64, а при наличии пропусков - в float64 с NaN. Строки и
+        столбцы неизвестных типов остаются объектами Python.
+    """
+    if iss_type in _DATE_TYPES:
+        dtype, empty = _DATE_TYPES[iss_type]
+        array = np.array(values, dtype=object)
+        array[(array == None) | (array == empty)] = "NaT"  # noqa: E711
+        return array.astype(dtype)
+    if iss_type in _INT_TYPES:
+        try:
+            return np.array(values, dtype=np.int64)
+        except TypeError:
+            return np.array(values, dtype=np.float64)
+    if iss_type == "double":
+        return np.array(values, dtype=np.float64)
+
+    return np.array(values, dtype=object)
+
+
+def _get_metadata(iss: client.ISSClient, url: str, table: str, columns: abc.Iterable[str]) -> client.Metadata:
+    """Типы столбцов таблицы из кеша или загруженные, если кеш не содержит всех нужных столбцов."""
+    endpoint = metrics.endpoint(url)
+    with _lock:
+        metadata = _metadata.get(endpoint, {}).get(table, {})
+    if all(column in metadata for column in columns):
+        return metadata
+
+    loaded = iss.get_metadata()
+    with _lock:
+        cached = _metadata.setdefault(endpoint, {})
+        for name, types in loaded.items():
+            cached[name] = cached.get(name, {}) | types
+
+        return cached.get(table, {})
+
+
+def get_typed(
+    session: requests.Session,
+    url: str,
+    table: str,
+    query: client.WebQuery | None = None,
+) -> TypedTable:
+    """Загрузить все блоки таблицы и преобразовать ее столбцы в массивы numpy по метаданным MOEX ISS.
+
+    :param session:
+        Сессия интернет соединения.
+    :param url:
+        URL запроса.
+    :param table:
+        Таблица, которую нужно выбрать.
+    :param query:
+        Дополнительные параметры запроса.
+
+    :return:
+        Словарь столбцов с массивами numpy, который напрямую конвертируется в pandas.DataFrame.
+    """
+    iss = client.ISSClient(session, url, query)
+    try:
+        columns = iss.get_all_columns()[table]
+    except KeyError as err:
+        raise client.ISSMoexError(f"Отсутствует таблица {table} в данных") from err
+    metadata = _get_metadata(iss, url, table, columns)
+
+    return {column: to_array(values, metadata.get(column, "")) for column, values in columns.items()}
+
+
+def get_board_candles_typed(
+    session: requests.Session,
+    security: str,
+    interval: int = 24,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = ("begin", "open", "close", "high", "low", "value", "volume"),
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> TypedTable:
+    """Получить свечи в формате HLOCV указанного инструмента в виде типизированных столбцов.
+
+    Параметры совпадают с apimoex.get_board_candles.
+
+    :return:
+        Словарь столбцов с массивами numpy, моменты начала и окончания свечек - в виде datetime64[s].
+    """
+    url = (
+        f"https://iss.moex.com/iss/engines/{engine}/markets/{market}/"
+        f"boards/{board}/securities/{security}/candles.json"
+    )
+    table = "candles"
+    query = iss_requests.make_query(
+        interval=interval,
+        start=start,
+        end=end,
+        table=table,
+        columns=columns,
+    )
+
+    return get_typed(session, url, table, query)
+
+
+def get_board_history_typed(
+    session: requests.Session,
+    security: str,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = ("BOARDID", "TRADEDATE", "CLOSE", "VOLUME", "VALUE"),
+    board: str = "TQBR",
+    market: str = "shares",
+    engine: str = "stock",
+) -> TypedTable:
+    """Получить историю торгов для указанной бумаги в виде типизированных столбцов.
+
+    Параметры совпадают с apimoex.get_board_history.
+
+    :return:
+        Словарь столбцов с массивами numpy, даты торгов - в виде datetime64[D].
+    """
+    url = (
+        f"https://iss.moex.com/iss/history/engines/{engine}/markets/{market}/"
+        f"boards/{board}/securities/{security}.json"
+    )
+    table = "history"
+    query = iss_requests.make_query(start=start, end=end, table=table, columns=columns)
+
+    return get_typed(session, url, table, query)
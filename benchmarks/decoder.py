@@ -0,0 +1,76 @@
+"""Сравнение скорости разбора ответов MOEX ISS разными декодерами json.
+
+Для разбора используются сохраненные ответы MOEX ISS в расширенном формате, пути к которым передаются в качестве
+аргументов. При их отсутствии разбирается сгенерированная страница минутных свечек, повторяющая формат ответа MOEX ISS.
+
+Запуск::
+
+   $ python benchmarks/decoder.py [page.json ...]
+"""
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import requests
+
+from apimoex import client
+
+ROUNDS = 20
+
+
+def make_page(rows: int = 10_000) -> bytes:
+    """Страница минутных свечек в формате расширенного json MOEX ISS."""
+    candles = [
+        {
+            "begin": f"2023-01-{3 + n // 600:02} {10 + n % 600 // 60:02}:{n % 60:02}:00",
+            "open": 160.1 + n % 7,
+            "close": 160.3 + n % 5,
+            "high": 161.0 + n % 3,
+            "low": 159.8,
+            "value": 123456789.5 + n,
+            "volume": 771000 + n,
+        }
+        for n in range(rows)
+    ]
+
+    return json.dumps([{"charsetinfo": {"name": "utf-8"}}, {"candles": candles}]).encode()
+
+
+def load_decoders() -> dict[str, client.Decoder]:
+    """Доступные декодеры, включая разбор через декодирование в строку, как в requests.Response.json."""
+    decoders: dict[str, client.Decoder] = {
+        "requests.Response.json": lambda body: json.loads(body.decode(requests.utils.guess_json_utf(body) or "utf-8")),
+        "json": json.loads,
+    }
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        decoders["orjson"] = orjson.loads
+    try:
+        import msgspec
+    except ImportError:
+        pass
+    else:
+        decoders["msgspec"] = msgspec.json.decode
+
+    return decoders
+
+
+def main(paths: list[str]) -> None:
+    """Выводит среднее время разбора каждой страницы каждым из декодеров."""
+    pages = {path: Path(path).read_bytes() for path in paths} or {"generated": make_page()}
+    decoders = load_decoders()
+    for name, body in pages.items():
+        print(f"{name} - {len(body) / 2**20:.1f} MB")  # noqa: T201
+        base = None
+        for decoder_name, decoder in decoders.items():
+            seconds = timeit.timeit(lambda decoder=decoder, body=body: decoder(body), number=ROUNDS) / ROUNDS
+            base = base or seconds
+            print(f"    {decoder_name:<24}{seconds * 1000:8.1f} ms {base / seconds:6.1f}x")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
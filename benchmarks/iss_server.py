@@ -0,0 +1,267 @@
+"""Локальный HTTP сервер, заменяющий MOEX ISS при измерении производительности.
+
+Сервер отвечает на запросы, используемые функциями из apimoex.requests, страницами в формате MOEX ISS. Ответы на
+историю торгов выдаются блоками с курсором history.cursor, а свечки - блоками без курсора, окончание которых
+определяется по пустому блоку. Каждая страница формируется один раз и запоминается, поэтому при повторных запросах
+сервер отдает одинаковые байты с минимальными затратами.
+
+Вместо сгенерированных могут использоваться сохраненные ответы MOEX ISS - файл с ответом на запрос
+/iss/securities.json?start=100 ищется по пути <pages>/iss/securities.json/100.json.
+
+Для перенаправления запросов на локальный сервер к сессии подключается LocalAdapter::
+
+   with ISSStandIn() as server, requests.Session() as session:
+       session.mount("https://iss.moex.com", LocalAdapter(server.url))
+       apimoex.get_board_history(session, "SNGSP")
+"""
+import datetime
+import json
+import re
+import threading
+from collections import abc
+from http import HTTPStatus, server
+from pathlib import Path
+from typing import Any, NamedTuple
+from urllib import parse
+
+import requests
+from requests import adapters
+
+ISS_URL = "https://iss.moex.com"
+
+
+class Route(NamedTuple):
+    """Описание ответа на группу запросов.
+
+    Если page_size равен нулю, ответ выдается одним блоком. Если cursor истинен, блоки содержат history.cursor, иначе
+    после последнего блока выдается пустой.
+    """
+
+    pattern: re.Pattern[str]
+    table: str
+    columns: tuple[str, ...]
+    rows: int
+    page_size: int = 0
+    cursor: bool = False
+
+
+_HISTORY_COLUMNS = ("BOARDID", "TRADEDATE", "SECID", "SHORTNAME", "CLOSE", "VOLUME", "VALUE", "NUMTRADES")
+_CANDLES_COLUMNS = ("begin", "end", "open", "close", "high", "low", "value", "volume")
+
+
+def make_routes(candles: int = 50_000, history: int = 5_000) -> list[Route]:
+    """Ответы на запросы всех функций из apimoex.requests.
+
+    :param candles:
+        Количество свечек в ответах на запросы свечек - по умолчанию около 4 месяцев минутных свечек.
+    :param history:
+        Количество дней в ответах на запросы истории торгов.
+    """
+    return [
+        Route(re.compile(r"^/iss/securities\.json$"), "securities", ("secid", "shortname", "regnumber"), 100),
+        Route(re.compile(r"^/iss/securities/[^/]+\.json$"), "description", ("name", "title", "value"), 25),
+        Route(re.compile(r"/candleborders\.json$"), "borders", ("begin", "end", "interval", "board_group_id"), 7),
+        Route(re.compile(r"/candles\.json$"), "candles", _CANDLES_COLUMNS, candles, 500),
+        Route(re.compile(r"^/iss/history/.+/dates\.json$"), "dates", ("from", "till"), 1),
+        Route(re.compile(r"^/iss/engines/.+/boards/[^/]+/securities\.json$"), "securities", ("SECID", "LOTSIZE"), 300),
+        Route(
+            re.compile(r"^/iss/history/.+/securities/[^/]+\.json$"),
+            "history",
+            _HISTORY_COLUMNS,
+            history,
+            100,
+            cursor=True,
+        ),
+        Route(
+            re.compile(r"^/iss/history/.+/boards/[^/]+/securities\.json$"),
+            "history",
+            _HISTORY_COLUMNS,
+            300,
+            100,
+            cursor=True,
+        ),
+        Route(re.compile(r"/analytics/[^/]+/tickers\.json$"), "tickers", ("ticker", "from", "till"), 50),
+    ]
+
+
+_TEXT_COLUMNS = frozenset({"secid", "boardid", "shortname", "regnumber", "name", "title", "value", "ticker"})
+_START = datetime.datetime.fromisoformat("2020-01-03 10:00:00")
+# Интервалы свечек в ответе на запрос границ, по одному на строку
+_INTERVALS = (1, 10, 60, 24, 7, 31, 4)
+
+
+def _value(column: str, n: int) -> str | int | float:
+    """Значение столбца в строке с заданным номером, правдоподобное для MOEX ISS."""
+    name = column.lower()
+    if name in ("begin", "end"):
+        return str(_START + datetime.timedelta(minutes=n))
+    if name in ("tradedate", "from", "till"):
+        # Интервалы дат from - till охватывают год
+        return str(_START.date() + datetime.timedelta(days=n + 365 * (name == "till")))
+    if name in _TEXT_COLUMNS:
+        return f"{column.upper()}{n % 1000}"
+    if name == "interval":
+        return _INTERVALS[n % len(_INTERVALS)]
+    if name in ("volume", "numtrades", "lotsize", "board_group_id"):
+        return 1000 + n % 997
+
+    return 100 + (n % 1009) / 100
+
+
+def _reference() -> dict[str, list[dict[str, Any]]]:
+    """Таблицы справочника плейсхолдеров."""
+    return {
+        "engines": [{"id": 1, "name": "stock", "title": "Фондовый рынок"}],
+        "markets": [{"id": 1, "trade_engine_name": "stock", "market_name": "shares", "market_title": "Акции"}],
+        "boards": [{"id": n, "market_id": 1, "boardid": f"TQ{n:02}", "is_traded": 1} for n in range(300)],
+    }
+
+
+class ISSStandIn:
+    """Многопоточный HTTP сервер с ответами в формате MOEX ISS на локальном адресе."""
+
+    def __init__(self, routes: list[Route] | None = None, pages: str | Path | None = None) -> None:
+        """Сервер запускается при входе в контекст и останавливается при выходе из него.
+
+        :param routes:
+            Описание ответов на запросы - по умолчанию make_routes().
+        :param pages:
+            Каталог с сохраненными ответами MOEX ISS, которые используются вместо сгенерированных.
+        """
+        self._routes = routes or make_routes()
+        self._pages = Path(pages) if pages is not None else None
+        self._cache: dict[tuple[str, str, int, str, str], bytes] = {}
+        self._lock = threading.Lock()
+        self._server = server.ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Адрес сервера."""
+        host, port = self._server.server_address[:2]
+
+        return f"http://{host!s}:{port}"
+
+    def __enter__(self) -> "ISSStandIn":
+        """Запускает сервер в отдельном потоке."""
+        self._thread.start()
+
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def page(self, path: str, query: abc.Mapping[str, str]) -> bytes | None:
+        """Тело ответа на запрос или None, если запрос неизвестен."""
+        start = int(query.get("start", 0))
+        key = (path, query.get("iss.json", "extended"), start, query.get("iss.only", ""), query.get("limit", ""))
+        with self._lock:
+            body = self._cache.get(key)
+        if body is None:
+            body = self._load(path, start) or self._generate(path, query, start)
+            if body is None:
+                return None
+            with self._lock:
+                self._cache[key] = body
+
+        return body
+
+    def _load(self, path: str, start: int) -> bytes | None:
+        """Сохраненный ответ MOEX ISS, если он есть."""
+        if self._pages is None:
+            return None
+        file = self._pages / path.lstrip("/") / f"{start}.json"
+
+        return file.read_bytes() if file.is_file() else None
+
+    def _generate(self, path: str, query: abc.Mapping[str, str], start: int) -> bytes | None:
+        """Сгенерированный ответ в формате MOEX ISS."""
+        if path == "/iss/index.json":
+            return _encode(_reference(), query)
+        route = next((route for route in self._routes if route.pattern.search(path)), None)
+        if route is None:
+            return None
+        columns = tuple(query[f"{route.table}.columns"].split(",")) if f"{route.table}.columns" in query else None
+        size = route.page_size or route.rows
+        # Как и MOEX ISS, сервер уменьшает запрошенный размер блока до максимального для запроса
+        size = min(int(query.get("limit", size)), size)
+        stop = min(start + size, route.rows)
+        columns = columns or route.columns
+        tables: dict[str, list[dict[str, Any]]] = {
+            route.table: [{column: _value(column, n) for column in columns} for n in range(start, stop)],
+        }
+        if route.cursor:
+            tables["history.cursor"] = [{"INDEX": start, "TOTAL": route.rows, "PAGESIZE": size}]
+
+        return _encode(tables, query)
+
+    def _make_handler(self) -> type[server.BaseHTTPRequestHandler]:
+        """Класс обработчика запросов, связанный с сервером."""
+        stand_in = self
+
+        class Handler(server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Заголовки и тело ответа отправляются отдельно, что без отключения алгоритма Нейгла добавляет задержку
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:  # noqa: N802
+                url = parse.urlsplit(self.path)
+                body = stand_in.page(url.path, dict(parse.parse_qsl(url.query)))
+                if body is None:
+                    self.send_error(HTTPStatus.NOT_FOUND)
+                    return
+                self.send_response(HTTPStatus.OK)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_: object) -> None:
+                """Запросы не протоколируются, чтобы не влиять на результаты измерений."""
+
+        return Handler
+
+
+def _encode(tables: dict[str, list[dict[str, Any]]], query: abc.Mapping[str, str]) -> bytes:
+    """Ответ в виде расширенного или компактного json с учетом фильтра таблиц iss.only."""
+    if only := query.get("iss.only"):
+        tables = {name: table for name, table in tables.items() if name in only.split(",")}
+    if query.get("iss.json") == "compact":
+        compact = {}
+        for name, table in tables.items():
+            columns = list(table[0]) if table else []
+            compact[name] = {"columns": columns, "data": [list(row.values()) for row in table]}
+        return json.dumps(compact, ensure_ascii=False).encode()
+
+    return json.dumps([{"charsetinfo": {"name": "utf-8"}}, tables], ensure_ascii=False).encode()
+
+
+class LocalAdapter(adapters.HTTPAdapter):
+    """Транспортный адаптер, перенаправляющий запросы к MOEX ISS на локальный сервер."""
+
+    def __init__(self, url: str, pool_maxsize: int = adapters.DEFAULT_POOLSIZE) -> None:
+        """Адаптер подключается к сессии для адреса https://iss.moex.com.
+
+        :param url:
+            Адрес локального сервера.
+        :param pool_maxsize:
+            Максимальное количество соединений с локальным сервером.
+        """
+        super().__init__(pool_maxsize=pool_maxsize)
+        self._url = url
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        *args: Any,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401
+    ) -> requests.Response:
+        """Отправляет запрос на локальный сервер."""
+        if request.url is not None and request.url.startswith(ISS_URL):
+            request = request.copy()
+            request.url = self._url + request.url.removeprefix(ISS_URL)
+
+        return super().send(request, *args, **kwargs)
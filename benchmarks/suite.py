@@ -0,0 +1,184 @@
+"""Измерение производительности клиента, функций-запросов и массовых загрузок на локальном сервере вместо MOEX ISS.
+
+Запросы перенаправляются на локальный сервер из iss_server.py, поэтому результаты не зависят от сети и нагрузки на
+MOEX ISS и воспроизводимы. Для каждого сценария выводятся пропускная способность в строках в секунду, процентили
+времени выполнения и пиковый объем памяти, выделенной при выполнении.
+
+Результаты можно сохранить в качестве базовых и сравнивать с ними последующие измерения - при ухудшении медианного
+времени или пикового объема памяти больше порога скрипт завершается с ошибкой.
+
+Запуск::
+
+   $ PYTHONPATH=. python benchmarks/suite.py --save baseline.json
+   $ PYTHONPATH=. python benchmarks/suite.py --compare baseline.json --threshold 0.2
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import abc
+from pathlib import Path
+from typing import NamedTuple
+
+import requests
+from iss_server import ISSStandIn, LocalAdapter
+
+import apimoex
+from apimoex import client, parallel, table
+
+_HISTORY_URL = "https://iss.moex.com/iss/history/engines/stock/markets/shares/boards/TQBR/securities/SNGSP.json"
+_CANDLES_URL = "https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities/SNGSP/candles.json"
+_SECURITIES_URL = "https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities.json"
+_SECURITIES = ("SNGSP", "GAZP", "SBER", "LKOH", "GMKN", "ROSN", "NVTK", "TATN")
+
+Case = abc.Callable[[requests.Session], client.Table | client.TablesDict | int]
+
+
+class Result(NamedTuple):
+    """Результаты измерения одного сценария."""
+
+    rows: int
+    p50: float
+    p90: float
+    p99: float
+    peak_memory: int
+
+    @property
+    def throughput(self) -> float:
+        """Количество строк в секунду при медианном времени выполнения."""
+        return self.rows / self.p50
+
+
+def _count(data: client.Table | client.TablesDict | int) -> int:
+    """Количество строк в результате сценария - таблице, словаре таблиц или уже посчитанное при выдаче по частям."""
+    if isinstance(data, int):
+        return data
+    if isinstance(data, dict):
+        return sum(len(table) for table in data.values())
+
+    return len(data)
+
+
+def _count_many(results: abc.Iterable[parallel.SecurityData]) -> int:
+    """Количество строк во всех результатах параллельной загрузки по нескольким бумагам."""
+    return sum(len(result.data) for result in results)
+
+
+def make_cases() -> dict[str, Case]:
+    """Сценарии для методов ISSClient, всех функций из apimoex.requests и массовых загрузок из apimoex.parallel."""
+    return {
+        "ISSClient.get": lambda session: client.ISSClient(session, _SECURITIES_URL).get(),
+        "ISSClient.get_all cursor": lambda session: client.ISSClient(session, _HISTORY_URL).get_all(),
+        "ISSClient.get_all cursorless": lambda session: client.ISSClient(session, _CANDLES_URL).get_all(),
+        "ISSClient.__iter__ cursor": lambda session: sum(map(_count, client.ISSClient(session, _HISTORY_URL))),
+        "ISSClient.__iter__ cursorless": lambda session: sum(map(_count, client.ISSClient(session, _CANDLES_URL))),
+        "get_reference": lambda session: apimoex.get_reference(session),
+        "find_securities": lambda session: apimoex.find_securities(session, "SNGSP"),
+        "find_security_description": lambda session: apimoex.find_security_description(session, "SNGSP"),
+        "get_market_candle_borders": lambda session: apimoex.get_market_candle_borders(session, "SNGSP"),
+        "get_board_candle_borders": lambda session: apimoex.get_board_candle_borders(session, "SNGSP"),
+        "get_market_candles": lambda session: apimoex.get_market_candles(session, "SNGSP", 1),
+        "iter_market_candles": lambda session: sum(map(len, apimoex.iter_market_candles(session, "SNGSP", 1))),
+        "get_board_candles": lambda session: apimoex.get_board_candles(session, "SNGSP", 1),
+        "iter_board_candles": lambda session: sum(map(len, apimoex.iter_board_candles(session, "SNGSP", 1))),
+        "get_board_dates": lambda session: apimoex.get_board_dates(session),
+        "get_board_securities": lambda session: apimoex.get_board_securities(session),
+        "get_market_history": lambda session: apimoex.get_market_history(session, "SNGSP"),
+        "iter_market_history": lambda session: sum(map(len, apimoex.iter_market_history(session, "SNGSP"))),
+        "get_board_history": lambda session: apimoex.get_board_history(session, "SNGSP"),
+        "iter_board_history": lambda session: sum(map(len, apimoex.iter_board_history(session, "SNGSP"))),
+        "get_board_history_by_date": lambda session: apimoex.get_board_history_by_date(session, "2020-01-03"),
+        "get_index_tickers": lambda session: apimoex.get_index_tickers(session, "IMOEX"),
+        "get_board_history_table": lambda session: len(table.get_board_history_table(session, "SNGSP")),
+        "get_market_candles_sharded": lambda session: parallel.get_market_candles_sharded(session, "SNGSP", 1),
+        "get_board_candles_sharded": lambda session: parallel.get_board_candles_sharded(session, "SNGSP", 1),
+        "get_board_candles_many": lambda session: _count_many(parallel.get_board_candles_many(session, _SECURITIES)),
+        "get_board_history_many": lambda session: _count_many(parallel.get_board_history_many(session, _SECURITIES)),
+        "get_board_history_by_dates": lambda session: parallel.get_board_history_by_dates(
+            session,
+            "2020-01-03",
+            "2020-01-31",
+        ),
+    }
+
+
+def measure(case: Case, session: requests.Session, rounds: int) -> Result:
+    """Измеряет время выполнения сценария и отдельным прогоном - пиковый объем выделенной памяти."""
+    rows = _count(case(session))
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        case(session)
+        durations.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        case(session)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p90, p99 = (statistics.quantiles(durations, n=100, method="inclusive")[n - 1] for n in (50, 90, 99))
+
+    return Result(rows, p50, p90, p99, peak)
+
+
+def run(rounds: int, cases: abc.Iterable[str] | None = None, pages: str | None = None) -> dict[str, Result]:
+    """Выполняет сценарии на локальном сервере и выводит результаты."""
+    all_cases = make_cases()
+    results = {}
+    print(f"{'':32}{'rows':>8}{'rows/s':>12}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'peak MB':>10}")  # noqa: T201
+    with ISSStandIn(pages=pages) as server, requests.Session() as session:
+        session.mount("https://iss.moex.com", LocalAdapter(server.url))
+        for name in cases or all_cases:
+            result = results[name] = measure(all_cases[name], session, rounds)
+            print(  # noqa: T201
+                f"{name:<32}{result.rows:>8}{result.throughput:>12.0f}"
+                f"{result.p50 * 1000:>10.2f}{result.p90 * 1000:>10.2f}{result.p99 * 1000:>10.2f}"
+                f"{result.peak_memory / 2**20:>10.2f}",
+            )
+
+    return results
+
+
+def compare(results: dict[str, Result], baseline: dict[str, Result], threshold: float) -> list[str]:
+    """Перечень ухудшений медианного времени и пикового объема памяти больше порога относительно базовых значений."""
+    regressions = []
+    for name, result in results.items():
+        if (base := baseline.get(name)) is None:
+            continue
+        for metric in ("p50", "peak_memory"):
+            value, base_value = getattr(result, metric), getattr(base, metric)
+            if base_value and value > base_value * (1 + threshold):
+                regressions.append(f"{name} {metric}: {base_value:.6g} -> {value:.6g} (+{value / base_value - 1:.0%})")
+
+    return regressions
+
+
+def main(argv: list[str]) -> int:
+    """Выполняет измерения, сохраняет и сравнивает результаты с базовыми."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help="сценарии - по умолчанию все")
+    parser.add_argument("--rounds", type=int, default=10, help="количество измерений каждого сценария")
+    parser.add_argument("--pages", help="каталог с сохраненными ответами MOEX ISS")
+    parser.add_argument("--save", help="файл для сохранения результатов в качестве базовых")
+    parser.add_argument("--compare", help="файл с базовыми результатами для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимое относительное ухудшение")
+    args = parser.parse_args(argv)
+
+    results = run(args.rounds, args.cases, args.pages)
+    if args.save:
+        Path(args.save).write_text(json.dumps({name: result._asdict() for name, result in results.items()}, indent=2))
+    if args.compare:
+        baseline = {name: Result(**values) for name, values in json.loads(Path(args.compare).read_text()).items()}
+        if regressions := compare(results, baseline, args.threshold):
+            print("\nУхудшения:", *regressions, sep="\n    ")  # noqa: T201
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,73 @@
+import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from apimoex import arrow, client
+
+COLUMNS = ("begin", "close", "volume")
+PAGES = [
+    [
+        {"begin": "2020-01-03 10:00:00", "close": 1.5, "volume": 10},
+        {"begin": "2020-01-03 10:01:00", "close": 2, "volume": 5},
+    ],
+    [{"begin": "2020-01-03 10:02:00", "close": None, "volume": 0}],
+]
+
+
+def test_make_schema():
+    schema = arrow.make_schema(("BOARDID", "TRADEDATE", "CLOSE", "VOLUME", "YIELD"), {"YIELD": pa.float32()})
+    assert schema.types == [pa.string(), pa.date32(), pa.float64(), pa.int64(), pa.float32()]
+
+
+def test_make_schema_unknown():
+    with pytest.raises(client.ISSMoexError) as error:
+        arrow.make_schema(("YIELD",))
+    assert "Неизвестный тип столбца YIELD - его необходимо указать в types" in str(error.value)
+
+
+def test_write_parquet(tmp_path):
+    path = tmp_path / "candles.parquet"
+    assert arrow.write_parquet(iter(PAGES), path, COLUMNS) == 3
+    table = pq.read_table(path)
+    assert table.column_names == list(COLUMNS)
+    assert table["begin"][2].as_py() == datetime.datetime(2020, 1, 3, 10, 2)
+    assert table["close"].to_pylist() == [1.5, 2.0, None]
+    assert table["volume"].type == pa.int64()
+
+
+def test_write_ipc(tmp_path):
+    path = tmp_path / "history.arrow"
+    pages = [[{"TRADEDATE": "2020-01-03", "CLOSE": 1}], [{"TRADEDATE": "2020-01-04", "CLOSE": 2}]]
+    assert arrow.write_ipc(pages, path, ("TRADEDATE", "CLOSE")) == 2
+    with pa.memory_map(str(path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert table["TRADEDATE"].to_pylist() == [datetime.date(2020, 1, 3), datetime.date(2020, 1, 4)]
+    assert table["CLOSE"].to_pylist() == [1.0, 2.0]
+
+
+@pytest.mark.parametrize(("row_group_size", "row_groups"), [(100, 1), (2, 2), (1, 3)])
+def test_write_parquet_row_groups(tmp_path, row_group_size, row_groups):
+    path = tmp_path / "candles.parquet"
+    pages = [[row] for page in PAGES for row in page]
+    assert arrow.write_parquet(iter(pages), path, COLUMNS, row_group_size=row_group_size) == 3
+    assert pq.ParquetFile(path).metadata.num_row_groups == row_groups
+    assert pq.read_table(path)["volume"].to_pylist() == [10, 5, 0]
+
+
+def test_write_ipc_batches(tmp_path):
+    path = tmp_path / "history.arrow"
+    pages = [[{"TRADEDATE": "2020-01-03", "CLOSE": 1}], [], [{"TRADEDATE": "2020-01-04", "CLOSE": 2}]]
+    assert arrow.write_ipc(pages, path, ("TRADEDATE", "CLOSE")) == 2
+    with pa.memory_map(str(path)) as source:
+        assert pa.ipc.open_file(source).num_record_batches == 1
+
+
+def test_write_zero_dates(tmp_path):
+    path = tmp_path / "securities.parquet"
+    pages = [[{"TRADEDATE": "0000-00-00", "begin": "0000-00-00 00:00:00"}, {"TRADEDATE": "2020-01-03", "begin": None}]]
+    assert arrow.write_parquet(pages, path, ("TRADEDATE", "begin")) == 2
+    table = pq.read_table(path)
+    assert table["TRADEDATE"].to_pylist() == [None, datetime.date(2020, 1, 3)]
+    assert table["begin"].to_pylist() == [None, None]
@@ -0,0 +1,274 @@
+import asyncio
+import contextlib
+import typing
+
+import aiohttp
+import pytest
+
+from apimoex import async_requests, client
+from apimoex.async_client import AsyncISSClient
+
+
+async def get_all(url, query=None):
+    async with aiohttp.ClientSession() as session:
+        return await AsyncISSClient(session, url, query).get_all()
+
+
+@pytest.fixture(autouse=True)
+def clear_page_sizes(monkeypatch):
+    # noinspection PyProtectedMember
+    monkeypatch.setattr(client, "_page_sizes", {})
+
+
+def test_async_iss_client_iterable():
+    assert issubclass(AsyncISSClient, typing.AsyncIterable)
+
+
+def test_repr():
+    iss = AsyncISSClient(typing.cast(aiohttp.ClientSession, None), "test_url", dict(a="b"))
+    assert str(iss) == "AsyncISSClient(url=test_url, query={'a': 'b'})"
+
+
+def test_get_all_with_cursor():
+    url = "https://iss.moex.com/iss/history/engines/stock/markets/shares/securities/SNGSP.json"
+    query = {"from": "2018-01-01", "till": "2018-03-01"}
+    raw = asyncio.run(get_all(url, query))
+    data = raw["history"]
+    assert len(data) > 100
+    assert data[0]["TRADEDATE"] == "2018-01-03"
+    assert data[-1]["TRADEDATE"] == "2018-03-01"
+
+
+def test_get_wrong_url():
+    url = "https://iss.moex.com/iss/securities1.json"
+    with pytest.raises(client.ISSMoexError) as error:
+        asyncio.run(get_all(url))
+    assert "Неверный url" in str(error.value)
+
+
+def test_get_all_fake_cursor(monkeypatch):
+    iss = AsyncISSClient(typing.cast(aiohttp.ClientSession, None), "")
+    starts = []
+
+    async def fake_get(start):
+        starts.append(start)
+        return {
+            "history": [{"N": start}, {"N": start + 1}],
+            "history.cursor": [{"INDEX": start, "TOTAL": 5, "PAGESIZE": 2}],
+        }
+
+    monkeypatch.setattr(iss, "get", fake_get)
+    data = asyncio.run(iss.get_all())
+    assert starts == [0, 2, 4]
+    assert data == {"history": [{"N": n} for n in range(6)]}
+
+
+def test_parallel_fake_without_cursor(monkeypatch):
+    iss = AsyncISSClient(typing.cast(aiohttp.ClientSession, None), "", workers=3)
+    sizes = {0: 3, 3: 3, 6: 2, 8: 3, 11: 1}
+    starts = []
+
+    async def fake_get(start):
+        starts.append(start)
+        return {"candles": [{"N": n} for n in range(start, start + sizes.get(start, 0))]}
+
+    monkeypatch.setattr(iss, "get", fake_get)
+    data = asyncio.run(iss.get_all())
+    assert data == {"candles": [{"N": n} for n in range(12)]}
+    assert all(start in starts for start in [*sizes, 12])
+    # noinspection PyProtectedMember
+    assert client._page_sizes == {("", "5000"): 3}
+
+
+def test_get_all_fake_without_cursor(monkeypatch):
+    iss = AsyncISSClient(typing.cast(aiohttp.ClientSession, None), "")
+
+    async def fake_get(start):
+        return {"candles": [{"N": start}] if start < 3 else []}
+
+    monkeypatch.setattr(iss, "get", fake_get)
+    data = asyncio.run(iss.get_all())
+    assert data == {"candles": [{"N": 0}, {"N": 1}, {"N": 2}]}
+
+
+def test_wrong_cursor_index(monkeypatch):
+    iss = AsyncISSClient(typing.cast(aiohttp.ClientSession, None), "")
+
+    async def fake_get(start):
+        return {"history.cursor": [{"INDEX": 1}]}
+
+    monkeypatch.setattr(iss, "get", fake_get)
+    with pytest.raises(client.ISSMoexError) as error:
+        asyncio.run(iss.get_all())
+    assert "Некорректные данные history.cursor [{'INDEX': 1}] для начальной позиции 0" in str(error.value)
+
+
+def test_get_board_history():
+    async def load():
+        async with aiohttp.ClientSession() as session:
+            return await async_requests.get_board_history(session, "SNGSP", start="2018-01-03", end="2018-06-01")
+
+    data = asyncio.run(load())
+    assert data[0]["TRADEDATE"] == "2018-01-03"
+    assert data[-1]["TRADEDATE"] == "2018-06-01"
+
+
+def test_get_all_parallel(monkeypatch):
+    iss = AsyncISSClient(typing.cast(aiohttp.ClientSession, None), "", workers=4)
+
+    async def fake_get(start):
+        await asyncio.sleep(0.01 * (start % 3))
+        return {
+            "history": [{"N": n} for n in range(start, min(start + 3, 23))],
+            "history.cursor": [{"INDEX": start, "TOTAL": 23, "PAGESIZE": 3}],
+        }
+
+    monkeypatch.setattr(iss, "get", fake_get)
+    data = asyncio.run(iss.get_all())
+    assert data == {"history": [{"N": n} for n in range(23)]}
+
+
+def test_get_parallel_closed_early(monkeypatch):
+    iss = AsyncISSClient(typing.cast(aiohttp.ClientSession, None), "", workers=4)
+    tasks = []
+
+    async def fake_get(start):
+        tasks.append(asyncio.current_task())
+        await asyncio.sleep(0.01 * start)
+        return {
+            "history": [{"N": n} for n in range(start, min(start + 3, 23))],
+            "history.cursor": [{"INDEX": start, "TOTAL": 23, "PAGESIZE": 3}],
+        }
+
+    monkeypatch.setattr(iss, "get", fake_get)
+
+    async def load():
+        async with contextlib.aclosing(aiter(iss)) as blocks:
+            async for _ in blocks:
+                if len(tasks) > 1:
+                    break
+        return all(task.done() for task in tasks[1:])
+
+    assert asyncio.run(load())
+
+
+def test_get_single_flight(monkeypatch):
+    loads = []
+
+    async def fake_load(self, start):
+        loads.append(start)
+        await asyncio.sleep(0.01)
+        return {"securities": [{"secid": "SNGSP"}]}
+
+    monkeypatch.setattr(AsyncISSClient, "_load", fake_load)
+
+    async def load():
+        session = typing.cast(aiohttp.ClientSession, None)
+        iss_clients = [AsyncISSClient(session, "url", {"q": "SNGSP"}) for _ in range(3)]
+        return await asyncio.gather(*(iss.get() for iss in iss_clients), AsyncISSClient(session, "url").get())
+
+    results = asyncio.run(load())
+    assert loads == [None, None]
+    assert all(data == {"securities": [{"secid": "SNGSP"}]} for data in results)
+    assert len({id(data["securities"]) for data in results}) == len(results)
+
+
+def test_get_single_flight_error(monkeypatch):
+    async def fake_load(self, start):
+        await asyncio.sleep(0.01)
+        raise client.ISSMoexError("Неверный url")
+
+    monkeypatch.setattr(AsyncISSClient, "_load", fake_load)
+
+    async def load():
+        iss_clients = [AsyncISSClient(typing.cast(aiohttp.ClientSession, None), "url") for _ in range(3)]
+        return await asyncio.gather(*(iss.get() for iss in iss_clients), return_exceptions=True)
+
+    assert all(isinstance(error, client.ISSMoexError) for error in asyncio.run(load()))
+
+
+def test_get_single_flight_leader_cancelled(monkeypatch):
+    loads = []
+
+    async def fake_load(self, start):
+        loads.append(start)
+        await asyncio.sleep(0.02)
+        return {"securities": [{"secid": "SNGSP"}]}
+
+    monkeypatch.setattr(AsyncISSClient, "_load", fake_load)
+
+    async def load():
+        session = typing.cast(aiohttp.ClientSession, None)
+        leader = asyncio.create_task(AsyncISSClient(session, "url").get())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(AsyncISSClient(session, "url").get())
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        return await asyncio.gather(leader, waiter, return_exceptions=True)
+
+    leader, waiter = asyncio.run(load())
+    assert isinstance(leader, asyncio.CancelledError)
+    assert waiter == {"securities": [{"secid": "SNGSP"}]}
+    assert loads == [None]
+
+
+def test_get_single_flight_all_cancelled(monkeypatch):
+    finished = []
+
+    async def fake_load(self, start):
+        await asyncio.sleep(0.02)
+        finished.append(start)
+        return {}
+
+    monkeypatch.setattr(AsyncISSClient, "_load", fake_load)
+
+    async def load():
+        session = typing.cast(aiohttp.ClientSession, None)
+        tasks = [asyncio.create_task(AsyncISSClient(session, "url").get()) for _ in range(2)]
+        await asyncio.sleep(0.005)
+        for task in tasks:
+            task.cancel()
+        await asyncio.sleep(0.03)
+
+    asyncio.run(load())
+    assert not finished
+
+
+def test_get_single_flight_after_cancel(monkeypatch):
+    loads = []
+
+    async def fake_load(self, start):
+        loads.append(start)
+        await asyncio.sleep(0.01)
+        return {"securities": []}
+
+    monkeypatch.setattr(AsyncISSClient, "_load", fake_load)
+
+    async def load():
+        session = typing.cast(aiohttp.ClientSession, None)
+        cancelled = asyncio.create_task(AsyncISSClient(session, "url").get())
+        await asyncio.sleep(0.005)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        return await AsyncISSClient(session, "url").get()
+
+    assert asyncio.run(load()) == {"securities": []}
+    assert loads == [None, None]
+
+
+def test_get_single_flight_per_session(monkeypatch):
+    loads = []
+
+    async def fake_load(self, start):
+        loads.append(start)
+        await asyncio.sleep(0.01)
+        return {"securities": []}
+
+    monkeypatch.setattr(AsyncISSClient, "_load", fake_load)
+
+    async def load():
+        sessions = [typing.cast(aiohttp.ClientSession, object()) for _ in range(2)]
+        return await asyncio.gather(*(AsyncISSClient(session, "url").get() for session in sessions))
+
+    asyncio.run(load())
+    assert loads == [None, None]
@@ -0,0 +1,74 @@
+import pytest
+
+from apimoex import cache
+
+URL = "https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities.json"
+
+
+def test_store_with_validators():
+    http_cache = cache.HTTPCache()
+    http_cache.store(URL, b"[]", {"ETag": '"abc"', "Content-Encoding": "gzip", "Content-Length": "10"})
+    entry = http_cache.lookup(URL)
+    assert entry.content == b"[]"
+    assert "Content-Encoding" not in entry.headers
+    assert entry.validators == {"If-None-Match": '"abc"'}
+    assert not entry.is_fresh()
+
+
+def test_store_without_validators():
+    http_cache = cache.HTTPCache()
+    http_cache.store(URL, b"[]", {})
+    assert http_cache.lookup(URL) is None
+
+    http_cache = cache.HTTPCache(ttls={r"/securities\.json": 60})
+    http_cache.store(URL, b"[]", {})
+    assert http_cache.lookup(URL).is_fresh()
+    http_cache.store("https://iss.moex.com/iss/index.json", b"[]", {})
+    assert len(http_cache) == 1
+
+
+def test_ttl_expired(monkeypatch):
+    http_cache = cache.HTTPCache(ttl=10)
+    http_cache.store(URL, b"[]", {})
+    now = cache.time.monotonic()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now + 11)
+    assert not http_cache.lookup(URL).is_fresh()
+
+
+def test_revalidate():
+    http_cache = cache.HTTPCache()
+    assert http_cache.revalidate(URL, {}) is None
+    http_cache.store(URL, b"[]", {"last-modified": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    entry = http_cache.revalidate(URL, {"ETag": '"new"'})
+    assert entry.validators == {"If-None-Match": '"new"', "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    assert http_cache.lookup(URL) == entry
+
+
+@pytest.mark.parametrize("size", [1, 2])
+def test_max_entries(size):
+    http_cache = cache.HTTPCache(ttl=60, max_entries=size)
+    http_cache.store("a", b"a", {})
+    http_cache.store("b", b"b", {})
+    http_cache.lookup("a")
+    http_cache.store("c", b"c", {})
+    assert len(http_cache) == size
+    assert http_cache.lookup("c") is not None
+    assert (http_cache.lookup("a") is not None) == (size == 2)
+    http_cache.clear()
+    assert len(http_cache) == 0
+
+
+def test_max_bytes():
+    http_cache = cache.HTTPCache(ttl=60, max_bytes=5)
+    http_cache.store("a", b"aa", {})
+    http_cache.store("b", b"bb", {})
+    http_cache.store("a", b"a", {})
+    assert http_cache.size == 3
+    http_cache.store("c", b"ccc", {})
+    assert http_cache.lookup("b") is None
+    assert http_cache.size == 4
+    http_cache.store("d", b"dddddd", {})
+    assert http_cache.lookup("d") is None
+    assert len(http_cache) == 2
+    http_cache.clear()
+    assert http_cache.size == 0
@@ -1,4 +1,8 @@
+import json
+import threading
+import time
 import typing
+from concurrent import futures
 
 import pytest
 import requests
@@ -12,6 +16,12 @@ def make_session():
         yield session
 
 
+@pytest.fixture(autouse=True)
+def clear_page_sizes(monkeypatch):
+    # noinspection PyProtectedMember
+    monkeypatch.setattr(client, "_page_sizes", {})
+
+
 def test_iss_client_iterable():
     assert issubclass(client.ISSClient, typing.Iterable)
 
@@ -58,11 +68,9 @@ def test_get_wrong_url(session):
     assert "https://iss.moex.com/iss/securities1.json?iss.json=extended&iss.meta=off" in str(error.value)
 
 
-def test_get_wrong_json(monkeypatch, session):
+def test_get_wrong_json(session):
     url = "https://iss.moex.com/iss/securities.json"
-    iss = client.ISSClient(session, url)
-    # noinspection PyProtectedMember
-    monkeypatch.setattr(requests.Response, "json", lambda x: [0, 1, 2])
+    iss = client.ISSClient(session, url, decoder=lambda x: [0, 1, 2])
     with pytest.raises(client.ISSMoexError) as error:
         iss.get()
     assert "Ответ содержит некорректные данные" in str(error.value)
@@ -95,7 +103,7 @@ def test_make_query_not_empty_with_start(session):
     # noinspection PyProtectedMember
     query = iss._make_query(704)
     assert isinstance(query, dict)
-    assert len(query) == 4
+    assert len(query) == 5
     assert query["iss.json"] == "extended"
     assert query["iss.meta"] == "off"
     assert query["test_param"] == "test_value"
@@ -154,3 +162,354 @@ def test_wrong_cursor_index(monkeypatch, session):
     with pytest.raises(client.ISSMoexError) as error:
         iss.get_all()
     assert "Некорректные данные history.cursor [{'INDEX': 1}] для начальной позиции 0" in str(error.value)
+
+
+def fake_cursor_get(total, page_size):
+    def get(start):
+        time.sleep(0.01 * ((total - start) % 3))
+        return {
+            "history": [{"N": n} for n in range(start, min(start + page_size, total))],
+            "history.cursor": [{"INDEX": start, "TOTAL": total, "PAGESIZE": page_size}],
+        }
+
+    return get
+
+
+@pytest.mark.parametrize("workers", [1, 2, 5])
+def test_get_all_parallel(monkeypatch, session, workers):
+    iss = client.ISSClient(session, "", workers=workers)
+    monkeypatch.setattr(iss, "get", fake_cursor_get(23, 3))
+    data = iss.get_all()
+    assert data == {"history": [{"N": n} for n in range(23)]}
+
+
+def test_get_all_parallel_wrong_cursor(monkeypatch, session):
+    iss = client.ISSClient(session, "", workers=3)
+    get = fake_cursor_get(10, 2)
+    monkeypatch.setattr(iss, "get", lambda start: get(start + (start == 6)))
+    with pytest.raises(client.ISSMoexError) as error:
+        iss.get_all()
+    assert "для начальной позиции 6" in str(error.value)
+
+
+def test_wrong_workers(session):
+    with pytest.raises(client.ISSMoexError) as error:
+        client.ISSClient(session, "", workers=0)
+    assert "Количество одновременно загружаемых блоков должно быть положительным - 0" in str(error.value)
+
+
+def test_make_query_compact(session):
+    iss = client.ISSClient(session, "test_url", dict(test_param="test_value"))
+    # noinspection PyProtectedMember
+    query = iss._make_query(704, compact=True)
+    assert query == {
+        "iss.json": "compact",
+        "iss.meta": "off",
+        "limit": client.MAX_LIMIT,
+        "test_param": "test_value",
+        "start": 704,
+    }
+
+
+def test_make_query_limit(session):
+    iss = client.ISSClient(session, "test_url")
+    # noinspection PyProtectedMember
+    assert iss._make_query(0)["limit"] == client.MAX_LIMIT
+    # noinspection PyProtectedMember
+    assert "limit" not in iss._make_query()
+    iss = client.ISSClient(session, "test_url", dict(limit=10))
+    # noinspection PyProtectedMember
+    assert iss._make_query(0)["limit"] == 10
+    iss = client.ISSClient(session, "test_url", limit=None)
+    # noinspection PyProtectedMember
+    assert "limit" not in iss._make_query(0)
+
+
+def test_extract_columns():
+    raw = {
+        "history": {"columns": ["TRADEDATE", "CLOSE"], "data": [["2020-01-03", 1.5], ["2020-01-04", 2]]},
+        "empty": {"columns": ["A"], "data": []},
+    }
+    # noinspection PyProtectedMember
+    data = client.ISSClient._extract_columns(raw, "url")
+    assert data == {"history": {"TRADEDATE": ["2020-01-03", "2020-01-04"], "CLOSE": [1.5, 2]}, "empty": {"A": []}}
+
+
+def test_extract_columns_wrong_json():
+    with pytest.raises(client.ISSMoexError) as error:
+        # noinspection PyProtectedMember
+        client.ISSClient._extract_columns({"history": [1, 2]}, "url")
+    assert "Ответ содержит некорректные данные" in str(error.value)
+
+
+def test_extract_metadata():
+    raw = {
+        "history": {
+            "metadata": {"TRADEDATE": {"type": "date", "bytes": 10}, "CLOSE": {"type": "double"}},
+            "columns": ["TRADEDATE", "CLOSE"],
+            "data": [],
+        },
+    }
+    # noinspection PyProtectedMember
+    metadata = client.ISSClient._extract_metadata(raw, "url")
+    assert metadata == {"history": {"TRADEDATE": "date", "CLOSE": "double"}}
+
+
+def test_extract_metadata_wrong_json():
+    with pytest.raises(client.ISSMoexError) as error:
+        # noinspection PyProtectedMember
+        client.ISSClient._extract_metadata({"history": {"columns": []}}, "url")
+    assert "Ответ содержит некорректные метаданные" in str(error.value)
+
+
+@pytest.mark.parametrize("rows", [[["2020-01-03", 1.5], ["2020-01-04"]], [["2020-01-03", 1.5, 7]]])
+def test_extract_columns_wrong_rows(rows):
+    with pytest.raises(client.ISSMoexError) as error:
+        # noinspection PyProtectedMember
+        client.ISSClient._extract_columns({"history": {"columns": ["TRADEDATE", "CLOSE"], "data": rows}}, "url")
+    assert "Строки таблицы history имеют разную длину или не соответствуют столбцам" in str(error.value)
+
+
+def test_get_metadata_query(monkeypatch, session):
+    queries = []
+
+    def fake_get_json(query):
+        queries.append(query)
+        return {"history": {"metadata": {"CLOSE": {"type": "double"}}}}, "url"
+
+    iss = client.ISSClient(session, "", {"iss.only": "history"})
+    monkeypatch.setattr(iss, "_get_json", fake_get_json)
+    assert iss.get_metadata() == {"history": {"CLOSE": "double"}}
+    assert queries == [{"iss.json": "compact", "iss.meta": "on", "iss.data": "off", "iss.only": "history"}]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_get_all_columns_with_cursor(monkeypatch, session, workers):
+    def fake_get_columns(start):
+        return {
+            "history": {"N": list(range(start, min(start + 3, 8)))},
+            "history.cursor": {"INDEX": [start], "TOTAL": [8], "PAGESIZE": [3]},
+        }
+
+    iss = client.ISSClient(session, "", workers=workers)
+    monkeypatch.setattr(iss, "get_columns", fake_get_columns)
+    assert iss.get_all_columns() == {"history": {"N": list(range(8))}}
+
+
+def test_get_all_columns_without_cursor(monkeypatch, session):
+    iss = client.ISSClient(session, "")
+    monkeypatch.setattr(iss, "get_columns", lambda start: {"candles": {"N": [start, start + 1] if start < 4 else []}})
+    assert iss.get_all_columns() == {"candles": {"N": [0, 1, 2, 3]}}
+
+
+def fake_pages(monkeypatch, iss, sizes):
+    starts = []
+
+    def fake_get(start):
+        starts.append(start)
+        position = sum(sizes[: len(starts) - 1])
+        return {"candles": [{"N": n} for n in range(position, position + sizes[len(starts) - 1])]}
+
+    monkeypatch.setattr(iss, "get", fake_get)
+
+    return starts
+
+
+def test_page_size_learned_without_cursor(monkeypatch, session):
+    url = "https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities/{}/candles.json"
+    iss = client.ISSClient(session, url.format("SNGSP"))
+    starts = fake_pages(monkeypatch, iss, [3, 3, 1, 0])
+    assert iss.page_size is None
+    assert iss.get_all() == {"candles": [{"N": n} for n in range(7)]}
+    assert starts == [0, 3, 6, 7]
+    # noinspection PyProtectedMember
+    assert client._page_sizes == {("/iss/engines/*/markets/*/boards/*/securities/*/candles.json", "5000"): 3}
+    assert client.ISSClient(session, url.format("GAZP")).page_size == 3
+
+
+def test_short_block_not_last(monkeypatch, session):
+    url = "https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities/{}/candles.json"
+    iss = client.ISSClient(session, url.format("SNGSP"))
+    fake_pages(monkeypatch, iss, [3, 3, 0])
+    iss.get_all()
+    assert iss.page_size == 3
+
+    iss = client.ISSClient(session, url.format("GAZP"))
+    starts = fake_pages(monkeypatch, iss, [2, 3, 0])
+    assert iss.get_all() == {"candles": [{"N": n} for n in range(5)]}
+    assert starts == [0, 2, 5]
+
+
+def test_page_size_not_learned_from_single_block(monkeypatch, session):
+    iss = client.ISSClient(session, "url")
+    starts = fake_pages(monkeypatch, iss, [2, 0])
+    iss.get_all()
+    assert starts == [0, 2]
+    # noinspection PyProtectedMember
+    assert client._page_sizes == {}
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_page_size_learned_from_cursor(monkeypatch, session, workers):
+    iss = client.ISSClient(session, "url", workers=workers, limit=None)
+    monkeypatch.setattr(iss, "get", fake_cursor_get(8, 3))
+    iss.get_all()
+    # noinspection PyProtectedMember
+    assert client._page_sizes == {("url", "None"): 3}
+
+
+def fake_blocks(monkeypatch, iss, sizes):
+    starts = []
+
+    def fake_get(start):
+        starts.append(start)
+        return {"candles": [{"N": n} for n in range(start, start + sizes.get(start, 0))]}
+
+    monkeypatch.setattr(iss, "get", fake_get)
+
+    return starts
+
+
+@pytest.mark.parametrize(
+    ("sizes", "rows"),
+    [
+        ({0: 3, 3: 3, 6: 3, 9: 3, 12: 1}, 13),
+        ({0: 3, 3: 3, 6: 2, 8: 3, 11: 3, 14: 2, 16: 3}, 19),
+    ],
+)
+def test_parallel_without_cursor(monkeypatch, session, sizes, rows):
+    iss = client.ISSClient(session, "url", workers=3)
+    starts = fake_blocks(monkeypatch, iss, sizes)
+    assert iss.get_all() == {"candles": [{"N": n} for n in range(rows)]}
+    assert starts[:2] == [0, 3]
+    assert rows in starts
+    # Параллельная загрузка после неполного блока продолжается с его окончания
+    assert all(start in starts for start in sizes)
+
+
+def test_get_all_columns(session):
+    url = "https://iss.moex.com/iss/history/engines/stock/markets/shares/securities/SNGSP.json"
+    query = {"from": "2018-01-01", "till": "2018-03-01"}
+    iss = client.ISSClient(session, url, query)
+    expected = iss.get_all()["history"]
+    data = iss.get_all_columns()["history"]
+    assert data["TRADEDATE"] == [row["TRADEDATE"] for row in expected]
+    assert data["CLOSE"] == [row["CLOSE"] for row in expected]
+
+
+def fake_slow_get_json(monkeypatch, release, data):
+    queries = []
+
+    def fake_get_json(self, query):
+        queries.append(query)
+        release.wait(5)
+        if isinstance(data, Exception):
+            raise data
+        return data, "url"
+
+    monkeypatch.setattr(client.ISSClient, "_get_json", fake_get_json)
+
+    return queries
+
+
+def get_concurrently(iss_clients, release):
+    with futures.ThreadPoolExecutor(len(iss_clients)) as executor:
+        pending = [executor.submit(iss.get) for iss in iss_clients]
+        # noinspection PyProtectedMember
+        while sum(flight.waiters for flight in client._flights._flights.values()) < len(iss_clients) - 1:
+            time.sleep(0.001)
+        release.set()
+
+    return pending
+
+
+def test_get_single_flight(monkeypatch, session):
+    release = threading.Event()
+    raw = [{}, {"securities": [{"secid": "SNGSP"}]}]
+    queries = fake_slow_get_json(monkeypatch, release, raw)
+    iss_clients = [client.ISSClient(session, "url", {"q": "SNGSP", "iss.only": "securities"}) for _ in range(2)]
+    iss_clients.append(client.ISSClient(session, "url", {"iss.only": "securities", "q": "SNGSP"}))
+    results = [future.result() for future in get_concurrently(iss_clients, release)]
+    assert len(queries) == 1
+    assert all(data == raw[1] for data in results)
+    assert len({id(data["securities"]) for data in results}) == len(results)
+
+
+def test_get_single_flight_error(monkeypatch, session):
+    release = threading.Event()
+    fake_slow_get_json(monkeypatch, release, client.ISSMoexError("Неверный url"))
+    iss_clients = [client.ISSClient(session, "url") for _ in range(3)]
+    for future in get_concurrently(iss_clients, release):
+        with pytest.raises(client.ISSMoexError, match="Неверный url"):
+            future.result()
+
+
+def test_single_flight_leader_interrupted():
+    flights = client._SingleFlight()
+    key = (0, "url", ())
+
+    def interrupted():
+        while not flights._flights[key].waiters:
+            time.sleep(0.001)
+        raise KeyboardInterrupt
+
+    with futures.ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(flights.do, key, interrupted)
+        while key not in flights._flights:
+            time.sleep(0.001)
+        waiter = executor.submit(flights.do, key, lambda: {"securities": []})
+        with pytest.raises(KeyboardInterrupt):
+            leader.result()
+        assert waiter.result() == {"securities": []}
+    assert not flights._flights
+
+
+def test_get_single_flight_per_session(monkeypatch):
+    release = threading.Event()
+    queries = fake_slow_get_json(monkeypatch, release, [{}, {"securities": []}])
+    with requests.Session() as first, requests.Session() as second, futures.ThreadPoolExecutor(2) as executor:
+        pending = []
+        for number, session in enumerate((first, second), 1):
+            pending.append(executor.submit(client.ISSClient(session, "url").get))
+            while len(queries) < number:
+                time.sleep(0.001)
+        release.set()
+    assert all(future.result() == {"securities": []} for future in pending)
+    assert len(queries) == 2
+
+
+def test_get_single_flight_sequential(monkeypatch, session):
+    release = threading.Event()
+    release.set()
+    queries = fake_slow_get_json(monkeypatch, release, [{}, {"securities": []}])
+    iss = client.ISSClient(session, "url")
+    iss.get()
+    iss.get()
+    assert len(queries) == 2
+
+
+def test_extract_table():
+    assert client.extract_table(dict(a="b"), "a") == "b"
+
+
+def test_extract_table_notable():
+    with pytest.raises(client.ISSMoexError) as error:
+        client.extract_table(dict(a="b"), "b")
+    assert "Отсутствует таблица b в данных" in str(error.value)
+
+
+def test_default_decoder():
+    assert client.DEFAULT_DECODER(b'[{"a": 1}, {"b": [2.5, "c"]}]') == [{"a": 1}, {"b": [2.5, "c"]}]
+
+
+def test_custom_decoder(session):
+    url = "https://iss.moex.com/iss/securities.json"
+    bodies = []
+
+    def decoder(body):
+        bodies.append(body)
+        return json.loads(body)
+
+    iss = client.ISSClient(session, url, dict(q="1-02-65104-D"), decoder=decoder)
+    assert iss.get()["securities"][1]["regnumber"] == "1-02-65104-D"
+    assert isinstance(bodies[0], bytes)
@@ -0,0 +1,90 @@
+import pytest
+import requests
+
+from apimoex import client, metrics
+
+
+@pytest.fixture(name="registry")
+def make_registry():
+    registry = metrics.Metrics()
+    metrics.set_default(registry)
+    yield registry
+    metrics.set_default(None)
+
+
+@pytest.mark.parametrize(
+    ("url", "template"),
+    [
+        (
+            "https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities/SNGSP/candles.json?start=100",
+            "/iss/engines/*/markets/*/boards/*/securities/*/candles.json",
+        ),
+        (
+            "https://iss.moex.com/iss/history/engines/stock/markets/shares/boards/TQBR/securities/SNGSP.json",
+            "/iss/history/engines/*/markets/*/boards/*/securities/*.json",
+        ),
+        ("https://iss.moex.com/iss/securities.json", "/iss/securities.json"),
+        ("https://iss.moex.com/iss/index.json", "/iss/index.json"),
+    ],
+)
+def test_endpoint(url, template):
+    assert metrics.endpoint(url) == template
+
+
+def test_export_empty():
+    assert metrics.Metrics().export() == ""
+
+
+def test_export():
+    registry = metrics.Metrics(seconds_buckets=(0.1, 1.0))
+    registry.observe_request("/iss/a.json", 0.5, 100)
+    registry.observe_request("/iss/a.json", 2.0, 50)
+    registry.count_retry('/iss/"b".json')
+    lines = registry.export().splitlines()
+    assert "# TYPE apimoex_request_seconds histogram" in lines
+    assert 'apimoex_request_seconds_bucket{endpoint="/iss/a.json",le="0.1"} 0' in lines
+    assert 'apimoex_request_seconds_bucket{endpoint="/iss/a.json",le="1.0"} 1' not in lines
+    assert 'apimoex_request_seconds_bucket{endpoint="/iss/a.json",le="1"} 1' in lines
+    assert 'apimoex_request_seconds_bucket{endpoint="/iss/a.json",le="+Inf"} 2' in lines
+    assert 'apimoex_request_seconds_sum{endpoint="/iss/a.json"} 2.5' in lines
+    assert 'apimoex_request_seconds_count{endpoint="/iss/a.json"} 2' in lines
+    assert 'apimoex_response_bytes_total{endpoint="/iss/a.json"} 150' in lines
+    assert 'apimoex_retries_total{endpoint="/iss/\\"b\\".json"} 1' in lines
+    assert not any(line.startswith("apimoex_parse_seconds") for line in lines)
+
+
+def test_client_metrics(monkeypatch, registry):
+    url = "https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities/SNGSP/candles.json"
+    iss = client.ISSClient(requests.Session(), url)
+    pages = {
+        0: b'[{"charsetinfo": {}}, {"candles": [{"N": 0}, {"N": 1}]}]',
+        2: b'[{"charsetinfo": {}}, {"candles": [{"N": 2}]}]',
+        3: b'[{"charsetinfo": {}}, {"candles": []}]',
+    }
+    monkeypatch.setattr(iss, "_get_content", lambda query: (pages[query.get("start", 0)], url))
+    assert len(iss.get_all()["candles"]) == 3
+
+    template = "/iss/engines/*/markets/*/boards/*/securities/*/candles.json"
+    lines = registry.export().splitlines()
+    assert f'apimoex_request_seconds_count{{endpoint="{template}"}} 3' in lines
+    assert f'apimoex_parse_seconds_count{{endpoint="{template}"}} 3' in lines
+    assert f'apimoex_rows_total{{endpoint="{template}"}} 3' in lines
+    assert f'apimoex_response_bytes_total{{endpoint="{template}"}} {sum(map(len, pages.values()))}' in lines
+    assert f'apimoex_pages_bucket{{endpoint="{template}",le="2"}} 0' in lines
+    assert f'apimoex_pages_bucket{{endpoint="{template}",le="5"}} 1' in lines
+
+
+def test_client_errors(monkeypatch, registry):
+    iss = client.ISSClient(requests.Session(), "https://iss.moex.com/iss/index.json")
+    monkeypatch.setattr(iss, "_get_content", lambda query: (b"[0, 1, 2]", "url"))
+    with pytest.raises(client.ISSMoexError):
+        iss.get()
+    assert 'apimoex_errors_total{endpoint="/iss/index.json"} 1' in registry.export().splitlines()
+
+
+def test_client_without_metrics(monkeypatch):
+    iss = client.ISSClient(requests.Session(), "https://iss.moex.com/iss/index.json")
+    monkeypatch.setattr(iss, "_get_content", lambda query: (b'[{}, {"a": [{"b": 1}]}]', "url"))
+    # noinspection PyProtectedMember
+    assert iss._metrics is None
+    assert iss.get() == {"a": [{"b": 1}]}
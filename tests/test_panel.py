@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+import requests
+
+from apimoex import client, panel, parallel
+
+
+@pytest.fixture(scope="module", name="session")
+def make_session():
+    with requests.Session() as session:
+        yield session
+
+
+def make_row(date, close, board="TQBR", volume=10):
+    return {"BOARDID": board, "TRADEDATE": date, "CLOSE": close, "VOLUME": volume, "VALUE": (close or 0) * volume}
+
+
+TABLES = {
+    "SBER": [make_row("2020-01-03", 250), make_row("2020-01-06", 253)],
+    "GAZP": [make_row("2020-01-06", 257), make_row("2020-01-08", None)],
+}
+
+
+def assert_matrix(actual, expected):
+    np.testing.assert_array_equal(actual, np.array(expected, dtype=np.float64))
+
+
+def test_build_panel():
+    result = panel.build_panel(TABLES)
+    assert result.dates.tolist() == np.array(["2020-01-03", "2020-01-06", "2020-01-08"], dtype="datetime64[D]").tolist()
+    assert result.securities == ("GAZP", "SBER")
+    assert list(result.fields) == ["CLOSE", "VOLUME", "VALUE"]
+    assert_matrix(result.fields["CLOSE"], [[np.nan, 250], [257, 253], [np.nan, np.nan]])
+    assert_matrix(result.fields["VOLUME"], [[np.nan, 10], [10, 10], [10, np.nan]])
+
+
+def test_build_panel_from_security_data():
+    results = [parallel.SecurityData(security, table) for security, table in reversed(TABLES.items())]
+    result = panel.build_panel(iter(results), ("CLOSE",))
+    assert result.securities == ("GAZP", "SBER")
+    assert_matrix(result.fields["CLOSE"], panel.build_panel(TABLES).fields["CLOSE"])
+
+
+def test_build_panel_error():
+    results = [parallel.SecurityData("BAD", [], client.ISSMoexError("Неверный url"))]
+    with pytest.raises(client.ISSMoexError, match="Ошибка загрузки истории торгов BAD"):
+        panel.build_panel(results)
+
+
+@pytest.mark.parametrize(
+    ("boards", "expected"),
+    [
+        (None, [[2, 1]]),
+        (("TQBR", "SMAL"), [[1, 1]]),
+        (("SMAL",), [[2, np.nan]]),
+    ],
+)
+def test_build_panel_boards(boards, expected):
+    tables = {
+        "A": [make_row("2020-01-03", 1), make_row("2020-01-03", 2, "SMAL")],
+        "B": [make_row("2020-01-03", 1)],
+    }
+    result = panel.build_panel(tables, ("CLOSE",), boards)
+    assert_matrix(result.fields["CLOSE"], expected)
+    tables["A"].reverse()
+    assert_matrix(panel.build_panel(tables, ("CLOSE",), boards).fields["CLOSE"], expected)
+
+
+def test_build_panel_excluded_board_dates():
+    tables = {"A": [make_row("2020-01-03", 1), make_row("2020-01-04", 2, "SMAL")]}
+    result = panel.build_panel(tables, ("CLOSE",), boards=("TQBR",))
+    assert result.dates.tolist() == np.array(["2020-01-03"], dtype="datetime64[D]").tolist()
+    assert_matrix(result.fields["CLOSE"], [[1]])
+
+
+def test_build_panel_empty():
+    result = panel.build_panel({})
+    assert len(result.dates) == 0
+    assert result.securities == ()
+    assert result.fields["CLOSE"].shape == (0, 0)
+
+
+def test_build_panel_wrong_tables():
+    with pytest.raises(client.ISSMoexError, match="необходим столбец TRADEDATE"):
+        panel.build_panel({"A": [{"CLOSE": 1}]})
+    results = [parallel.SecurityData("A", []), parallel.SecurityData("A", [])]
+    with pytest.raises(client.ISSMoexError, match="Повторяющиеся тикеры"):
+        panel.build_panel(results)
+
+
+def test_get_board_history_panel(monkeypatch, session):
+    calls = []
+
+    def fake_history(_, security, start, end, columns, board, market, engine):
+        calls.append((start, end, columns, board))
+        return [make_row("2020-01-03", 1), make_row("2020-01-03", 2, "SMAL")] if security == "A" else []
+
+    monkeypatch.setattr(parallel.iss_requests, "get_board_history", fake_history)
+    result = panel.get_board_history_panel(session, ["A", "B"], "2020-01-01", "2020-01-31", ("CLOSE",))
+    assert calls == [("2020-01-01", "2020-01-31", ("BOARDID", "TRADEDATE", "CLOSE"), "TQBR")] * 2
+    assert result.securities == ("A", "B")
+    assert_matrix(result.fields["CLOSE"], [[1, np.nan]])
@@ -0,0 +1,222 @@
+import itertools
+import time
+
+import pytest
+from requests import Session
+
+from apimoex import client, parallel
+
+
+@pytest.fixture(scope="module", name="session")
+def make_session():
+    with Session() as session:
+        yield session
+
+
+def test_split_dates():
+    # noinspection PyProtectedMember
+    windows = parallel._split_dates("2020-01-30", "2020-02-08", 3)
+    assert windows == [("2020-01-30", "2020-02-01"), ("2020-02-02", "2020-02-04"), ("2020-02-05", "2020-02-08")]
+
+
+def test_split_dates_short():
+    # noinspection PyProtectedMember
+    windows = parallel._split_dates("2020-01-30", "2020-01-31", 8)
+    assert windows == [("2020-01-30", "2020-01-30"), ("2020-01-31", "2020-01-31")]
+
+
+def test_stitch():
+    parts = [[{"begin": "a"}, {"begin": "b"}], [{"begin": "b"}, {"begin": "c"}], [], [{"begin": "d"}]]
+    # noinspection PyProtectedMember
+    assert parallel._stitch(parts, "begin") == [{"begin": key} for key in "abcd"]
+
+
+def fake_candles(security, interval, start, end, *_):
+    first = int(start[-2:])
+    last = int(end[-2:])
+    return [{"begin": f"2020-01-{day:02} 10:00:00", "close": day} for day in range(first, last + 1) if day % 2]
+
+
+def test_get_board_candles_sharded(monkeypatch, session):
+    borders = [
+        {"begin": "2020-01-01 10:00:00", "end": "2020-01-20 18:00:00", "interval": 24},
+        {"begin": "2020-01-10 10:00:00", "end": "2020-01-20 18:40:00", "interval": 1},
+    ]
+    monkeypatch.setattr(parallel.iss_requests, "get_board_candle_borders", lambda *_: borders)
+    monkeypatch.setattr(parallel.iss_requests, "get_board_candles", lambda _, *args: fake_candles(*args))
+    data = parallel.get_board_candles_sharded(session, "GAZP", start="2020-01-03", workers=4)
+    assert data == [{"begin": f"2020-01-{day:02} 10:00:00", "close": day} for day in range(3, 21, 2)]
+
+
+def test_get_board_candles_sharded_no_interval(monkeypatch, session):
+    monkeypatch.setattr(parallel.iss_requests, "get_board_candle_borders", lambda *_: [])
+    assert parallel.get_board_candles_sharded(session, "GAZP") == []
+
+
+def test_get_board_candles_sharded_no_begin(session):
+    with pytest.raises(client.ISSMoexError) as error:
+        parallel.get_board_candles_sharded(session, "GAZP", columns=("close",))
+    assert "Для параллельной загрузки свечей необходим столбец begin - ('close',)" in str(error.value)
+
+
+def test_get_market_candles_sharded(session):
+    data = parallel.get_market_candles_sharded(session, "SNGSP", start="2020-01-01", end="2020-12-31", workers=4)
+    expected = parallel.iss_requests.get_market_candles(session, "SNGSP", start="2020-01-01", end="2020-12-31")
+    assert data == expected
+
+
+def fake_history(_, security, *args):
+    if security == "BAD":
+        raise client.ISSMoexError("Неверный url")
+    return [{"SECID": security}]
+
+
+def test_get_board_history_many(monkeypatch, session):
+    monkeypatch.setattr(parallel.iss_requests, "get_board_history", fake_history)
+    results = list(parallel.get_board_history_many(session, ["GAZP", "BAD", "SBER"], workers=2))
+    assert len(results) == 3
+    results = {result.security: result for result in results}
+    assert results["GAZP"] == ("GAZP", [{"SECID": "GAZP"}], None)
+    assert results["SBER"].data == [{"SECID": "SBER"}]
+    assert results["BAD"].data == []
+    assert isinstance(results["BAD"].error, client.ISSMoexError)
+
+
+def test_get_many_unexpected_error():
+    def load(security):
+        if security == "BAD":
+            raise KeyError("history")
+        return [{"SECID": security}]
+
+    results = {result.security: result for result in parallel.get_many(load, ["GAZP", "BAD"], workers=2)}
+    assert results["GAZP"].data == [{"SECID": "GAZP"}]
+    assert results["BAD"].data == []
+    assert isinstance(results["BAD"].error, KeyError)
+
+
+def test_get_many_interrupt():
+    def load(security):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        list(parallel.get_many(load, ["GAZP"], workers=1))
+
+
+def test_get_board_candles_many(monkeypatch, session):
+    monkeypatch.setattr(parallel.iss_requests, "get_board_candles", fake_history)
+    results = parallel.get_board_candles_many(session, ["GAZP", "SBER"])
+    assert sorted(results) == [("GAZP", [{"SECID": "GAZP"}], None), ("SBER", [{"SECID": "SBER"}], None)]
+
+
+def test_get_board_history_by_dates(monkeypatch, session):
+    calls = []
+
+    def fake_history_by_date(_, date, columns, board, market, engine):
+        calls.append((date, columns, board, market, engine))
+        time.sleep(0.01 * (date == "2020-01-03"))
+        if date == "2020-01-04":
+            return []
+        return [{"TRADEDATE": date, "SECID": "GAZP"}, {"TRADEDATE": date, "SECID": "SBER"}]
+
+    monkeypatch.setattr(parallel.iss_requests, "get_board_history_by_date", fake_history_by_date)
+    monkeypatch.setattr(
+        parallel.iss_requests,
+        "get_board_dates",
+        lambda _, board, market, engine: [{"from": "1997-03-24", "till": "2020-01-05"}],
+    )
+    data = parallel.get_board_history_by_dates(session, "2020-01-03", "2020-01-08", ("SECID",), board="SMAL")
+    assert [(row["TRADEDATE"], row["SECID"]) for row in data] == [
+        ("2020-01-03", "GAZP"),
+        ("2020-01-03", "SBER"),
+        ("2020-01-05", "GAZP"),
+        ("2020-01-05", "SBER"),
+    ]
+    assert sorted(calls) == [(f"2020-01-0{day}", ("SECID",), "SMAL", "shares", "stock") for day in (3, 4, 5)]
+
+
+def test_get_board_history_by_trading_dates(monkeypatch, session):
+    calls = []
+
+    def fake_history_by_date(_, date, *args):
+        calls.append(date)
+        return [{"TRADEDATE": date}]
+
+    monkeypatch.setattr(parallel.iss_requests, "get_board_history_by_date", fake_history_by_date)
+    trading_dates = ["2020-01-09", "2019-12-31", "2020-01-03", "2020-01-06", "2020-01-03"]
+    data = parallel.get_board_history_by_dates(session, "2020-01-01", "2020-01-08", trading_dates=trading_dates)
+    assert data == [{"TRADEDATE": "2020-01-03"}, {"TRADEDATE": "2020-01-06"}]
+    assert sorted(calls) == ["2020-01-03", "2020-01-06"]
+
+
+def test_get_board_history_by_dates_no_board_dates(monkeypatch, session):
+    monkeypatch.setattr(parallel.iss_requests, "get_board_dates", lambda *_: [])
+    assert parallel.get_board_history_by_dates(session, "2020-01-01", "2020-01-08") == []
+
+
+@pytest.fixture(name="lineage")
+def fake_lineage(monkeypatch):
+    calls = []
+
+    def fake_find_securities(_, string, columns):
+        calls.append(string)
+        if not string:
+            return []
+        return [
+            {"secid": "NEW", "regnumber": string},
+            {"secid": "OLD", "regnumber": string},
+            {"secid": "OTHER", "regnumber": f"{string}-001"},
+        ]
+
+    # noinspection PyProtectedMember
+    monkeypatch.setattr(parallel, "_lineages", {})
+    monkeypatch.setattr(parallel.iss_requests, "find_securities", fake_find_securities)
+
+    return calls
+
+
+def test_find_ticker_lineage(lineage, session):
+    assert parallel.find_ticker_lineage(session, "1-02-65104-D") == ("NEW", "OLD")
+    assert parallel.find_ticker_lineage(session, "1-02-65104-D") == ("NEW", "OLD")
+    assert lineage == ["1-02-65104-D"]
+    parallel.find_ticker_lineage(session, "1-02-65104-D", ttl=0)
+    assert len(lineage) == 2
+
+
+def make_history(security, *dates):
+    return [{"BOARDID": "TQBR", "TRADEDATE": date, "SECID": security} for date in dates]
+
+
+def test_get_market_history_stitched(lineage, monkeypatch, session):
+    histories = {
+        "OLD": make_history("OLD", "2020-01-03", "2020-01-06", "2020-01-08"),
+        "NEW": make_history("NEW", "2020-01-06", "2020-01-08", "2020-01-09"),
+    }
+    histories["OLD"].insert(2, {"BOARDID": "SMAL", "TRADEDATE": "2020-01-06", "SECID": "OLD"})
+
+    def fake_history(_, security, *args):
+        time.sleep(0.01 * (security == "OLD"))
+        return histories[security]
+
+    monkeypatch.setattr(parallel.iss_requests, "get_market_history", fake_history)
+    data = parallel.get_market_history_stitched(session, "1-02-65104-D", workers=2)
+    assert [(row["TRADEDATE"], row["SECID"], row["BOARDID"]) for row in data] == [
+        ("2020-01-03", "OLD", "TQBR"),
+        ("2020-01-06", "OLD", "TQBR"),
+        ("2020-01-06", "OLD", "SMAL"),
+        ("2020-01-08", "OLD", "TQBR"),
+        ("2020-01-09", "NEW", "TQBR"),
+    ]
+
+
+def test_get_market_history_stitched_wrong(lineage, session):
+    with pytest.raises(client.ISSMoexError, match="необходим столбец TRADEDATE"):
+        parallel.get_market_history_stitched(session, "1-02-65104-D", columns=("CLOSE",))
+    with pytest.raises(client.ISSMoexError, match="Отсутствуют тикеры"):
+        parallel.get_market_history_stitched(session, "")
+
+
+def test_get_market_history_stitched_unipro(session):
+    assert parallel.find_ticker_lineage(session, "1-02-65104-D") == ("EONR", "OGK4", "UPRO")
+    data = parallel.get_market_history_stitched(session, "1-02-65104-D", end="2017-12-31")
+    assert {row["SECID"] for row in data} >= {"EONR", "UPRO"}
+    assert all(left["TRADEDATE"] <= right["TRADEDATE"] for left, right in itertools.pairwise(data))
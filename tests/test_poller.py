@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+import requests
+
+from apimoex import client, poller
+
+
+def make_candle(begin, close, volume):
+    return {"begin": f"2023-01-03 10:{begin:02}:00", "close": close, "volume": volume}
+
+
+@pytest.fixture(name="fake_candles")
+def make_fake_candles(monkeypatch):
+    candles = {"SNGSP": [], "GAZP": []}
+    calls = []
+
+    def fake_get_board_candles(session, security, interval, start, *args):
+        calls.append((security, start))
+        if security == "FAIL":
+            raise client.ISSMoexError("Неверный url")
+        return [row for row in candles[security] if row["begin"] >= start]
+
+    monkeypatch.setattr(poller.iss_requests, "get_board_candles", fake_get_board_candles)
+    return candles, calls
+
+
+def test_changed_rows():
+    last = make_candle(1, 10, 100)
+    data = [make_candle(1, 10, 100), make_candle(2, 11, 5)]
+    # noinspection PyProtectedMember
+    assert poller._changed_rows(data, None) == data
+    # noinspection PyProtectedMember
+    assert poller._changed_rows(data, last) == data[1:]
+    # noinspection PyProtectedMember
+    assert poller._changed_rows([make_candle(1, 11, 120), *data[1:]], last) == [make_candle(1, 11, 120), data[1]]
+
+
+def test_poll(fake_candles):
+    candles, calls = fake_candles
+    candles["SNGSP"].extend([make_candle(0, 10, 100), make_candle(1, 11, 5)])
+    iss = poller.CandlePoller(requests.Session(), ["SNGSP", "GAZP"], start="2023-01-03", workers=1)
+
+    assert iss.poll() == [poller.parallel.SecurityData("SNGSP", candles["SNGSP"])]
+    assert sorted(calls) == [("GAZP", "2023-01-03"), ("SNGSP", "2023-01-03")]
+
+    calls.clear()
+    assert iss.poll() == []
+    assert sorted(calls) == [("GAZP", "2023-01-03"), ("SNGSP", "2023-01-03 10:01:00")]
+
+    candles["SNGSP"][-1] = make_candle(1, 12, 7)
+    candles["SNGSP"].append(make_candle(2, 13, 1))
+    candles["GAZP"].append(make_candle(2, 150, 1))
+    results = sorted(iss.poll())
+    assert results == [
+        ("GAZP", [make_candle(2, 150, 1)], None),
+        ("SNGSP", [make_candle(1, 12, 7), make_candle(2, 13, 1)], None),
+    ]
+
+
+def test_poll_error(fake_candles):
+    iss = poller.CandlePoller(requests.Session(), ["FAIL", "GAZP"], start="2023-01-03")
+    (result,) = iss.poll()
+    assert result.security == "FAIL"
+    assert isinstance(result.error, client.ISSMoexError)
+
+
+def test_watch(fake_candles):
+    candles, calls = fake_candles
+    candles["SNGSP"].append(make_candle(0, 10, 100))
+    stop = threading.Event()
+    iss = poller.CandlePoller(requests.Session(), ["SNGSP"], start="2023-01-03")
+    watch = iss.watch(period=0.01, stop=stop)
+    assert next(watch) == [("SNGSP", [make_candle(0, 10, 100)], None)]
+    candles["SNGSP"].append(make_candle(1, 11, 1))
+    assert next(watch) == [("SNGSP", [make_candle(1, 11, 1)], None)]
+    stop.set()
+    with pytest.raises(StopIteration):
+        next(watch)
+    assert len(calls) >= 2
+
+
+def test_no_begin_column():
+    with pytest.raises(client.ISSMoexError, match="необходим столбец begin"):
+        poller.CandlePoller(requests.Session(), ["SNGSP"], columns=("close",))
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import typing
+
+import aiohttp
+import pytest
+from requests import Session
+
+from apimoex import async_client, async_requests, client, reference
+
+TABLES = {
+    "engines": [{"id": 1, "name": "stock"}],
+    "markets": [
+        {"id": 1, "trade_engine_name": "stock", "market_name": "shares"},
+        {"id": 5, "trade_engine_name": "stock", "market_name": "index"},
+    ],
+    "boards": [
+        {"id": 129, "market_id": 1, "boardid": "TQBR"},
+        {"id": 9, "market_id": 5, "boardid": "SNDX"},
+    ],
+}
+
+
+@pytest.fixture(scope="module", name="session")
+def make_session():
+    with Session() as session:
+        yield session
+
+
+@pytest.fixture(name="fake_index")
+def make_fake_index(monkeypatch):
+    calls = []
+
+    def fake_get(self, start=None):
+        calls.append(start)
+        return TABLES
+
+    monkeypatch.setattr(reference, "_snapshot", None)
+    monkeypatch.setattr(client.ISSClient, "get", fake_get)
+    return calls
+
+
+def test_snapshot_cached(session, fake_index):
+    snapshot = reference.get_reference_snapshot(session)
+    assert snapshot is reference.get_reference_snapshot(session)
+    assert snapshot.table("engines") == [{"id": 1, "name": "stock"}]
+    assert len(fake_index) == 1
+
+
+def test_snapshot_expired(session, fake_index):
+    snapshot = reference.get_reference_snapshot(session)
+    assert snapshot is not reference.get_reference_snapshot(session, ttl=-1)
+    assert len(fake_index) == 2
+
+
+def test_cached_read_not_blocked_by_refresh(monkeypatch, session):
+    release = threading.Event()
+    loading = threading.Event()
+
+    def slow_get(self, start=None):
+        loading.set()
+        release.wait(5)
+        return TABLES
+
+    monkeypatch.setattr(reference, "_snapshot", None)
+    monkeypatch.setattr(client.ISSClient, "get", lambda self, start=None: TABLES)
+    snapshot = reference.get_reference_snapshot(session)
+    monkeypatch.setattr(client.ISSClient, "get", slow_get)
+    refresh = threading.Thread(target=reference.get_reference_snapshot, args=(session, -1))
+    refresh.start()
+    try:
+        assert loading.wait(5)
+        assert reference.get_reference_snapshot(session) is snapshot
+    finally:
+        release.set()
+        refresh.join()
+    assert reference.get_reference_snapshot(session) is not snapshot
+
+
+def test_async_reference_shares_cache(monkeypatch, session, fake_index):
+    calls = []
+
+    async def fake_get(self, start=None):
+        calls.append(start)
+        return TABLES
+
+    monkeypatch.setattr(async_client.AsyncISSClient, "get", fake_get)
+
+    async def load():
+        session = typing.cast(aiohttp.ClientSession, None)
+        return [await async_requests.get_reference(session, "engines") for _ in range(2)]
+
+    assert asyncio.run(load()) == [[{"id": 1, "name": "stock"}]] * 2
+    assert len(calls) == 1
+    assert reference.get_reference_snapshot(session).table("engines") == [{"id": 1, "name": "stock"}]
+    assert not fake_index
+
+
+def test_table_is_copy(session, fake_index):
+    snapshot = reference.get_reference_snapshot(session)
+    snapshot.table("engines")[0]["name"] = "changed"
+    assert snapshot.table("engines")[0]["name"] == "stock"
+
+
+def test_no_table(session, fake_index):
+    with pytest.raises(client.ISSMoexError) as error:
+        reference.get_reference_snapshot(session).table("wrong")
+    assert "Отсутствует таблица wrong в данных" in str(error.value)
+
+
+def test_board_market(session, fake_index):
+    snapshot = reference.get_reference_snapshot(session)
+    assert snapshot.board_market("TQBR") == ("stock", "shares")
+    assert snapshot.board_market("SNDX") == ("stock", "index")
+    with pytest.raises(client.ISSMoexError) as error:
+        snapshot.board_market("WRONG")
+    assert "Отсутствует режим торгов WRONG в справочнике" in str(error.value)
@@ -0,0 +1,102 @@
+import pytest
+import requests
+from requests import adapters
+
+from apimoex import client, replay
+
+URL = "https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities.json"
+
+
+def make_response(status, content):
+    response = requests.Response()
+    response.status_code = status
+    response.headers["Content-Type"] = "application/json; charset=utf-8"
+    response._content = content
+    return response
+
+
+@pytest.fixture(name="fake_send")
+def make_fake_send(monkeypatch):
+    responses = {}
+    calls = []
+
+    def send(self, request, *args):
+        calls.append(request.url)
+        return responses[request.url]
+
+    monkeypatch.setattr(adapters.HTTPAdapter, "send", send)
+    return responses, calls
+
+
+def get(adapter, url, params=None):
+    with requests.Session() as session:
+        session.mount("https://iss.moex.com", adapter)
+        return session.get(url, params=params)
+
+
+def test_request_key():
+    assert replay.request_key(f"{URL}?b=2&a=1#x") == f"{URL}?a=1&b=2"
+    assert replay.request_key(URL) == URL
+
+
+def test_record_and_replay(tmp_path, fake_send):
+    responses, calls = fake_send
+    responses[f"{URL}?a=1&b=2"] = make_response(200, b'[{}, {"securities": []}]')
+    responses[f"{URL}?c=3"] = make_response(200, b'[{}, {"securities": []}]')
+    responses[f"{URL}?d=4"] = make_response(404, b"not found")
+
+    recorder = replay.ReplayAdapter(tmp_path, "record")
+    assert get(recorder, URL, {"a": 1, "b": 2}).content == b'[{}, {"securities": []}]'
+    get(recorder, URL, {"c": 3})
+    assert get(recorder, URL, {"d": 4}).status_code == 404
+    assert len(calls) == 3
+    assert len(list(tmp_path.glob("bodies/*/*.gz"))) == 2
+
+    cassette = replay.Cassette(tmp_path)
+    assert len(cassette) == 3
+    assert f"{URL}?b=2&a=1" in cassette
+    player = replay.ReplayAdapter(cassette)
+    response = get(player, URL, {"b": 2, "a": 1})
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/json; charset=utf-8"
+    assert response.json() == [{}, {"securities": []}]
+    assert get(player, URL, {"d": 4}).status_code == 404
+    assert len(calls) == 3
+
+
+def test_replay_client(tmp_path, fake_send):
+    responses, _ = fake_send
+    query = "iss.json=extended&iss.meta=off"
+    responses[f"{URL}?{query}"] = make_response(200, b'[{}, {"securities": [{"SECID": "SNGSP"}]}]')
+    with requests.Session() as session:
+        session.mount("https://iss.moex.com", replay.ReplayAdapter(tmp_path, "record"))
+        client.ISSClient(session, URL).get()
+    responses.clear()
+    with requests.Session() as session:
+        session.mount("https://iss.moex.com", replay.ReplayAdapter(tmp_path))
+        assert client.ISSClient(session, URL).get() == {"securities": [{"SECID": "SNGSP"}]}
+
+
+def test_replay_strict(tmp_path, fake_send):
+    responses, calls = fake_send
+    with pytest.raises(client.ISSMoexError, match="Отсутствует записанный ответ"):
+        get(replay.ReplayAdapter(tmp_path), URL)
+    assert not calls
+
+    responses[URL] = make_response(200, b"[]")
+    adapter = replay.ReplayAdapter(tmp_path, strict=False)
+    assert get(adapter, URL).content == b"[]"
+    assert get(adapter, URL).content == b"[]"
+    assert len(calls) == 1
+
+
+def test_retry_statuses_not_recorded(tmp_path, fake_send):
+    responses, _ = fake_send
+    responses[URL] = make_response(503, b"")
+    get(replay.ReplayAdapter(tmp_path, "record", retries=0), URL)
+    assert len(replay.Cassette(tmp_path)) == 0
+
+
+def test_wrong_mode(tmp_path):
+    with pytest.raises(client.ISSMoexError, match="Неизвестный режим работы"):
+        replay.ReplayAdapter(tmp_path, "play")
@@ -14,14 +14,12 @@ def make_session():
 
 
 def test_make_query_empty():
-    # noinspection PyProtectedMember
-    query = requests._make_query()
+    query = requests.make_query()
     assert query == {}
 
 
 def test_make_query_full():
-    # noinspection PyProtectedMember
-    query = requests._make_query(
+    query = requests.make_query(
         q="GAZP",
         interval=60,
         start="2019-10-09",
@@ -39,19 +37,6 @@ def test_make_query_full():
     assert query["new_table.columns"] == "4,a"
 
 
-def test_get_table():
-    # noinspection PyProtectedMember
-    query = requests._get_table(dict(a="b"), "a")
-    assert query == "b"
-
-
-def test_get_table_notable():
-    with pytest.raises(client.ISSMoexError) as error:
-        # noinspection PyProtectedMember
-        requests._get_table(dict(a="b"), "b")
-    assert "Отсутствует таблица b в данных" in str(error.value)
-
-
 def test_get_reference(session):
     data = requests.get_reference(session, "engines")
     assert isinstance(data, list)
@@ -265,9 +250,51 @@ def test_get_board_history_to_end(session):
     assert df.at["2018-08-28", "VOLUME"] == 47428
 
 
+def test_get_board_history_by_date(session):
+    data = requests.get_board_history_by_date(session, "2018-08-10")
+    df = pd.DataFrame(data)
+    df.set_index("SECID", inplace=True)
+    assert len(df) > 100
+    assert len(df.columns) == 5
+    assert (df["TRADEDATE"] == "2018-08-10").all()
+    assert df.at["LSRG", "VOLUME"] == 11313
+    assert df.at["LSRG", "VALUE"] == pytest.approx(8_626_464.5)
+
+
 def test_get_index_tickers(session):
     data = requests.get_index_tickers(session, index="IMOEX", date="2023-03-03")
     assert len(data) == 40
     assert data[15]["ticker"] == "MAGN"
     assert data[25]["till"] == "2023-03-03"
     assert data[35]["tradingsession"] == 3
+
+
+def test_iter_long_data(monkeypatch, session):
+    blocks = [{"candles": [{"N": 0}, {"N": 1}]}, {"candles": [{"N": 2}]}, {"candles": []}]
+    monkeypatch.setattr(client.ISSClient, "__iter__", lambda self: iter(blocks))
+    # noinspection PyProtectedMember
+    data = requests._iter_long_data(session, "url", "candles")
+    assert next(data) == [{"N": 0}, {"N": 1}]
+    assert list(data) == [[{"N": 2}]]
+
+
+def test_iter_long_data_notable(monkeypatch, session):
+    monkeypatch.setattr(client.ISSClient, "__iter__", lambda self: iter([{"history": []}]))
+    with pytest.raises(client.ISSMoexError) as error:
+        # noinspection PyProtectedMember
+        list(requests._iter_long_data(session, "url", "candles"))
+    assert "Отсутствует таблица candles в данных" in str(error.value)
+
+
+def test_iter_board_history(session):
+    data = requests.get_board_history(session, "SNGSP", start="2018-01-03", end="2018-06-01")
+    blocks = list(requests.iter_board_history(session, "SNGSP", start="2018-01-03", end="2018-06-01"))
+    assert len(blocks) > 1
+    assert [row for block in blocks for row in block] == data
+
+
+def test_iter_market_candles(session):
+    data = requests.get_market_candles(session, "SNGSP", interval=1, start="2020-01-13", end="2020-01-14")
+    blocks = list(requests.iter_market_candles(session, "SNGSP", interval=1, start="2020-01-13", end="2020-01-14"))
+    assert len(blocks) > 1
+    assert [row for block in blocks for row in block] == data
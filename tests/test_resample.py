@@ -0,0 +1,138 @@
+import pytest
+
+from apimoex import client, resample
+
+
+def make_candle(begin, price, volume=10):
+    return {
+        "begin": begin,
+        "end": begin[:-2] + "59",
+        "open": price,
+        "close": price + 1,
+        "high": price + 2,
+        "low": price - 2,
+        "value": price * volume,
+        "volume": volume,
+    }
+
+
+CANDLES = [
+    make_candle("2023-01-02 09:59:00", 100),
+    make_candle("2023-01-02 10:00:00", 101),
+    make_candle("2023-01-02 10:09:00", 102),
+    make_candle("2023-01-02 10:10:00", 103),
+    make_candle("2023-01-02 23:49:00", 99),
+    make_candle("2023-01-03 10:00:00", 104),
+    make_candle("2023-01-09 10:00:00", 105),
+    make_candle("2023-04-03 10:00:00", 106),
+]
+
+
+def test_resample_10_minutes():
+    candles = resample.resample_candles(CANDLES[:4], 10)
+    assert candles == [
+        {
+            "begin": "2023-01-02 09:50:00",
+            "end": "2023-01-02 09:59:59",
+            "open": 100,
+            "close": 101,
+            "high": 102,
+            "low": 98,
+            "value": 1000,
+            "volume": 10,
+        },
+        {
+            "begin": "2023-01-02 10:00:00",
+            "end": "2023-01-02 10:09:59",
+            "open": 101,
+            "close": 103,
+            "high": 104,
+            "low": 99,
+            "value": 2030,
+            "volume": 20,
+        },
+        {
+            "begin": "2023-01-02 10:10:00",
+            "end": "2023-01-02 10:10:59",
+            "open": 103,
+            "close": 104,
+            "high": 105,
+            "low": 101,
+            "value": 1030,
+            "volume": 10,
+        },
+    ]
+    assert isinstance(candles[0]["volume"], int)
+
+
+@pytest.mark.parametrize(
+    ("interval", "begins", "volumes"),
+    [
+        (60, ["2023-01-02 09:00:00", "2023-01-02 10:00:00", "2023-01-02 23:00:00"], [10, 30, 10]),
+        (
+            24,
+            ["2023-01-02 00:00:00", "2023-01-03 00:00:00", "2023-01-09 00:00:00", "2023-04-03 00:00:00"],
+            [50, 10, 10, 10],
+        ),
+        (7, ["2023-01-02 00:00:00", "2023-01-09 00:00:00", "2023-04-03 00:00:00"], [60, 10, 10]),
+        (31, ["2023-01-01 00:00:00", "2023-04-01 00:00:00"], [70, 10]),
+        (4, ["2023-01-01 00:00:00", "2023-04-01 00:00:00"], [70, 10]),
+    ],
+)
+def test_resample_intervals(interval, begins, volumes):
+    source = CANDLES[:5] if interval == 60 else CANDLES
+    candles = resample.resample_candles(source, interval)
+    assert [candle["begin"] for candle in candles] == begins
+    assert [candle["volume"] for candle in candles] == volumes
+    assert sum(candle["value"] for candle in candles) == sum(candle["value"] for candle in source)
+
+
+def test_resample_daily_ohlc():
+    (day, *_) = resample.resample_candles(CANDLES, 24)
+    assert day == {
+        "begin": "2023-01-02 00:00:00",
+        "end": "2023-01-02 23:49:59",
+        "open": 100,
+        "close": 100,
+        "high": 105,
+        "low": 97,
+        "value": 5050,
+        "volume": 50,
+    }
+
+
+def test_resample_columns_subset():
+    candles = [{"begin": row["begin"], "close": row["close"]} for row in CANDLES]
+    assert resample.resample_candles(candles, 31) == [
+        {"begin": "2023-01-01 00:00:00", "close": 106},
+        {"begin": "2023-04-01 00:00:00", "close": 107},
+    ]
+
+
+def test_resample_empty():
+    assert resample.resample_candles([], 24) == []
+
+
+def test_resample_errors():
+    with pytest.raises(client.ISSMoexError, match="Некорректный размер свечки"):
+        resample.resample_candles(CANDLES, 1)
+    with pytest.raises(client.ISSMoexError, match="необходим столбец begin"):
+        resample.resample_candles([{"close": 1}], 24)
+    with pytest.raises(client.ISSMoexError, match="упорядочены"):
+        resample.resample_candles(CANDLES[::-1], 24)
+    with pytest.raises(client.ISSMoexError, match="Некорректные размеры свечек"):
+        resample.get_board_candles_resampled(None, "SNGSP", (24, 5))
+
+
+def test_get_board_candles_resampled(monkeypatch):
+    calls = []
+
+    def fake_get_board_candles(session, security, interval, *args):
+        calls.append(interval)
+        return CANDLES
+
+    monkeypatch.setattr(resample.iss_requests, "get_board_candles", fake_get_board_candles)
+    data = resample.get_board_candles_resampled(None, "SNGSP", (10, 24))
+    assert calls == [1]
+    assert data[24] == resample.resample_candles(CANDLES, 24)
+    assert len(data[10]) == 7
@@ -0,0 +1,229 @@
+import io
+import time
+
+import pytest
+import requests
+import urllib3
+from requests import adapters
+
+from apimoex import cache, client, metrics
+from apimoex import session as iss_session
+
+
+def make_response(status, headers=None, content=b"[]"):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = content
+    response.raw = io.BytesIO()
+    return response
+
+
+@pytest.fixture(name="fake_send")
+def make_fake_send(monkeypatch):
+    responses = []
+    calls = []
+
+    def send(self, request, *args):
+        calls.append((time.monotonic(), request.headers))
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(adapters.HTTPAdapter, "send", send)
+    return responses, calls
+
+
+def send(adapter):
+    return adapter.send(requests.Request("GET", "https://iss.moex.com/iss/index.json").prepare())
+
+
+def test_rate_limiter():
+    limiter = iss_session.RateLimiter(50, burst=2)
+    start = time.monotonic()
+    for _ in range(7):
+        limiter.acquire()
+    assert 0.09 < time.monotonic() - start < 0.2
+
+
+def test_rate_limiter_pause():
+    limiter = iss_session.RateLimiter(1000)
+    limiter.pause(0.05)
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start > 0.04
+
+
+@pytest.mark.parametrize(("rate", "burst"), [(0, 1), (-1, 1), (1, 0)])
+def test_rate_limiter_wrong(rate, burst):
+    with pytest.raises(ValueError, match="должн"):
+        iss_session.RateLimiter(rate, burst)
+
+
+@pytest.mark.parametrize(("status", "message"), [(503, "Временная ошибка MOEX ISS с кодом 503"), (404, "Неверный url")])
+def test_retries_exhausted_client_error(fake_send, status, message):
+    responses, _ = fake_send
+    for _ in range(2):
+        response = make_response(status)
+        response.url = "https://iss.moex.com/iss/index.json"
+        responses.append(response)
+    with requests.Session() as session:
+        session.mount("https://iss.moex.com", iss_session.ISSAdapter(retries=1, backoff=0.01))
+        with pytest.raises(client.ISSMoexError, match=message):
+            client.ISSClient(session, "https://iss.moex.com/iss/index.json").get()
+
+
+def test_retry_statuses(fake_send):
+    responses, calls = fake_send
+    responses.extend([make_response(503), make_response(429), make_response(200)])
+    adapter = iss_session.ISSAdapter(backoff=0.01)
+    assert send(adapter).status_code == 200
+    assert len(calls) == 3
+
+
+def test_retry_connection_error(fake_send):
+    responses, calls = fake_send
+    responses.extend([requests.ConnectionError(), make_response(200)])
+    adapter = iss_session.ISSAdapter(backoff=0.01)
+    assert send(adapter).status_code == 200
+    assert len(calls) == 2
+
+
+def test_permanent_error_not_retried(fake_send):
+    responses, calls = fake_send
+    responses.extend([make_response(404), make_response(200)])
+    adapter = iss_session.ISSAdapter(backoff=0.01)
+    assert send(adapter).status_code == 404
+    assert len(calls) == 1
+
+
+def test_retries_exhausted(fake_send):
+    responses, calls = fake_send
+    responses.extend([make_response(500), make_response(502), make_response(200)])
+    adapter = iss_session.ISSAdapter(retries=1, backoff=0.01)
+    assert send(adapter).status_code == 502
+    assert len(calls) == 2
+
+
+def test_retry_after(fake_send):
+    responses, calls = fake_send
+    responses.extend([make_response(429, {"Retry-After": "1"}), make_response(200)])
+    adapter = iss_session.ISSAdapter(iss_session.RateLimiter(1000), backoff=0.01)
+    assert send(adapter).status_code == 200
+    assert calls[1][0] - calls[0][0] > 0.9
+
+
+@pytest.mark.parametrize(("header", "low", "high"), [("0", 0, 0.09), ("3600", 0.15, 0.5)])
+def test_retry_after_bounds(fake_send, header, low, high):
+    responses, calls = fake_send
+    responses.extend([make_response(503, {"Retry-After": header}), make_response(200)])
+    adapter = iss_session.ISSAdapter(iss_session.RateLimiter(1000), backoff=0.5, max_backoff=0.2)
+    assert send(adapter).status_code == 200
+    assert low <= calls[1][0] - calls[0][0] < high
+
+
+def test_retry_after_http_date():
+    response = make_response(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    # noinspection PyProtectedMember
+    assert iss_session._retry_after(response) == 0
+    # noinspection PyProtectedMember
+    assert iss_session._retry_after(make_response(429, {"Retry-After": "soon"})) is None
+
+
+def test_make_session():
+    with iss_session.make_session(workers=4, retries=2) as session:
+        adapter = session.get_adapter("https://iss.moex.com/iss/index.json")
+        assert isinstance(adapter, iss_session.ISSAdapter)
+        # noinspection PyProtectedMember
+        assert adapter._retries == 2
+        # noinspection PyProtectedMember
+        assert adapter._pool_maxsize == 4
+        # noinspection PyProtectedMember
+        assert adapter._pool_block
+        assert session.headers["Accept-Encoding"] == urllib3.util.request.ACCEPT_ENCODING
+        assert "gzip" in session.headers["Accept-Encoding"]
+        assert adapter.stats() == (0, 0)
+
+
+def test_connection_stats():
+    stats = iss_session.ConnectionStats(requests=10, connections=3)
+    assert stats.reused == 7
+    adapter = iss_session.ISSAdapter()
+    pool = adapter.poolmanager.connection_from_url("https://iss.moex.com")
+    pool.num_requests = 5
+    pool.num_connections = 2
+    assert adapter.stats() == (5, 2)
+    assert adapter.stats().reused == 3
+
+
+def test_cache_not_modified(fake_send):
+    responses, calls = fake_send
+    responses.extend([make_response(200, {"ETag": '"v1"'}, b"[1]"), make_response(304, {"ETag": '"v2"'}, b"")])
+    adapter = iss_session.ISSAdapter(cache=cache.HTTPCache())
+    assert send(adapter).content == b"[1]"
+    assert "If-None-Match" not in calls[0][1]
+    response = send(adapter)
+    assert response.status_code == 200
+    assert response.content == b"[1]"
+    assert calls[1][1]["If-None-Match"] == '"v1"'
+    assert len(calls) == 2
+
+
+def test_cache_not_modified_evicted(fake_send, monkeypatch):
+    responses, calls = fake_send
+    responses.extend(
+        [
+            make_response(200, {"ETag": '"v1"'}, b"[1]"),
+            make_response(304, {"ETag": '"v1"'}, b""),
+            make_response(200, {"ETag": '"v2"'}, b"[2]"),
+        ],
+    )
+    http_cache = cache.HTTPCache()
+    adapter = iss_session.ISSAdapter(cache=http_cache)
+    assert send(adapter).content == b"[1]"
+    monkeypatch.setattr(http_cache, "revalidate", lambda *_: None)
+    response = send(adapter)
+    assert response.status_code == 200
+    assert response.content == b"[2]"
+    assert calls[1][1]["If-None-Match"] == '"v1"'
+    assert "If-None-Match" not in calls[2][1]
+    assert http_cache.lookup("https://iss.moex.com/iss/index.json").content == b"[2]"
+
+
+def test_cache_modified(fake_send):
+    responses, calls = fake_send
+    responses.extend(
+        [
+            make_response(200, {"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}, b"[1]"),
+            make_response(200, {"Last-Modified": "Thu, 22 Oct 2015 07:28:00 GMT"}, b"[2]"),
+            make_response(304),
+        ],
+    )
+    adapter = iss_session.ISSAdapter(cache=cache.HTTPCache())
+    assert send(adapter).content == b"[1]"
+    assert send(adapter).content == b"[2]"
+    assert calls[1][1]["If-Modified-Since"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert send(adapter).content == b"[2]"
+    assert calls[2][1]["If-Modified-Since"] == "Thu, 22 Oct 2015 07:28:00 GMT"
+
+
+def test_cache_ttl(fake_send):
+    responses, calls = fake_send
+    responses.extend([make_response(200, content=b"[1]"), make_response(200, content=b"[2]")])
+    adapter = iss_session.ISSAdapter(cache=cache.HTTPCache(ttl=60))
+    assert send(adapter).content == b"[1]"
+    assert send(adapter).content == b"[1]"
+    assert len(calls) == 1
+    adapter = iss_session.ISSAdapter(cache=cache.HTTPCache())
+    assert send(adapter).content == b"[2]"
+    assert not responses
+
+
+def test_retry_metrics(fake_send):
+    responses, _ = fake_send
+    responses.extend([make_response(503), make_response(200)])
+    registry = metrics.Metrics()
+    adapter = iss_session.ISSAdapter(metrics=registry, backoff=0.01)
+    assert send(adapter).status_code == 200
+    assert 'apimoex_retries_total{endpoint="/iss/index.json"} 1' in registry.export().splitlines()
@@ -0,0 +1,76 @@
+import pytest
+from requests import Session
+
+from apimoex import client, store
+
+
+@pytest.fixture(scope="module", name="session")
+def make_session():
+    with Session() as session:
+        yield session
+
+
+class FakeCandles:
+    def __init__(self):
+        self.starts = []
+        self.days = ["2020-01-09", "2020-01-10"]
+        self.close = 1
+
+    def __call__(self, session, security, interval, start, end, *_):
+        self.starts.append(start)
+        return [{"begin": f"{day} 10:00:00", "close": self.close} for day in self.days if start is None or day >= start]
+
+
+def test_get_board_candles_refresh(monkeypatch, session, tmp_path):
+    fake = FakeCandles()
+    monkeypatch.setattr(store.iss_requests, "get_board_candles", fake)
+
+    with store.HistoryStore(tmp_path / "iss.db") as db:
+        data = db.get_board_candles(session, "GAZP")
+        assert data == [{"begin": "2020-01-09 10:00:00", "close": 1}, {"begin": "2020-01-10 10:00:00", "close": 1}]
+
+    fake.days.append("2020-01-11")
+    fake.close = 2
+    with store.HistoryStore(tmp_path / "iss.db") as db:
+        data = db.get_board_candles(session, "GAZP")
+
+    assert fake.starts == [None, "2020-01-10"]
+    assert data == [
+        {"begin": "2020-01-09 10:00:00", "close": 1},
+        {"begin": "2020-01-10 10:00:00", "close": 2},
+        {"begin": "2020-01-11 10:00:00", "close": 2},
+    ]
+
+
+def test_get_board_candles_separate_keys(monkeypatch, session, tmp_path):
+    fake = FakeCandles()
+    monkeypatch.setattr(store.iss_requests, "get_board_candles", fake)
+
+    with store.HistoryStore(tmp_path / "iss.db") as db:
+        db.get_board_candles(session, "GAZP")
+        db.get_board_candles(session, "GAZP", interval=1)
+        db.get_board_candles(session, "SBER")
+
+    assert fake.starts == [None, None, None]
+
+
+def test_get_board_history_refresh(monkeypatch, session, tmp_path):
+    starts = []
+
+    def fake_history(session, security, start, *_):
+        starts.append(start)
+        return [{"TRADEDATE": "2020-01-09", "CLOSE": 1}]
+
+    monkeypatch.setattr(store.iss_requests, "get_board_history", fake_history)
+    with store.HistoryStore(tmp_path / "iss.db") as db:
+        db.get_board_history(session, "GAZP")
+        data = db.get_board_history(session, "GAZP")
+
+    assert starts == [None, "2020-01-09"]
+    assert data == [{"TRADEDATE": "2020-01-09", "CLOSE": 1}]
+
+
+def test_no_date_column(session, tmp_path):
+    with store.HistoryStore(tmp_path / "iss.db") as db, pytest.raises(client.ISSMoexError) as error:
+        db.get_board_history(session, "GAZP", columns=("CLOSE",))
+    assert "Для хранения данных необходим столбец TRADEDATE - ('CLOSE',)" in str(error.value)
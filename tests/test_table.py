@@ -0,0 +1,117 @@
+import tracemalloc
+
+import pandas as pd
+import pytest
+import requests
+
+from apimoex import client, table
+
+COLUMNS = {
+    "TRADEDATE": ["2020-01-03", "2020-01-04", "2020-01-05"],
+    "CLOSE": [1.5, 2, 3],
+    "from": [1, 2, 3],
+}
+ROWS = [
+    {"TRADEDATE": "2020-01-03", "CLOSE": 1.5, "from": 1},
+    {"TRADEDATE": "2020-01-04", "CLOSE": 2, "from": 2},
+    {"TRADEDATE": "2020-01-05", "CLOSE": 3, "from": 3},
+]
+
+
+@pytest.fixture(scope="module", name="session")
+def make_session():
+    with requests.Session() as session:
+        yield session
+
+
+def test_row_table():
+    data = table.RowTable(COLUMNS)
+    assert len(data) == 3
+    assert data.columns == ("TRADEDATE", "CLOSE", "from")
+    assert data["CLOSE"] == [1.5, 2, 3]
+    assert data.to_dict() == COLUMNS
+    assert data.to_rows() == ROWS
+    assert repr(data) == "RowTable(rows=3, columns=('TRADEDATE', 'CLOSE', 'from'))"
+
+
+def test_row_table_rows():
+    data = table.RowTable(COLUMNS)
+    row = data[-1]
+    assert row == ("2020-01-05", 3, 3)
+    assert row["from"] == 3
+    assert row[1] == 3
+    assert row.keys() == ("TRADEDATE", "CLOSE", "from")
+    assert row.get("CLOSE") == 3
+    assert row.get("OPEN", 0) == 0
+    assert row.to_dict() == ROWS[-1]
+    assert repr(row) == "Row(TRADEDATE='2020-01-05', CLOSE=3, from=3)"
+    assert [row["TRADEDATE"] for row in data] == COLUMNS["TRADEDATE"]
+    assert type(data[0]) is type(data[1])
+
+
+def test_row_table_wrong_keys():
+    data = table.RowTable(COLUMNS)
+    with pytest.raises(IndexError):
+        data[3]
+    with pytest.raises(KeyError):
+        data["OPEN"]
+    with pytest.raises(KeyError):
+        data[0]["OPEN"]
+
+
+def test_row_table_slice():
+    data = table.RowTable(COLUMNS)[1:]
+    assert len(data) == 2
+    assert data.to_rows() == ROWS[1:]
+
+
+def test_row_table_wrong_columns():
+    with pytest.raises(client.ISSMoexError) as error:
+        table.RowTable({"A": [1, 2], "B": [1]})
+    assert "Столбцы таблицы имеют разную длину" in str(error.value)
+
+
+def test_from_rows():
+    assert table.RowTable.from_rows(ROWS).to_dict() == COLUMNS
+    assert len(table.RowTable.from_rows([])) == 0
+    with pytest.raises(client.ISSMoexError) as error:
+        table.RowTable.from_rows([{"A": 1}, {"B": 2}])
+    assert "Строки таблицы содержат разные столбцы" in str(error.value)
+
+
+@pytest.mark.parametrize("convert", [lambda data: data, table.RowTable.to_dict])
+def test_to_data_frame(convert):
+    df = pd.DataFrame(convert(table.RowTable(COLUMNS)))
+    pd.testing.assert_frame_equal(df, pd.DataFrame(ROWS))
+
+
+def test_memory():
+    tracemalloc.start()
+    try:
+        rows = [{"BOARDID": "TQBR", "TRADEDATE": "2020-01-03", "CLOSE": 1.5, "VOLUME": n} for n in range(10_000)]
+        rows_size, _ = tracemalloc.get_traced_memory()
+        data = table.RowTable.from_rows(rows)
+        table_size = tracemalloc.get_traced_memory()[0] - rows_size
+    finally:
+        tracemalloc.stop()
+    assert len(data) == len(rows)
+    assert table_size * 3 < rows_size
+
+
+def test_get_table(monkeypatch, session):
+    monkeypatch.setattr(client.ISSClient, "get_all_columns", lambda self: {"history": COLUMNS})
+    assert table.get_table(session, "", "history").to_rows() == ROWS
+    with pytest.raises(client.ISSMoexError) as error:
+        table.get_table(session, "", "candles")
+    assert "Отсутствует таблица candles в данных" in str(error.value)
+
+
+def test_get_board_history_table(session):
+    data = table.get_board_history_table(session, "SNGSP", "2020-01-03", "2020-01-31")
+    assert data.columns == ("BOARDID", "TRADEDATE", "CLOSE", "VOLUME", "VALUE")
+    assert data[0]["TRADEDATE"] == "2020-01-03"
+
+
+def test_get_board_candles_table(session):
+    data = table.get_board_candles_table(session, "SNGSP", 1, "2020-01-03", "2020-01-03")
+    assert data[0]["begin"] == "2020-01-03 10:00:00"
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+import requests
+
+from apimoex import client, typed
+
+HISTORY = {
+    "BOARDID": ["TQBR", "TQBR", "TQBR"],
+    "TRADEDATE": ["2020-01-03", "2020-01-04", "0000-00-00"],
+    "CLOSE": [1.5, None, 2],
+    "VOLUME": [10, 20, 30],
+}
+METADATA = {"BOARDID": "string", "TRADEDATE": "date", "CLOSE": "double", "VOLUME": "int64"}
+
+
+@pytest.fixture(scope="module", name="session")
+def make_session():
+    with requests.Session() as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def clear_metadata(monkeypatch):
+    # noinspection PyProtectedMember
+    monkeypatch.setattr(typed, "_metadata", {})
+
+
+def test_to_array_date():
+    array = typed.to_array(["2020-01-03", None, "0000-00-00"], "date")
+    assert array.dtype == np.dtype("datetime64[D]")
+    assert array[0] == np.datetime64("2020-01-03")
+    assert np.isnat(array[1:]).all()
+
+
+def test_to_array_datetime():
+    array = typed.to_array(["2020-01-03 10:00:00", "2020-01-03 10:01:00"], "datetime")
+    assert array.dtype == np.dtype("datetime64[s]")
+    assert array[1] - array[0] == np.timedelta64(60, "s")
+
+
+def test_to_array_numbers():
+    assert typed.to_array([1, 2], "int32").dtype == np.int64
+    ints_with_gaps = typed.to_array([1, None], "int64")
+    assert ints_with_gaps.dtype == np.float64
+    assert np.isnan(ints_with_gaps[1])
+    doubles = typed.to_array([1.5, None, 2], "double")
+    assert doubles.dtype == np.float64
+    assert np.isnan(doubles[1])
+
+
+def test_to_array_other():
+    array = typed.to_array(["TQBR", None], "string")
+    assert array.dtype == object
+    assert array.tolist() == ["TQBR", None]
+
+
+def fake_client(monkeypatch, columns, metadata):
+    metadata_calls = []
+
+    def fake_get_metadata(self):
+        metadata_calls.append(self)
+        return {"history": metadata}
+
+    monkeypatch.setattr(client.ISSClient, "get_all_columns", lambda self: {"history": columns})
+    monkeypatch.setattr(client.ISSClient, "get_metadata", fake_get_metadata)
+
+    return metadata_calls
+
+
+def test_get_typed(monkeypatch, session):
+    url = "https://iss.moex.com/iss/history/engines/stock/markets/shares/boards/TQBR/securities/SNGSP.json"
+    metadata_calls = fake_client(monkeypatch, HISTORY, METADATA)
+    data = typed.get_typed(session, url, "history")
+    assert list(data) == list(HISTORY)
+    assert data["TRADEDATE"].dtype == np.dtype("datetime64[D]")
+    assert data["CLOSE"].dtype == np.float64
+    assert data["VOLUME"].tolist() == [10, 20, 30]
+    assert data["BOARDID"].tolist() == HISTORY["BOARDID"]
+    assert len(metadata_calls) == 1
+
+
+def test_get_typed_caches_metadata_by_endpoint(monkeypatch, session):
+    url = "https://iss.moex.com/iss/history/engines/stock/markets/shares/boards/TQBR/securities/{}.json"
+    metadata_calls = fake_client(monkeypatch, HISTORY, METADATA)
+    typed.get_typed(session, url.format("SNGSP"), "history")
+    typed.get_typed(session, url.format("GAZP"), "history")
+    assert len(metadata_calls) == 1
+
+
+def test_get_typed_reloads_missing_columns(monkeypatch, session):
+    url = "https://iss.moex.com/iss/history/engines/stock/markets/shares/boards/TQBR/securities/SNGSP.json"
+    fake_client(monkeypatch, {"CLOSE": [1.5]}, {"CLOSE": "double"})
+    typed.get_typed(session, url, "history")
+    metadata_calls = fake_client(monkeypatch, {"CLOSE": [1.5], "VOLUME": [10]}, {"VOLUME": "int64"})
+    data = typed.get_typed(session, url, "history")
+    assert len(metadata_calls) == 1
+    assert data["CLOSE"].dtype == np.float64
+    assert data["VOLUME"].dtype == np.int64
+
+
+def test_get_typed_wrong_table(monkeypatch, session):
+    fake_client(monkeypatch, HISTORY, METADATA)
+    with pytest.raises(client.ISSMoexError) as error:
+        typed.get_typed(session, "", "candles")
+    assert "Отсутствует таблица candles в данных" in str(error.value)
+
+
+def test_get_board_history_typed(session):
+    data = typed.get_board_history_typed(session, "SNGSP", "2020-01-03", "2020-01-31")
+    assert data["TRADEDATE"].dtype == np.dtype("datetime64[D]")
+    assert data["TRADEDATE"][0] == np.datetime64("2020-01-03")
+    assert data["CLOSE"].dtype == np.float64
+    assert data["VOLUME"].dtype == np.int64
+
+
+def test_get_board_candles_typed(session):
+    data = typed.get_board_candles_typed(session, "SNGSP", 1, "2020-01-03", "2020-01-03")
+    assert data["begin"].dtype == np.dtype("datetime64[s]")
+    assert data["begin"][0] == np.datetime64("2020-01-03T10:00:00")
+    assert data["open"].dtype == np.float64